@@ -1,12 +1,24 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import folium
-from folium.plugins import MarkerCluster, MiniMap, Fullscreen
-from folium.features import DivIcon
-from streamlit_folium import st_folium
 from streamlit_option_menu import option_menu
+from ktt.loader import NEW_FILES, find_source, build_new
+from ktt.schema import memory_report
+from ktt.snapshot import load_cached, snapshot_signature, save_delta, applied_deltas
+from ktt.filter_index import PRICE_BUCKETS
+from ktt.map_cache import MapCache, data_bytes, html_bytes, map_signature, show_map
+from ktt.geo_index import radius_zoom
+from ktt.source import FrameSource, DISTANCE_COL, choose_backend, valid_points
+from ktt.sql_backend import SqlSource, ensure_sqlite
+from ktt.ingest import read_delta, apply_delta
+from ktt.export import FORMATS, export_rows, read_file, discard, keep
+from ktt.shared_cache import load_shared, shared_file
+from ktt.papp_store import PappStore, discover, store_signature
+from ktt import metrics, startup
+from datetime import datetime
+import functools
+import importlib
 import os
+import zlib
 
 # === 1. [System] 페이지 및 세션 설정 ===
 st.set_page_config(
@@ -15,13 +27,17 @@ st.set_page_config(
     layout="wide"
 )
 
+# [Metrics] 이번 실행 계측 시작 (설정 > 성능 계측 에서 조회)
+run = metrics.begin_run('full')
+first_script = startup.script_started()
+
 # [Session State] 지도 및 선택 상태 초기화
 if 'map_center' not in st.session_state:
     st.session_state.map_center = [37.5665, 126.9780] # 서울 시청
 if 'map_zoom' not in st.session_state:
     st.session_state.map_zoom = 11
-if 'selected_rows_indices' not in st.session_state:
-    st.session_state.selected_rows_indices = []
+if 'selected_keys' not in st.session_state:
+    st.session_state.selected_keys = []
 
 # [CSS] Expert UI/UX Styling
 st.markdown("""
@@ -83,71 +99,95 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # === 2. [Data] 데이터 로드 및 전처리 ===
+# 전처리 결과는 .snapshot/ 에 컬럼형 스냅샷으로 저장되어 재파싱 없이 로드됨
+# 데이터는 필요한 화면에서만 로드 (2026 DB → open_source, 기존 대시보드 → get_papp_store)
 @st.cache_data
-def load_data():
-    files = {'old': 'papp.csv', 'new': 'db.csv'}
-    data = {'old': None, 'new': None}
-    
-    # 1. 기존 데이터 로드 (papp.csv)
-    for fname in ['papp.csv', 'papp.xlsx']:
-        if os.path.exists(fname):
-            try:
-                df = pd.read_csv(fname) if fname.endswith('.csv') else pd.read_excel(fname)
-                if '구분' in df.columns: df = df[df['구분'] != '소계']
-                for c in ['대상', '해지', '해지율']:
-                    if c in df.columns:
-                        df[c] = pd.to_numeric(df[c].astype(str).str.replace(r'[,%]', '', regex=True), errors='coerce').fillna(0)
-                if '유지(방어)율' not in df.columns and '해지율' in df.columns:
-                    df['유지(방어)율'] = 100 - df['해지율']
-                data['old'] = df
-                break
-            except: continue
-
-    # 2. 2026 DB 로드 (db.csv)
-    if os.path.exists(files['new']):
+def load_data(signature):
+    # signature: 원본 파일 (경로, 크기, mtime, 반영된 업로드 수) → 파일이 바뀌거나 업로드 반영 시 캐시 미스
+    metrics.cache_miss('load_data')
+    data = {'new': None}
+    new_src = signature['new']
+
+    # 2026 DB 로드 (db.csv), 기존 데이터(papp)는 월별 저장소(get_papp_store)에서
+    if new_src:
         try:
-            df = pd.read_csv(files['new'])
-            # 전처리
-            for c in ['위도', '경도']:
-                if c in df.columns: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
-            
-            if '합산월정료(KTT+KT)' in df.columns:
-                df['월정료_숫자'] = pd.to_numeric(df['합산월정료(KTT+KT)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
-            
-            if '계약번호' in df.columns:
-                df['계약번호'] = df['계약번호'].astype(str).str.replace(r'\.0$', '', regex=True)
+            data['new'] = load_cached('new', new_src[0], build_new)
+        except: pass
 
-            # 해지 여부 (변경요청 기반)
-            if '변경요청' not in df.columns: df['변경요청'] = ''
-            df['해지여부'] = df['변경요청'].apply(lambda x: '해지예정' if str(x).strip() == '삭제' else '유지')
+    return data
 
-            # 비고(제외) 확인용 컬럼
-            if '비고(관리고객 제외)' not in df.columns: df['비고(관리고객 제외)'] = None
+# 2026 DB 데이터 소스는 프로세스당 1회 생성 (데이터 시그니처가 바뀔 때만 재생성)
+# pandas: 필터 인덱스 + 지도 격자 + 차트 큐브 / sqlite: 인덱스가 있는 SQLite 파일 (대용량, 행을 메모리에 올리지 않음)
+# pandas 소스는 노드의 프로세스 간 공유 캐시에서 attach (한 프로세스만 빌드, 나머지는 컬럼·인덱스 배열을 memory-map 으로 공유)
+# 예열 스레드도 호출하므로 캐시 spinner 는 끄고 (끝난 실행에 요소를 그리지 않도록) 화면 쪽 open_source 에서 표시
+@st.cache_resource(show_spinner=False)
+def get_frame_source(signature):
+    metrics.cache_miss('source')
+    return load_shared('new', signature[0], build_new, FrameSource)
+
+# 만든 지도 캐시 (프로세스 내 모든 세션 공용, 데이터 버전이 바뀌면 비움)
+@st.cache_resource
+def get_map_cache():
+    return MapCache()
+
+@st.cache_resource(show_spinner=False)
+def get_sql_source(signature):
+    metrics.cache_miss('source')
+    path = ensure_sqlite('new', signature[0], build_new)
+    return SqlSource(path) if path else None
+
+# 기존 데이터: 월별 papp 파티션 + 롤업 저장소 (바뀐 월만 다시 적재, 원본 파티션은 조회한 월만 로드)
+@st.cache_resource
+def get_papp_store(signature):
+    metrics.cache_miss('papp_store')
+    return PappStore().sync(dict((month, src[0]) for month, src in signature))
+
+new_backend = choose_backend(find_source(NEW_FILES))
+data_signature = {'new': snapshot_signature('new', find_source(NEW_FILES))}
+
+def open_source():
+    """2026 DB 데이터 소스와 (pandas 백엔드면) 프레임 : 이 데이터를 쓰는 화면에서만 호출
+    (spinner 는 0.5초 이상 걸릴 때만 표시 → 캐시 hit 이면 보이지 않음)"""
+    src = None
+    if new_backend == 'sqlite' and data_signature['new']:
+        try:
+            with metrics.stage('source'), metrics.cache('source'), st.spinner("2026 DB 불러오는 중..."):
+                src = get_sql_source(data_signature['new'])
+        except Exception:
+            src = None  # SQLite 적재 실패 → pandas 로
+    if src is None and data_signature['new']:
+        try:
+            with metrics.stage('source'), metrics.cache('source'), st.spinner("2026 DB 불러오는 중..."):
+                src = get_frame_source(data_signature['new'])
+        except Exception:
+            src = None
+    if src is None:
+        with metrics.stage('load_data'), metrics.cache('load_data'):
+            df_new = load_data(data_signature)['new']
+    else:
+        # pandas 소스의 DataFrame 은 공유 캐시의 읽기 전용 프레임 (st.cache_data 사본 없음)
+        df_new = src.df if src.kind == 'pandas' else None
+    run.labels['backend'] = src.kind if src is not None else None
+    return src, df_new
 
-            # 주소 병합
-            if '군구' in df.columns and '읍면동' in df.columns:
-                df['주소(지역)'] = df['군구'].fillna('') + ' ' + df['읍면동'].fillna('')
-            else:
-                df['주소(지역)'] = df['설치주소']
 
-            if '지도링크_URL' not in df.columns:
-                df['지도링크_URL'] = ''
+def _warm_source():
+    # 예열 후 첫 방문은 캐시 hit (st.cache_resource 는 키별 잠금: 화면과 동시에 불려도 한 번만 생성)
+    if data_signature['new']:
+        (get_sql_source if new_backend == 'sqlite' else get_frame_source)(data_signature['new'])
 
-            # 지사명 정제 및 정렬
-            if '담당부서2' in df.columns:
-                df['담당부서2'] = df['담당부서2'].astype(str).str.replace('지사', '')
-                custom_order = ['중앙', '강북', '서대문', '고양', '의정부', '남양주', '강릉', '원주']
-                df['담당부서2'] = pd.Categorical(df['담당부서2'], categories=custom_order, ordered=True)
-                df = df.sort_values('담당부서2')
-                
-            data['new'] = df
-        except: pass
-    
-    return data
 
-data_pack = load_data()
-df_new = data_pack['new']
-df_old = data_pack['old']
+src, df_new = None, None
+data_version = repr(data_signature['new'])
+map_cache = get_map_cache()
+
+
+def show_chart(fig):
+    """Plotly 차트 출력 (출력 시간 계측, 직렬화 크기는 표본 실행에서만 따로 직렬화해 측정)"""
+    with metrics.stage('chart_render'):
+        if metrics.sampled('charts'):
+            metrics.payload('charts', len(fig.to_json()))
+        st.plotly_chart(fig, width="stretch")
 
 # === 3. [Sidebar] 메뉴 및 필터 ===
 with st.sidebar:
@@ -163,22 +203,25 @@ with st.sidebar:
         menu_icon="cast", default_index=0,
         styles={"container": {"padding": "0"}, "nav-link": {"font-size": "14px"}}
     )
+    run.labels['menu'] = menu
     
     st.markdown("---")
     
     # [2026 DB 필터]
-    if menu == "2026 관리고객 DB" and df_new is not None:
+    if menu == "2026 관리고객 DB":
+        src, df_new = open_source()
+    if menu == "2026 관리고객 DB" and src is not None:
         st.markdown("**🔍 검색 및 필터**")
         
         # 1. 텍스트 검색
-        search_txt = st.text_input("통합 검색 (고객명/계약번호)", placeholder="예: 블루엘리펀트")
+        search_txt = st.text_input("통합 검색 (고객명/상호/계약번호/주소, 초성 가능)", placeholder="예: 블루엘리펀트, ㅂㄹㅇ")
         
         # 2. 비고(관리고객 제외) 필터
         exclude_note = st.toggle("🚫 비고(관리고객 제외) 적용", value=False)
         
         # 3. 월정료 필터 (Pills)
         st.caption("💰 월정료 구간")
-        price_opts = ["전체", "10만 미만", "30만 미만", "50만 이상"]
+        price_opts = ["전체"] + list(PRICE_BUCKETS)
         sel_price = st.pills("월정료", price_opts, default="전체", label_visibility="collapsed")
         
         # 4. 해지 포함 여부 (기본값 True: 전체 보기)
@@ -199,66 +242,78 @@ with st.sidebar:
         with st.expander("📂 지사 및 구역 선택", expanded=True):
             # 지사 (Pills)
             sel_branch = []
-            if '담당부서2' in df_new.columns:
+            if '담당부서2' in src.columns:
                 st.caption("지사 (Branch)")
                 # 정렬된 순서 유지
-                all_branches = df_new['담당부서2'].unique()
+                all_branches = src.branches()
                 sel_branch = st.pills("지사", all_branches, selection_mode="multi", label_visibility="collapsed")
             
             # 영업구역 (동적 Pills)
             sel_sales = []
-            if '영업구역정보' in df_new.columns:
+            if '영업구역정보' in src.columns:
                 st.caption("영업구역")
-                if sel_branch:
-                    filtered_for_opts = df_new[df_new['담당부서2'].isin(sel_branch)]
-                    all_sales = sorted(filtered_for_opts['영업구역정보'].astype(str).unique())
-                else:
-                    all_sales = sorted(df_new['영업구역정보'].astype(str).unique())
+                all_sales = src.sales_options(sel_branch)
                 
                 if len(all_sales) <= 20:
                     sel_sales = st.pills("영업구역", all_sales, selection_mode="multi", label_visibility="collapsed")
                 else:
                     sel_sales = st.multiselect("영업구역", all_sales, label_visibility="collapsed")
 
+        # 7. 반경 검색 (선택 고객 또는 입력 좌표 기준 N km 이내, 공간 트리 조회)
+        near = None
+        if st.session_state.pop('near_request', False):
+            st.session_state.near_mode = "선택 고객"
+        st.session_state.setdefault('near_point', "37.56650, 126.97800")
+        with st.expander("📍 반경 검색", expanded=st.session_state.get('near_mode', "사용 안 함") != "사용 안 함"):
+            near_mode = st.radio("기준", ["사용 안 함", "선택 고객", "좌표 입력"], key='near_mode', horizontal=True,
+                                 label_visibility="collapsed")
+            anchor = None
+            if near_mode == "선택 고객":
+                anchor = st.session_state.get('near_anchor')
+                if anchor:
+                    st.caption(f"기준 고객: {anchor['name']}")
+                else:
+                    st.caption("리스트에서 고객을 선택한 뒤 '이 고객 기준 반경 검색'을 누르세요.")
+            elif near_mode == "좌표 입력":
+                point_txt = st.text_input("위도, 경도", key='near_point')
+                try:
+                    lat, lng = (float(v) for v in point_txt.split(','))
+                    anchor = {'name': "입력 좌표", 'lat': lat, 'lng': lng}
+                except ValueError:
+                    st.warning("'위도, 경도' 형식으로 입력하세요.")
+            near_km = st.slider("반경 (km)", 0.5, 20.0, 3.0, 0.5, key='near_km', disabled=near_mode == "사용 안 함")
+            if anchor:
+                near = (anchor['lat'], anchor['lng'], near_km)
+
 # === 4. [Main] 콘텐츠 영역 ===
 
 # -----------------------------------------------------------------------------
 # MODE: 2026 관리고객 DB
 # -----------------------------------------------------------------------------
 if menu == "2026 관리고객 DB":
-    if df_new is None:
+    if src is None:
         st.error("데이터 파일(db.csv)이 없습니다.")
         st.stop()
 
     # --- Data Filtering ---
-    filtered = df_new.copy()
-    
-    # 1. 비고 제외 필터
-    if exclude_note:
-        filtered = filtered[
-            filtered['비고(관리고객 제외)'].isna() | 
-            (filtered['비고(관리고객 제외)'].astype(str).str.strip() == '') |
-            (filtered['비고(관리고객 제외)'].astype(str).str.strip() == 'nan')
-        ]
-        
-    # 2. 해지 필터
-    if not show_churn: filtered = filtered[filtered['해지여부'] == '유지']
-    
-    # 3. 검색
-    if search_txt:
-        filtered = filtered[
-            filtered['관리고객명'].astype(str).str.contains(search_txt, case=False) |
-            filtered['계약번호'].astype(str).str.contains(search_txt, case=False)
-        ]
-    # 4. 금액
-    if sel_price != "전체":
-        limit = 100000 if "10만" in sel_price else (300000 if "30만" in sel_price else 500000)
-        if "이상" in sel_price: filtered = filtered[filtered['월정료_숫자'] >= limit]
-        else: filtered = filtered[filtered['월정료_숫자'] < limit]
-        
-    # 5. 구역
-    if sel_branch: filtered = filtered[filtered['담당부서2'].isin(sel_branch)]
-    if sel_sales: filtered = filtered[filtered['영업구역정보'].isin(sel_sales)]
+    # pandas: 사전 계산 마스크 AND → 행 위치 / sqlite: WHERE 절 (조회마다 SQL 로 pushdown)
+    with metrics.stage('filter'):
+        sel = src.select(
+            search_txt, exclude_note=exclude_note, show_churn=show_churn, sel_price=sel_price,
+            sel_branch=sel_branch, sel_sales=sel_sales, near=near,
+        )
+    # 반경 조건이 바뀌면 지도를 기준점/반경에 맞춤
+    if near != st.session_state.get('near_view'):
+        st.session_state.near_view = near
+        if near:
+            st.session_state.map_center = [near[0], near[1]]
+            st.session_state.map_zoom = radius_zoom(near[2])
+    # 필터 단계별 행 수는 계측 전용 (sqlite 는 WHERE 없는 전체 스캔) → 표본 실행에서만
+    if metrics.sampled('filter_steps'):
+        with metrics.stage('filter_steps'):
+            metrics.rows(src.filter_steps(sel))
+    with metrics.stage('kpi'):
+        kpi = src.kpis(sel)
 
     # --- Header & KPIs ---
     c1, c2 = st.columns([3, 1])
@@ -268,16 +323,16 @@ if menu == "2026 관리고객 DB":
         st.markdown(f"""
             <div style='text-align:right; padding:10px;'>
                 <span style='background:#e0e7ff; color:#4338ca; padding:5px 12px; border-radius:20px; font-size:12px; font-weight:700;'>
-                    Total: {len(filtered):,} Rows
+                    Total: {kpi['rows']:,} Rows
                 </span>
             </div>
         """, unsafe_allow_html=True)
 
     # --- [KPI Section] ---
     k1, k2, k3, k4 = st.columns(4)
-    unique_contracts = filtered['계약번호'].nunique()
-    total_amount = filtered['월정료_숫자'].sum()
-    excluded_count = len(df_new) - len(filtered)
+    unique_contracts = kpi['contracts']
+    total_amount = kpi['fee']
+    excluded_count = src.n_rows - kpi['rows']
     
     def kpi_card(label, value, color="black"):
         return f"""
@@ -286,7 +341,7 @@ if menu == "2026 관리고객 DB":
             <div class="kpi-value" style="color:{color}">{value}</div>
         </div>
         """
-    with k1: st.markdown(kpi_card("총 데이터 (Rows)", f"{len(filtered):,}건"), unsafe_allow_html=True)
+    with k1: st.markdown(kpi_card("총 데이터 (Rows)", f"{kpi['rows']:,}건"), unsafe_allow_html=True)
     with k2: st.markdown(kpi_card("총 계약 (Unique)", f"{unique_contracts:,}건", "#4f46e5"), unsafe_allow_html=True)
     with k3: st.markdown(kpi_card("총 월정료", f"{total_amount/10000:,.0f}만원", "#059669"), unsafe_allow_html=True)
     with k4: st.markdown(kpi_card("필터 제외 건수", f"{excluded_count:,}건", "#6b7280"), unsafe_allow_html=True)
@@ -294,192 +349,332 @@ if menu == "2026 관리고객 DB":
     st.markdown("###")
 
     # --- [TOP] Map Visualization ---
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    
-    # 지도 모드 확인 (선택된 행)
-    if 'selected_rows_indices' not in st.session_state:
-        st.session_state.selected_rows_indices = []
+    def sync_map_view():
+        """격자 지도 확대/이동 → 세션 중심/줌 갱신 (콜백 후 지도/리스트 fragment 만 재실행)"""
+        view = st.session_state.get('customer_map') or {}
+        if view.get('zoom') and view.get('center'):
+            st.session_state.map_zoom = view['zoom']
+            st.session_state.map_center = [view['center']['lat'], view['center']['lng']]
+
+    def render_map(sel, target, map_theme):
+        """지도 카드 (target: 리스트에서 선택한 행, 없으면 필터 결과 전체)"""
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        center, zoom = st.session_state.map_center, st.session_state.map_zoom
+
+        # 같은 화면(필터/테마/중심/줌, 또는 선택 행)은 조회·생성한 지도를 재사용 (프로세스 공용 LRU, 출력은 st_folium)
+        target_keys = list(target.index) if target is not None else ()
+        signature = map_signature(sel, map_theme, center, zoom, target_keys)
+        with metrics.cache('map'):
+            view = map_cache.get(data_version, signature)
+        if view is None:
+            metrics.cache_miss('map')
+            # 선택 행은 항상 개별 마커, 그 외에는 줌/건수에 따라 격자 집계 또는 개별 마커
+            if target is None:
+                with metrics.stage('map_view'):
+                    map_mode, map_payload, n_points = src.map_view(sel, center, zoom)
+            else:
+                map_mode, map_payload = 'markers', valid_points(target)
+                n_points = len(map_payload)
+            view = {'mode': map_mode, 'n_points': n_points, 'n_cells': len(map_payload), 'map': None}
+            if n_points:
+                # folium 은 지도를 처음 만들 때 import (KPI 카드는 먼저 그려짐, 예열 스레드가 먼저 로드했으면 비용 없음)
+                with startup.importing(menu):
+                    from ktt.map_layer import build_view_map, add_radius
+                with metrics.stage('map_build'):
+                    view['map'] = build_view_map(map_mode, map_payload, center, zoom, map_theme)
+                    if sel.near:
+                        add_radius(view['map'], *sel.near)
+            map_cache.put(data_version, signature, view, data_bytes(map_payload) if n_points else 0)
+
+        n_points = view['n_points']
+        st.markdown(f'<div class="section-header">📍 고객 위치 모니터링 ({n_points}곳)</div>', unsafe_allow_html=True)
+
+        if n_points:
+            if metrics.sampled('map_html'):
+                metrics.payload('map_html', html_bytes(view['map']))
+            with metrics.stage('map_render'):
+                if view['mode'] == 'cells':
+                    # 서버 집계 셀만 전송 → 확대/이동 시 해당 영역으로 재집계 (지도/리스트 fragment 만 재실행)
+                    st.caption(f"🔎 {n_points:,}곳을 {view['n_cells']:,}개 구역으로 집계 표시 중 (확대하면 개별 위치 표시)")
+                    show_map(view['map'], key='customer_map', height=500, returned_objects=['zoom', 'center'],
+                             on_change=sync_map_view)
+                else:
+                    # 대량 포인트는 bulk 모드 (클라이언트 클러스터링 + 클릭 시 팝업 생성)
+                    show_map(view['map'], height=500, returned_objects=[])
+        else:
+            st.warning("표시할 위치 데이터가 없습니다.")
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    if st.session_state.selected_rows_indices:
-        try:
-            map_target_df = filtered.iloc[st.session_state.selected_rows_indices]
-            if not map_target_df.empty:
-                center_lat = map_target_df['위도'].mean()
-                center_lng = map_target_df['경도'].mean()
-                zoom_level = 15
-                if st.session_state.map_center != [center_lat, center_lng]:
-                    st.session_state.map_center = [center_lat, center_lng]
-                    st.session_state.map_zoom = zoom_level
-                    st.rerun()
-        except: map_target_df = filtered
-    else:
-        map_target_df = filtered
-        
-    map_valid_df = map_target_df[(map_target_df['위도'] > 0) & (map_target_df['경도'] > 0)]
-    
-    st.markdown(f'<div class="section-header">📍 고객 위치 모니터링 ({len(map_valid_df)}곳)</div>', unsafe_allow_html=True)
-
-    if not map_valid_df.empty:
-        # 지도 테마 설정
-        if "다크" in map_theme: tile_layer = "cartodbdark_matter"
-        elif "상세" in map_theme: tile_layer = "openstreetmap"
-        else: tile_layer = "cartodbpositron"
-
-        m = folium.Map(
-            location=st.session_state.map_center, 
-            zoom_start=st.session_state.map_zoom, 
-            tiles=tile_layer
+    # --- [MIDDLE] Detailed Data List ---
+    # 지도 + 리스트는 하나의 fragment: 행 선택은 이 영역만 재실행 (KPI/차트/필터는 그대로)
+    # 지도 자리를 먼저 확보하고 리스트의 선택 결과로 같은 실행 안에서 지도를 그린다 (추가 st.rerun 없음)
+    # 리스트는 서버 페이지 단위: 필터 결과/정렬은 데이터 소스에 두고 현재 페이지 행만 브라우저로 전송
+    @st.fragment
+    @metrics.scoped('fragment:map_and_list')
+    def map_and_list(sel, map_theme):
+        map_slot = st.container()
+
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        st.markdown('<div class="section-header">📋 상세 데이터 리스트 (체크하면 지도에 표시)</div>', unsafe_allow_html=True)
+
+        cols_show = ['관리고객명', '상호', '계약번호', '담당부서2', '주소(지역)', '합산월정료(KTT+KT)', '영업구역정보', '해지여부', '지도링크_URL']
+        final_cols = [c for c in cols_show if c in src.columns]
+
+        # 정렬 / 페이지 크기 / 페이지 (필터·정렬이 바뀌면 1페이지로)
+        p1, p2, p3, p4 = st.columns([3, 2, 2, 2])
+        sort_labels = {"기본 순서": None, **{c: c for c in final_cols if c != '지도링크_URL'}}
+        sort_col = sort_labels[p1.selectbox("정렬 기준", list(sort_labels), key='list_sort')]
+        ascending = p2.selectbox("정렬 방향", ["오름차순", "내림차순"], key='list_order', disabled=sort_col is None) == "오름차순"
+        page_size = p3.selectbox("페이지 크기", [50, 100, 200, 500], index=1, key='list_page_size')
+        n_pages = max(1, -(-kpi['rows'] // page_size))
+        view = (sel.token, sort_col, ascending, page_size)
+        if st.session_state.get('list_view') != view or st.session_state.get('list_page', 1) > n_pages:
+            st.session_state.list_view = view
+            st.session_state.list_page = 1
+        page = p4.number_input(f"페이지 (/{n_pages:,})", min_value=1, max_value=n_pages, step=1, key='list_page')
+
+        offset = (page - 1) * page_size
+        with metrics.stage('list_page'):
+            table_df = src.page(sel, offset=offset, limit=page_size, sort=sort_col, ascending=ascending)
+        metrics.payload('dataframe', table_df[final_cols].memory_usage(deep=True).sum())
+        st.caption(f"{offset + 1 if len(table_df) else 0:,}–{offset + len(table_df):,} / 전체 {kpi['rows']:,}건")
+
+        # 페이지/정렬/필터가 바뀌면 새 위젯 (이전 화면의 선택 위치가 다른 행을 가리키지 않도록)
+        with metrics.stage('list_render'):
+            selection = st.dataframe(
+                table_df[final_cols],
+                key=f"customer_list:{zlib.crc32(repr((view, page)).encode()):08x}",
+                width="stretch",
+                height=400,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                column_config={
+                    "해지여부": st.column_config.TextColumn("상태"),
+                    "합산월정료(KTT+KT)": st.column_config.TextColumn("월정료"),
+                    "지도링크_URL": st.column_config.LinkColumn("길찾기", display_text="🔗")
+                }
+            )
+        export_panel(sel, sort_col, ascending)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # 선택 위치 → 행 키 (계약번호#n) → 행 조회, 선택이 바뀌면 지도 중심 이동
+        target = None
+        keys = [table_df.index[i] for i in selection.selection.rows if i < len(table_df)]
+        if keys:
+            target = src.lookup(keys)
+            if keys != st.session_state.selected_keys and len(target):
+                st.session_state.map_center = [target['위도'].mean(), target['경도'].mean()]
+                st.session_state.map_zoom = 15
+        st.session_state.selected_keys = keys
+
+        with map_slot:
+            render_map(sel, target, map_theme)
+
+        if target is not None:
+            nearest_panel(target)
+
+    # --- 필터 결과 내보내기 (전체 컬럼, 청크 단위로 파일에 바로 쓰고 다운로드할 때만 읽음) ---
+    def export_panel(sel, sort_col, ascending):
+        e1, e2, e3 = st.columns([2, 2, 5])
+        fmt = e1.radio("내보내기 형식", list(FORMATS), horizontal=True, key='export_format', label_visibility="collapsed")
+        view = (sel.token, sort_col, ascending, fmt)
+        done = st.session_state.get('export')
+        if e2.button(f"📥 {kpi['rows']:,}건 내보내기", key='export_run', disabled=kpi['rows'] == 0):
+            bar = e3.progress(0.0, text="내보내기 준비 중...")
+            progress = lambda n: bar.progress(min(n / kpi['rows'], 1.0), text=f"⏳ {n:,} / {kpi['rows']:,}행 쓰는 중...")
+            with metrics.stage('export'):
+                result = export_rows(src, sel, fmt, sort=sort_col, ascending=ascending, progress=progress)
+            bar.empty()
+            metrics.payload('export', result['bytes'])
+            if done:
+                discard(done['path'])   # 세션당 최근 파일 하나만 유지
+            done = st.session_state.export = dict(result, view=view)
+        # 필터/정렬/형식이 바뀌면 이전 파일은 숨김 (다시 내보내기), 보여 주는 동안은 정리 대상에서 제외
+        if done and done['view'] == view and not keep(done['path']):
+            e3.caption("⌛ 내보낸 파일이 만료되었습니다. 다시 내보내기 해 주세요.")
+            st.session_state.export = None
+        elif done and done['view'] == view:
+            e3.download_button(
+                f"💾 {done['file_name']} 받기 ({done['rows']:,}행 · {done['bytes'] / 1024 ** 2:,.1f} MB)",
+                data=functools.partial(read_file, done['path']), file_name=done['file_name'], mime=done['mime'],
+                key='export_download', on_click="ignore",
+            )
+
+    # --- 선택 고객 주변 최근접 고객 (공간 트리 k-NN, 필터와 무관하게 전체 고객 대상) ---
+    def set_near_anchor(row):
+        st.session_state.near_anchor = row
+        st.session_state.near_request = True
+
+    def nearest_panel(target):
+        points = valid_points(target)
+        if points.empty:
+            return
+        base = points.iloc[0]
+        name = f"{base['관리고객명']} ({base['상호']})" if '상호' in points.columns else str(base['관리고객명'])
+
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="section-header">🧭 가까운 고객 · 기준: {name}</div>', unsafe_allow_html=True)
+        n1, n2 = st.columns([1, 3])
+        k = n1.number_input("표시 수", min_value=1, max_value=100, value=10, step=5, key='near_k')
+        n2.button(
+            "📍 이 고객 기준 반경 검색", key='near_from_selection',
+            on_click=set_near_anchor, args=({'name': name, 'lat': float(base['위도']), 'lng': float(base['경도'])},),
         )
-        
-        MiniMap(toggle_display=True).add_to(m)
-        Fullscreen().add_to(m)
-        
-        if len(map_valid_df) <= 5: mc = m
-        else: mc = MarkerCluster().add_to(m)
+        if st.session_state.get('near_request'):
+            st.rerun()
+
+        with metrics.stage('nearest'):
+            near_df = src.nearest(base['위도'], base['경도'], k=int(k), exclude_keys=[points.index[0]])
+        near_cols = [DISTANCE_COL] + [c for c in ['관리고객명', '상호', '담당부서2', '주소(지역)', '합산월정료(KTT+KT)', '해지여부', '지도링크_URL']
+                                      if c in near_df.columns]
+        st.dataframe(
+            near_df[near_cols], width="stretch", hide_index=True,
+            column_config={
+                DISTANCE_COL: st.column_config.NumberColumn("거리(km)", format="%.2f"),
+                "해지여부": st.column_config.TextColumn("상태"),
+                "합산월정료(KTT+KT)": st.column_config.TextColumn("월정료"),
+                "지도링크_URL": st.column_config.LinkColumn("길찾기", display_text="🔗"),
+            },
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
 
-        for _, row in map_valid_df.iterrows():
-            is_churn = row['해지여부'] == '해지예정'
-            color = 'red' if is_churn else 'blue'
-            
-            if len(map_valid_df) <= 10:
-                txt_color = "white" if "다크" in map_theme else "black"
-                shadow = "none" if "다크" in map_theme else "1px 1px 0 #fff"
-                folium.map.Marker(
-                    [row['위도'], row['경도']],
-                    icon=DivIcon(
-                        icon_size=(150,36),
-                        icon_anchor=(75, -10),
-                        html=f'<div style="font-size: 11px; font-weight: bold; color: {color}; text-align: center; text-shadow: {shadow};">{row["상호"]}</div>',
-                    )
-                ).add_to(m)
-
-            popup_html = f"""
-            <div style="font-family:'Pretendard',sans-serif; width:220px;">
-                <h5 style="margin:0; color:#4f46e5; border-bottom:1px solid #eee; padding-bottom:5px;">
-                    {row['관리고객명']}
-                </h5>
-                <div style="font-size:12px; margin-top:5px; color:#374151;">
-                    <b>지사:</b> {row['담당부서2']}<br>
-                    <b>월정료:</b> {row['합산월정료(KTT+KT)']}<br>
-                    <b>주소:</b> {row['주소(지역)']}<br>
-                    <span style='color:#9ca3af; font-size:11px;'>{row.get('영업구역정보','-')}</span>
-                </div>
-            </div>
-            """
-            folium.Marker(
-                [row['위도'], row['경도']],
-                popup=folium.Popup(popup_html, max_width=250),
-                tooltip=f"{row['상호']}",
-                icon=folium.Icon(color=color, icon='info-sign')
-            ).add_to(mc)
-
-        st_folium(m, width="100%", height=500, returned_objects=[])
-    else:
-        st.warning("표시할 위치 데이터가 없습니다.")
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    # --- [MIDDLE] Detailed Data List ---
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    st.markdown('<div class="section-header">📋 상세 데이터 리스트 (체크하면 지도에 표시)</div>', unsafe_allow_html=True)
-    
-    cols_show = ['관리고객명', '상호', '계약번호', '담당부서2', '주소(지역)', '합산월정료(KTT+KT)', '영업구역정보', '해지여부', '지도링크_URL']
-    final_cols = [c for c in cols_show if c in filtered.columns]
-    
-    selection = st.dataframe(
-        filtered[final_cols],
-        use_container_width=True,
-        height=400,
-        hide_index=True,
-        on_select="rerun",
-        selection_mode="multi-row",
-        column_config={
-            "해지여부": st.column_config.TextColumn("상태"),
-            "합산월정료(KTT+KT)": st.column_config.TextColumn("월정료"),
-            "지도링크_URL": st.column_config.LinkColumn("길찾기", display_text="🔗")
-        }
-    )
-    
-    if selection.selection.rows != st.session_state.selected_rows_indices:
-        st.session_state.selected_rows_indices = selection.selection.rows
-        st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    map_and_list(sel, map_theme)
 
     # --- [BOTTOM] 5-Way Visualizations ---
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    st.markdown('<div class="section-header">📊 통합 분석 대시보드 (5-Way Analysis)</div>', unsafe_allow_html=True)
-
-    vc1, vc2, vc3 = st.columns(3)
+    # 차트 fragment: 입력은 차원별 집계 시리즈뿐 → 지도/리스트 상호작용과 독립적으로 재실행
+    @st.fragment
+    @metrics.scoped('fragment:analysis_charts')
+    def analysis_charts(dim_counts):
+        with startup.importing(menu):
+            import plotly.express as px
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        st.markdown('<div class="section-header">📊 통합 분석 대시보드 (5-Way Analysis)</div>', unsafe_allow_html=True)
+
+        vc1, vc2, vc3 = st.columns(3)
     
-    # [수정] 오류가 발생하던 색상 옵션 제거 (안정화)
-    with vc1:
-        if '담당부서2' in filtered.columns:
-            counts = filtered['담당부서2'].value_counts().reset_index()
-            counts.columns = ['지사', '고객수']
-            fig1 = px.bar(counts, x='지사', y='고객수', color='고객수', title="지사별 고객 분포")
-            fig1.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=300)
-            st.plotly_chart(fig1, use_container_width=True)
-
-    with vc2:
-        if 'BM' in filtered.columns:
-            fig2 = px.pie(filtered, names='BM', title="BM(비즈니스) 유형", hole=0.5)
-            fig2.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
-            st.plotly_chart(fig2, use_container_width=True)
+        # [수정] 오류가 발생하던 색상 옵션 제거 (안정화)
+        with vc1:
+            if '담당부서2' in src.columns:
+                counts = dim_counts['담당부서2'].sort_values(ascending=False, kind='stable').reset_index()
+                counts.columns = ['지사', '고객수']
+                fig1 = px.bar(counts, x='지사', y='고객수', color='고객수', title="지사별 고객 분포")
+                fig1.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=300)
+                show_chart(fig1)
+
+        with vc2:
+            if 'BM' in src.columns:
+                bm_counts = dim_counts['BM']
+                bm_counts = bm_counts[bm_counts > 0].rename_axis('BM').reset_index(name='고객수')
+                fig2 = px.pie(bm_counts, names='BM', values='고객수', title="BM(비즈니스) 유형", hole=0.5)
+                fig2.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
+                show_chart(fig2)
             
-    with vc3:
-        fig3 = px.pie(filtered, names='해지여부', title="해지 vs 유지 현황", color_discrete_map={'유지':'#6366f1', '해지예정':'#ef4444'})
-        fig3.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
-        st.plotly_chart(fig3, use_container_width=True)
-
-    vc4, vc5 = st.columns(2)
+        with vc3:
+            churn_counts = dim_counts['해지여부']
+            churn_counts = churn_counts[churn_counts > 0].rename_axis('해지여부').reset_index(name='고객수')
+            fig3 = px.pie(churn_counts, names='해지여부', values='고객수', title="해지 vs 유지 현황", color_discrete_map={'유지':'#6366f1', '해지예정':'#ef4444'})
+            fig3.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
+            show_chart(fig3)
+
+        vc4, vc5 = st.columns(2)
     
-    with vc4:
-        fig4 = px.histogram(filtered, x='월정료_숫자', nbins=20, title="월정료 가격대 분포")
-        fig4.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=300, xaxis_title="월정료(원)")
-        st.plotly_chart(fig4, use_container_width=True)
+        with vc4:
+            price_counts = dim_counts['월정료구간'].rename_axis('월정료 구간').reset_index(name='고객수')
+            fig4 = px.bar(price_counts, x='월정료 구간', y='고객수', title="월정료 가격대 분포")
+            fig4.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=300, xaxis_title="월정료(원)")
+            show_chart(fig4)
         
-    with vc5:
-        if '영업구역정보' in filtered.columns:
-            top_sales = filtered['영업구역정보'].value_counts().nlargest(10).reset_index()
-            top_sales.columns = ['영업구역', '고객수']
-            fig5 = px.treemap(top_sales, path=['영업구역'], values='고객수', title="핵심 영업구역 Top 10", color='고객수')
-            fig5.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
-            st.plotly_chart(fig5, use_container_width=True)
+        with vc5:
+            if '영업구역정보' in src.columns:
+                top_sales = dim_counts['영업구역정보'].drop('nan', errors='ignore').nlargest(10)
+                top_sales = top_sales[top_sales > 0].reset_index()
+                top_sales.columns = ['영업구역', '고객수']
+                fig5 = px.treemap(top_sales, path=['영업구역'], values='고객수', title="핵심 영업구역 Top 10", color='고객수')
+                fig5.update_layout(height=300, margin=dict(t=30, b=0, l=0, r=0))
+                show_chart(fig5)
+
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    st.markdown('</div>', unsafe_allow_html=True)
+    # pandas: 큐브 roll-up / sqlite: GROUP BY 1회 → 차트에는 집계 시리즈만 전달
+    with metrics.stage('chart_agg'):
+        dim_counts = src.chart_counts(sel)
+    analysis_charts(dim_counts)
 
 
 # -----------------------------------------------------------------------------
 # MODE: 기존 대시보드
 # -----------------------------------------------------------------------------
 elif menu == "기존 대시보드":
-    if df_old is None:
-        st.warning("기존 데이터(papp.csv)가 없습니다.")
+    papp_sources = discover()
+    if not papp_sources:
+        st.warning("기존 데이터(papp/ 폴더의 월별 파일 또는 papp.csv)가 없습니다.")
     else:
+        with startup.importing(menu):
+            import plotly.express as px
         st.header("📊 기존 성과 대시보드")
-        
-        all_regions = sorted(df_old['구분'].unique()) if '구분' in df_old.columns else []
-        sel_regions = st.multiselect("지사 선택", all_regions, default=all_regions)
-        sub_df = df_old[df_old['구분'].isin(sel_regions)] if '구분' in df_old.columns else df_old
-        
+        with metrics.stage('papp_store'), metrics.cache('papp_store'):
+            papp = get_papp_store(store_signature(papp_sources))
+        months = papp.months()
+
+        # 기간(월 범위) + 지사 선택 → 롤업 테이블만 조회 (원본 파티션은 상세 보기에서 해당 월만)
+        f1, f2 = st.columns([1, 2])
+        with f1:
+            if len(months) > 1:
+                start, end = st.select_slider("기간", options=months, value=(months[max(0, len(months) - 12)], months[-1]))
+                sel_months = months[months.index(start):months.index(end) + 1]
+            else:
+                sel_months = months
+                st.caption(f"기간: {months[0]}")
+        all_regions = papp.branches(sel_months)
+        with f2:
+            sel_regions = st.multiselect("지사 선택", all_regions, default=all_regions)
+        base_month = sel_months[-1]
+        prev_month = sel_months[-2] if len(sel_months) > 1 else None
+
+        with metrics.stage('papp_rollup'):
+            totals = papp.rollup(sel_months, None, sel_regions).set_index('월')
+            by_branch = papp.rollup(sel_months, '구분', sel_regions)
+        cur = totals.loc[base_month] if base_month in totals.index else None
+        prev = totals.loc[prev_month] if prev_month in totals.index else None
+
+        # 해지율/방어율은 대상 가중 (Σ해지 / Σ대상), 증감은 기간 내 직전 월 대비
+        st.caption(f"기준 월: {base_month}" + (f" (직전 {prev_month} 대비)" if prev is not None else ""))
         k1, k2, k3, k4 = st.columns(4)
-        k1.metric("총 대상", f"{sub_df['대상'].sum():,.0f}")
-        k2.metric("총 해지", f"{sub_df['해지'].sum():,.0f}")
-        k3.metric("해지율", f"{sub_df['해지율'].mean():.1f}%")
-        k4.metric("방어율", f"{sub_df['유지(방어)율'].mean():.1f}%")
-        
+        if cur is not None:
+            delta = lambda c, fmt: None if prev is None else fmt.format(cur[c] - prev[c])
+            k1.metric("총 대상", f"{cur['대상']:,.0f}", delta('대상', "{:+,.0f}"))
+            k2.metric("총 해지", f"{cur['해지']:,.0f}", delta('해지', "{:+,.0f}"), delta_color="inverse")
+            k3.metric("해지율", f"{cur['해지율']:.1f}%", delta('해지율', "{:+.1f}%p"), delta_color="inverse")
+            k4.metric("방어율", f"{cur['유지(방어)율']:.1f}%", delta('유지(방어)율', "{:+.1f}%p"))
+
         st.markdown("---")
-        
+
+        if len(sel_months) > 1:
+            st.subheader("월별 추이")
+            trend = pd.concat([by_branch, totals.reset_index().assign(구분='전체')], ignore_index=True)
+            metric_col = st.radio("지표", ['유지(방어)율', '해지율', '해지', '대상'], horizontal=True, key='papp_trend_metric')
+            fig = px.line(trend, x='월', y=metric_col, color='구분', markers=True)
+            fig.update_xaxes(type='category')
+            show_chart(fig)
+
         c1, c2 = st.columns(2)
         with c1:
             st.subheader("지사별 방어율")
-            if '구분' in sub_df.columns:
-                fig = px.bar(sub_df.groupby('구분')['유지(방어)율'].mean().reset_index(), x='구분', y='유지(방어)율', color='구분')
-                st.plotly_chart(fig, use_container_width=True)
+            fig = px.bar(by_branch[by_branch['월'] == base_month], x='구분', y='유지(방어)율', color='구분')
+            show_chart(fig)
         with c2:
             st.subheader("해지 위험도 (Scatter)")
-            fig = px.scatter(sub_df, x='대상', y='유지(방어)율', size='대상', color='해지')
-            st.plotly_chart(fig, use_container_width=True)
+            zones = papp.rollup([base_month], '구역', sel_regions)
+            fig = px.scatter(zones if len(zones) else by_branch[by_branch['월'] == base_month],
+                             x='대상', y='유지(방어)율', size='대상', color='해지', hover_data=['구분'] + (['구역'] if len(zones) else []))
+            show_chart(fig)
+
+        if st.toggle(f"{base_month} 원본 보기", key='papp_show_rows'):
+            with metrics.stage('papp_partition'):
+                rows = papp.partition(base_month)
+            rows = rows[rows['구분'].isin(sel_regions)] if '구분' in rows.columns else rows
+            st.dataframe(rows, width="stretch", hide_index=True, height=320)
 
 # -----------------------------------------------------------------------------
 # MODE: 설정
@@ -487,4 +682,147 @@ elif menu == "기존 대시보드":
 elif menu == "설정":
     st.title("⚙️ 시스템 설정")
     with st.expander("데이터 파일 관리", expanded=True):
-        st.file_uploader("DB 파일 업로드 (csv/xlsx)", accept_multiple_files=False)
+        upload = st.file_uploader("DB 파일 업로드 (csv/xlsx)", type=['csv', 'xlsx'], accept_multiple_files=False)
+
+        base_new = None
+        if upload is not None:
+            # 업로드가 있을 때만 2026 DB 로드 (sqlite 백엔드: 변경분 비교/반영할 때만 스냅샷에서 프레임 로드)
+            src, df_new = open_source()
+            base_new = load_data(data_signature)['new'] if df_new is None and src is not None else df_new
+
+        if upload is not None and base_new is None:
+            st.warning("기준 데이터(db.csv)가 없어 변경분을 비교할 수 없습니다.")
+        elif upload is not None:
+            # 같은 파일은 한 번만 비교 (청크 단위로 읽으며 계약번호 기준 diff)
+            if st.session_state.get('upload_delta_id') != upload.file_id:
+                status = st.empty()
+                try:
+                    delta = read_delta(upload, upload.name, base_new, progress=lambda n: status.caption(f"⏳ {n:,}행 비교 중..."))
+                except ValueError as e:
+                    delta = None
+                    st.error(f"업로드 파일을 확인하세요: {e}")
+                status.empty()
+                st.session_state.upload_delta_id = upload.file_id
+                st.session_state.upload_delta = delta
+            delta = st.session_state.get('upload_delta')
+
+            if delta is not None:
+                d1, d2, d3, d4 = st.columns(4)
+                d1.metric("신규 계약", f"{len(delta['inserted']):,}")
+                d2.metric("변경 계약", f"{len(delta['updated']):,}")
+                d3.metric("삭제 요청", f"{len(delta['deleted']):,}")
+                d4.metric("동일 계약", f"{delta['unchanged']:,}")
+
+                if delta['replace_keys'] or delta['inserted']:
+                    preview_cols = [c for c in ['계약번호', '관리고객명', '상호', '담당부서2', '변경요청', '합산월정료(KTT+KT)'] if c in delta['rows'].columns]
+                    st.dataframe(delta['rows'][preview_cols].head(200), width="stretch", hide_index=True, height=240)
+                    if st.button("변경분 적용", type="primary"):
+                        merged = apply_delta(base_new, delta)
+                        save_delta('new', merged, {
+                            'file': upload.name, 'sha256': delta['sha256'],
+                            'applied_at': datetime.now().isoformat(timespec='seconds'),
+                            'inserted': len(delta['inserted']), 'updated': len(delta['updated']), 'deleted': len(delta['deleted']),
+                        })
+                        # 새 데이터 버전 → 캐시/인덱스(또는 SQLite 파일)는 스냅샷에서 다시 구성
+                        load_data.clear()
+                        get_frame_source.clear()
+                        get_sql_source.clear()
+                        st.session_state.upload_delta = None
+                        st.toast(f"{len(delta['replace_keys']) + len(delta['inserted']):,}건 계약 변경분을 반영했습니다.")
+                        st.rerun()
+                else:
+                    st.info("반영할 변경분이 없습니다.")
+
+        history = applied_deltas('new')
+        if history:
+            st.caption("📜 반영된 변경분 (현재 db.csv 기준)")
+            st.dataframe(pd.DataFrame(history).drop(columns=['sha256'], errors='ignore'), width="stretch", hide_index=True)
+
+    with st.expander("메모리 사용량 (컬럼별)", expanded=False):
+        # 워커당 메모리 확인용, 데이터 로드가 필요하므로 켰을 때만 (설정 화면 진입만으로는 로드하지 않음)
+        if st.toggle("데이터 로드 후 보기", key='memory_report'):
+            src, df_new = open_source()
+            if src is not None and src.kind == 'sqlite':
+                st.caption(f"2026 관리고객 DB: SQLite 백엔드 {src.n_rows:,}행 · 파일 {os.path.getsize(src.path) / 1024 ** 2:,.2f} MB (행은 메모리에 올리지 않음)")
+            shared = shared_file('new', data_signature['new'][0]) if src is not None and src.kind == 'pandas' else None
+            if shared:
+                st.caption(f"2026 관리고객 DB: 공유 캐시 {os.path.basename(shared)} · {os.path.getsize(shared) / 1024 ** 2:,.2f} MB "
+                           f"(데이터 + 인덱스, 같은 노드의 워커가 memory-map 으로 함께 사용)")
+            if df_new is not None:
+                report = memory_report(df_new)
+                st.caption(f"2026 관리고객 DB: {len(df_new):,}행 · {report['메모리(KB)'].sum() / 1024:,.2f} MB")
+                st.dataframe(report, width="stretch", hide_index=True, height=240)
+            papp_sources = discover()
+            if papp_sources:
+                papp = get_papp_store(store_signature(papp_sources))
+                months = papp.months()
+                st.caption(f"기존 데이터: {len(months):,}개월 ({months[0]} ~ {months[-1]}) · 파티션 {papp.nbytes() / 1024 ** 2:,.2f} MB "
+                           f"(롤업만 상주, 원본 행은 조회한 월만 로드)")
+
+    with st.expander("🚀 기동 시간 (이 워커)", expanded=False):
+        # 프로세스 시작 → 첫 실행 → 메뉴별 첫 화면, 화면 진입/예열 시 지연 import 비용
+        boot = startup.report()
+        warm = boot['warmup']
+        st.caption(f"프로세스 시작 {datetime.fromtimestamp(boot['process_start']):%Y-%m-%d %H:%M:%S} · "
+                   f"첫 실행까지 {boot['first_script'] or 0:,.2f}초 · 예열 {warm['state'] or '사용 안 함'}"
+                   + (f" ({warm['seconds']:,.2f}초)" if warm['seconds'] is not None else "")
+                   + (f" · 오류 {warm['error']}" if warm['error'] else ""))
+        if boot['first_paint']:
+            st.dataframe(pd.DataFrame([{'메뉴': k, **v} for k, v in boot['first_paint'].items()]),
+                         width="stretch", hide_index=True)
+        if boot['imports']:
+            st.dataframe(pd.DataFrame(boot['imports']), width="stretch", hide_index=True)
+
+    with st.expander("⏱️ 성능 계측 (최근 실행)", expanded=False):
+        # 실행(rerun)마다 단계별 시간 / 캐시 hit·miss / 필터 단계별 행 수 / 전송 payload 크기 (프로세스 단위 순환 이력)
+        records = metrics.history()
+        cache_stats = map_cache.stats()
+        st.caption(f"🗺️ 지도 캐시: {cache_stats['entries']:,}개 · {cache_stats['bytes'] / 1024 ** 2:,.1f} MB "
+                   f"(최대 {map_cache.max_entries:,}개 / {map_cache.max_bytes / 1024 ** 2:,.0f} MB) · "
+                   f"hit {cache_stats['hits']:,} / miss {cache_stats['misses']:,} / 축출 {cache_stats['evictions']:,}")
+        if not records:
+            st.info("아직 기록된 실행이 없습니다. 다른 메뉴를 사용한 뒤 다시 확인하세요.")
+        else:
+            st.caption(f"최근 {len(records):,}회 실행 (최대 {metrics.HISTORY_SIZE:,}회 보관)")
+            st.dataframe(pd.DataFrame(metrics.stage_summary(records)), width="stretch", hide_index=True, height=280)
+
+            recent = pd.DataFrame([{
+                '시각': r['ts'], '종류': r['kind'], '메뉴': r.get('menu'), '전체(ms)': round((r['seconds'] or 0) * 1000, 1),
+                'load_data': r['cache'].get('load_data', '-'), '지도 캐시': r['cache'].get('map', '-'),
+                '필터 후 행': list(r['rows'].values())[-1] if r['rows'] else None,
+                '지도 HTML(KB)': round(r['bytes']['map_html'] / 1024, 1) if 'map_html' in r['bytes'] else None,
+                '리스트(KB)': round(r['bytes']['dataframe'] / 1024, 1) if 'dataframe' in r['bytes'] else None,
+                '차트(KB)': round(r['bytes']['charts'] / 1024, 1) if 'charts' in r['bytes'] else None,
+            } for r in reversed(records[-100:])])
+            st.dataframe(recent, width="stretch", hide_index=True, height=280)
+
+            last_rows = next((r['rows'] for r in reversed(records) if r['rows']), None)
+            if last_rows:
+                st.caption("마지막 2026 DB 실행의 필터 단계별 행 수")
+                st.dataframe(pd.DataFrame({'단계': list(last_rows), '행 수': list(last_rows.values())}), hide_index=True)
+
+            e1, e2, e3 = st.columns(3)
+            if e1.button("JSON-lines 저장"):
+                st.toast(f"저장됨: {metrics.export('jsonl')}")
+            if e2.button("Prometheus 저장"):
+                st.toast(f"저장됨: {metrics.export('prom')}")
+            if e3.button("이력 초기화"):
+                metrics.clear()
+                st.rerun()
+            d1, d2 = st.columns(2)
+            d1.download_button("JSON-lines 다운로드", metrics.to_jsonl(records), file_name="ktt-metrics.jsonl", mime="application/x-ndjson")
+            d2.download_button("Prometheus 다운로드", metrics.to_prometheus(records), file_name="ktt.prom", mime="text/plain")
+
+# [Metrics] 이번 실행 계측 종료 → 이력에 추가
+done = metrics.end_run()
+startup.first_paint(menu, done.seconds)
+
+# 워커의 첫 화면이 기본 화면이 아니었으면, 그린 뒤에 기본 화면(2026 관리고객 DB)의 라이브러리/데이터를 백그라운드에서 미리 로드
+# (첫 화면과 동시에 돌리면 GIL 경합으로 첫 화면이 오히려 느려짐)
+if first_script and menu != "2026 관리고객 DB":
+    startup.warm_up([
+        ("예열: plotly", lambda: importlib.import_module('plotly.express')),
+        ("예열: folium", lambda: (importlib.import_module('ktt.map_layer'), importlib.import_module('streamlit_folium'))),
+        ("예열: scikit-learn", lambda: importlib.import_module('sklearn.neighbors')),
+        ("예열: 2026 DB", _warm_source),
+    ])
@@ -0,0 +1,88 @@
+# === [Agg] 5-Way Analysis 차트용 사전 집계 큐브 ===
+# 로드 시점에 (지사 × 영업구역 × BM × 해지여부 × 비고제외 × 월정료구간) 셀별 고객수/월정료 합계를 만들어 두고,
+# 사이드바 필터는 셀 단위 조건으로 roll-up 한다. 검색어가 있을 때만 필터 결과 행의 셀 번호로 bincount.
+# 차트에는 집계된 시리즈만 전달되므로 payload 크기는 데이터 행 수와 무관하다.
+import numpy as np
+import pandas as pd
+
+from ktt.filter_index import PRICE_BUCKETS
+
+# 월정료 구간 경계 (사이드바 월정료 구간 경계 10만/30만/50만 포함 → 필터와 정확히 일치)
+PRICE_EDGES = [0, 50000, 100000, 150000, 200000, 250000, 300000, 400000, 500000,
+               700000, 1000000, 1500000, 2000000, 3000000, 5000000, np.inf]
+
+DIMS = ['담당부서2', '영업구역정보', 'BM', '해지여부', '비고제외', '월정료구간']
+
+
+def price_bin_labels():
+    def fmt(v): return f"{v/10000:,.0f}만"
+    return [f"{fmt(lo)}~{fmt(hi)}" if np.isfinite(hi) else f"{fmt(lo)} 이상"
+            for lo, hi in zip(PRICE_EDGES[:-1], PRICE_EDGES[1:])]
+
+
+class AggCube:
+    def __init__(self, df, not_excluded=None):
+        n = len(df)
+        dims = {}
+        for col in ['담당부서2', 'BM', '해지여부']:
+            dims[col] = df[col] if col in df.columns else pd.Series([None] * n)
+        dims['영업구역정보'] = df['영업구역정보'].astype(str) if '영업구역정보' in df.columns else pd.Series([None] * n)
+        dims['비고제외'] = pd.Series(~not_excluded if not_excluded is not None else np.zeros(n, bool))
+        fee = df['월정료_숫자'].to_numpy(float) if '월정료_숫자' in df.columns else np.zeros(n)
+        dims['월정료구간'] = pd.Series(pd.Categorical.from_codes(
+            np.searchsorted(PRICE_EDGES, fee, side='right') - 1, price_bin_labels()))
+
+        # 차원별 코드 (0 = 결측) → 혼합 진법 키 → 셀 번호
+        self.labels = {}
+        key = np.zeros(n, np.int64)
+        for d in DIMS:
+            if isinstance(dims[d].dtype, pd.CategoricalDtype):
+                # 카테고리 순서 유지 (미사용 카테고리 포함)
+                c, u = dims[d].cat.codes.to_numpy(), dims[d].cat.categories
+            else:
+                c, u = pd.factorize(dims[d])
+            self.labels[d] = [None] + list(u)
+            key = key * (len(u) + 1) + (np.asarray(c) + 1)
+        uniq, self.cell_of_row = np.unique(key, return_inverse=True)
+
+        # 셀 테이블: 차원 코드 + 고객수 + 월정료 합계
+        self.cells = {}
+        rest = uniq.copy()
+        for d in reversed(DIMS):
+            radix = len(self.labels[d])
+            self.cells[d] = rest % radix
+            rest //= radix
+        self.count = np.bincount(self.cell_of_row, minlength=len(uniq))
+        self.fee = np.bincount(self.cell_of_row, fee, minlength=len(uniq))
+
+    def _codes_of(self, dim, values):
+        lookup = {v: i for i, v in enumerate(self.labels[dim]) if v is not None}
+        return [lookup[v] for v in values if v in lookup]
+
+    def cell_mask(self, exclude_note=False, show_churn=True, sel_price="전체", sel_branch=None, sel_sales=None):
+        """사이드바 필터 → 셀 조건 (FilterIndex.mask 와 같은 의미)"""
+        m = np.ones(len(self.count), bool)
+        if exclude_note: m &= np.isin(self.cells['비고제외'], self._codes_of('비고제외', [False]))
+        if not show_churn: m &= np.isin(self.cells['해지여부'], self._codes_of('해지여부', ['유지']))
+        if sel_price in PRICE_BUCKETS:
+            lo, hi = PRICE_BUCKETS[sel_price]
+            bins = [i + 1 for i, (a, b) in enumerate(zip(PRICE_EDGES[:-1], PRICE_EDGES[1:]))
+                    if (lo is None or a >= lo) and (hi is None or b <= hi)]
+            m &= np.isin(self.cells['월정료구간'], bins)
+        if sel_branch: m &= np.isin(self.cells['담당부서2'], self._codes_of('담당부서2', sel_branch))
+        if sel_sales: m &= np.isin(self.cells['영업구역정보'], self._codes_of('영업구역정보', sel_sales))
+        return m
+
+    def rollup(self, positions=None, **filters):
+        """셀별 고객수 : positions 가 주어지면 해당 행만 (검색 결과), 아니면 필터 조건 roll-up"""
+        if positions is not None:
+            return np.bincount(self.cell_of_row[positions], minlength=len(self.count))
+        return self.count * self.cell_mask(**filters)
+
+    def by(self, dim, counts, drop_missing=True):
+        """셀별 값 → 차원 라벨별 합계 Series (라벨 순서 유지, 고객수처럼 정수 값이면 int64)"""
+        sums = np.bincount(self.cells[dim], counts, len(self.labels[dim]))
+        if np.issubdtype(np.asarray(counts).dtype, np.integer):
+            sums = sums.astype(np.int64)  # bincount 가중치 합은 float64
+        s = pd.Series(sums, index=self.labels[dim])
+        return s.iloc[1:] if drop_missing else s
@@ -0,0 +1,143 @@
+# === [Bench] 단계별 성능 측정 ===
+# 합성 데이터(ktt/synth.py)를 규모별로 만들고, 화면 없이(headless) 데이터 소스 API 로
+# 로드 → 인덱스 → 필터 → KPI → 차트 집계 → 지도 생성 → 리스트 페이지 단계를 실행해
+# 단계별 소요 시간과 최대 메모리를 보고한다. 월별 신규 데이터 반영 전 회귀 확인용.
+#   python -m ktt.bench --rows 10000 100000 1000000 --backend pandas sqlite --json bench.jsonl
+# 메모리: tracemalloc 최대치 (Python/numpy 할당, pyarrow·SQLite 내부 할당 제외) + 프로세스 RSS 최대치 (Windows 제외).
+# tracemalloc 은 시간 측정에 부하를 더하므로 시간만 볼 때는 --no-trace.
+import argparse
+import json
+import os
+import shutil
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows: 프로세스 RSS 최대치 없이 (tracemalloc 만)
+    resource = None
+
+from ktt.loader import build_new, build_old
+from ktt.map_layer import build_view_map
+from ktt.snapshot import SNAPSHOT_DIR, load_cached
+from ktt.source import FrameSource
+from ktt.sql_backend import SqlSource, ensure_sqlite
+from ktt.synth import write_dataset
+
+BENCH_DIR = '.bench'
+DEFAULT_ROWS = [10000, 100000, 1000000]
+MAP_CENTER, MAP_ZOOM, MAP_THEME = [37.5665, 126.9780], 11, "라이트 (기본)"
+PAGE_ROWS = 100
+
+# 필터 시나리오 (사이드바 조합)
+SCENARIOS = {
+    '전체': {},
+    '지사': dict(sel_branch=['강북']),
+    '유지+30만미만': dict(show_churn=False, sel_price='30만 미만'),
+    '검색': dict(search_txt='서울'),
+    '초성검색': dict(search_txt='ㄱㄴ'),
+}
+
+
+class Recorder:
+    """단계 실행 + 측정 결과 누적"""
+
+    def __init__(self, trace=True, **context):
+        self.trace = trace
+        self.context = context
+        self.records = []
+
+    def run(self, stage, fn, *args, size=None, **kwargs):
+        if self.trace:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] if self.trace else None
+        if self.trace:
+            tracemalloc.stop()
+        rec = dict(self.context, stage=stage, seconds=round(seconds, 4),
+                   peak_mb=round(peak / 2 ** 20, 1) if peak is not None else None,
+                   rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None)
+        if size is not None:
+            rec['size'] = size(result)
+        self.records.append(rec)
+        print(_format(rec), flush=True)
+        return result
+
+
+def _format(rec):
+    peak = f"{rec['peak_mb']:>8.1f}MB" if rec['peak_mb'] is not None else ' ' * 10
+    rss = f"rss {rec['rss_mb']:>8.1f}MB" if rec['rss_mb'] is not None else ''
+    size = f"  → {rec['size']:,}" if 'size' in rec else ''
+    return f"{rec['rows']:>9,} {rec['backend']:<7} {rec['stage']:<24} {rec['seconds']:>9.3f}s {peak} {rss}{size}"
+
+
+def _map_html(src, sel):
+    mode, payload, _ = src.map_view(sel, MAP_CENTER, MAP_ZOOM)
+    return build_view_map(mode, payload, MAP_CENTER, MAP_ZOOM, MAP_THEME).get_root().render()
+
+
+def bench_source(rec, backend):
+    """현재 디렉터리의 db.csv / papp.csv 로 단계 실행 (스냅샷은 매번 새로 생성)"""
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    rec.run('load_old', build_old, 'papp.csv', size=len)
+    if backend == 'sqlite':
+        path = rec.run('load+sqlite_build', ensure_sqlite, 'new', 'db.csv', build_new)
+        src = rec.run('open', SqlSource, path, size=lambda s: s.n_rows)
+    else:
+        rec.run('parse', build_new, 'db.csv', size=len)
+        rec.run('snapshot_write', load_cached, 'new', 'db.csv', build_new)
+        df = rec.run('snapshot_read', load_cached, 'new', 'db.csv', build_new, size=len)
+        src = rec.run('index', FrameSource, df)
+
+    for name, scenario in SCENARIOS.items():
+        scenario = dict(scenario)
+        search_txt = scenario.pop('search_txt', '')
+        sel = rec.run(f'filter[{name}]', src.select, search_txt, **scenario)
+        rec.run(f'kpi[{name}]', src.kpis, sel, size=lambda k: k['rows'])
+        rec.run(f'chart[{name}]', src.chart_counts, sel)
+        rec.run(f'map[{name}]', _map_html, src, sel, size=len)
+        rec.run(f'page[{name}]', src.page, sel, 0, PAGE_ROWS, '합산월정료(KTT+KT)', False, size=len)
+
+
+def run(rows_list, backends, trace=True, template='db.csv', seed=0):
+    template = os.path.abspath(template)
+    home = os.getcwd()
+    records = []
+    for n in rows_list:
+        data_dir = os.path.join(home, BENCH_DIR, str(n))
+        if not os.path.exists(os.path.join(data_dir, 'db.csv')):
+            t0 = time.perf_counter()
+            write_dataset(n, data_dir, template, seed)
+            print(f"생성: {data_dir} ({time.perf_counter() - t0:.1f}s)", flush=True)
+        os.chdir(data_dir)
+        try:
+            for backend in backends:
+                rec = Recorder(trace, rows=n, backend=backend)
+                bench_source(rec, backend)
+                records += rec.records
+        finally:
+            os.chdir(home)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드 데이터 단계별 벤치마크")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--backend', nargs='+', choices=['pandas', 'sqlite'], default=['pandas', 'sqlite'])
+    parser.add_argument('--template', default='db.csv', help="합성 데이터 견본 db.csv")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-trace', action='store_true', help="tracemalloc 메모리 측정 끄기")
+    parser.add_argument('--json', default=None, help="결과 JSON-lines 파일")
+    args = parser.parse_args(argv)
+
+    records = run(args.rows, args.backend, not args.no_trace, args.template, args.seed)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# === [Export] 필터 결과 내보내기 (CSV / XLSX) ===
+# 2026 DB 화면의 현재 필터 결과를 전체 컬럼으로 데이터 소스에서 청크 단위로 읽어 파일에 바로 쓴다.
+#   - CSV : 청크마다 이어 쓰기 (UTF-8 BOM: 엑셀에서 한글이 깨지지 않도록)
+#   - XLSX: openpyxl write-only 모드 (행을 임시 파일로 흘려보냄), 시트 최대 행을 넘으면 다음 시트
+# 작업 메모리는 결과 크기와 무관하게 청크 하나 분량. 파일은 EXPORT_DIR 에 두고 다운로드할 때만 읽는다.
+# 다운로드 버튼을 보여 주는 세션은 실행마다 파일 mtime 을 갱신(keep)하므로, 다음 내보내기 때의 정리는
+# EXPORT_TTL 동안 어느 세션(다른 프로세스 포함)도 보여 주지 않은 파일만 지운다.
+import os
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+EXPORT_DIR = '.export'
+EXPORT_TTL = 60 * 60
+CHUNK_ROWS = 5000
+XLSX_MAX_ROWS = 1048576          # 엑셀 시트당 최대 행 (헤더 포함)
+
+# 형식 → (확장자, MIME)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def write_csv(chunks, path, columns, progress=None):
+    """청크 → CSV (헤더 1회), 쓴 행 수"""
+    n = 0
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+        for chunk in chunks:
+            chunk.to_csv(f, header=False, index=False)
+            n += len(chunk)
+            if progress:
+                progress(n)
+    return n
+
+
+def _xlsx_rows(chunk, illegal):
+    """청크 → openpyxl 행 튜플 (결측 → 빈 칸, 셀에 넣을 수 없는 제어 문자 제거)"""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if not pd.api.types.is_numeric_dtype(chunk[col]) and not pd.api.types.is_datetime64_any_dtype(chunk[col]):
+            chunk[col] = chunk[col].astype(str).where(chunk[col].notna()).str.replace(illegal, '', regex=True)
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return chunk.itertuples(index=False, name=None)
+
+
+def write_xlsx(chunks, path, columns, progress=None):
+    """청크 → XLSX (write-only, 시트당 XLSX_MAX_ROWS 행), 쓴 행 수"""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = Workbook(write_only=True)
+    ws, sheet_rows, n = None, 0, 0
+
+    def new_sheet():
+        sheet = wb.create_sheet('고객목록' if not wb.worksheets else f'고객목록{len(wb.worksheets) + 1}')
+        sheet.append(list(columns))
+        return sheet
+
+    for chunk in chunks:
+        for row in _xlsx_rows(chunk, ILLEGAL_CHARACTERS_RE):
+            if ws is None or sheet_rows >= XLSX_MAX_ROWS:
+                ws, sheet_rows = new_sheet(), 1
+            ws.append(row)
+            sheet_rows += 1
+        n += len(chunk)
+        if progress:
+            progress(n)
+    if ws is None:
+        new_sheet()
+    wb.save(path)
+    return n
+
+
+WRITERS = {'CSV': write_csv, 'XLSX': write_xlsx}
+
+
+class ExportExpired(FileNotFoundError):
+    """다운로드하려는 내보내기 파일이 이미 정리됨"""
+
+
+def keep(path):
+    """세션이 아직 이 파일을 쓰고 있음 (mtime 갱신 → 정리 대상에서 제외), 파일이 남아 있으면 True"""
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+def _cleanup():
+    """EXPORT_TTL 동안 keep 되지 않은 (어느 세션도 보여 주지 않은) 내보내기 파일 삭제"""
+    now = time.time()
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > EXPORT_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def export_rows(source, sel, fmt, sort=None, ascending=True, progress=None, chunk_rows=CHUNK_ROWS, prefix='2026_관리고객'):
+    """필터 결과를 fmt('CSV'|'XLSX') 파일로 : {'path', 'file_name', 'mime', 'rows', 'bytes', 'seconds'}"""
+    ext, mime = FORMATS[fmt]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    _cleanup()
+    path = os.path.join(EXPORT_DIR, f'{uuid.uuid4().hex}.{ext}')
+    t0 = time.perf_counter()
+    try:
+        rows = WRITERS[fmt](source.iter_rows(sel, chunk_rows, sort, ascending), path, source.columns, progress)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {
+        'path': path, 'file_name': f'{prefix}_{datetime.now():%Y%m%d_%H%M}.{ext}', 'mime': mime,
+        'rows': rows, 'bytes': os.path.getsize(path), 'seconds': time.perf_counter() - t0,
+    }
+
+
+def read_file(path):
+    """다운로드 버튼용 (클릭 시에만 읽음), 파일이 정리됐으면 다시 내보내라는 ExportExpired"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise ExportExpired("내보낸 파일이 만료되었습니다. 다시 내보내기 해 주세요.") from None
+
+
+def discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
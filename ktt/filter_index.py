@@ -0,0 +1,116 @@
+# === [Index] 사이드바 필터용 사전 계산 마스크 ===
+# 로드 시점에 지사/영업구역/해지/비고 제외/월정료 구간별 boolean 마스크를 한 번 만들어 두고,
+# 필터 조합은 마스크 AND 연산 후 최종 1회 take 로 처리한다 (전체 프레임 copy 없음).
+import numpy as np
+import pandas as pd
+
+from ktt.search_index import SearchIndex
+
+# 월정료 구간: 라벨 → (하한 이상, 상한 미만)
+PRICE_BUCKETS = {
+    "10만 미만": (None, 100000),
+    "30만 미만": (None, 300000),
+    "50만 이상": (500000, None),
+}
+
+
+def _value_masks(values):
+    """값별 위치 마스크 dict (factorize 1회)"""
+    codes, uniques = pd.factorize(values)
+    return {u: codes == i for i, u in enumerate(uniques)}
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.n = len(df)
+        cols = df.columns
+
+        # 지사 / 영업구역
+        self.branch = _value_masks(df['담당부서2'].to_numpy()) if '담당부서2' in cols else {}
+        # 영업구역 미기재(결측)는 'nan' 문자열로 만들지 않고 선택지에서 제외 (SqlSource 의 IS NOT NULL 과 같게)
+        zones = None
+        if '영업구역정보' in cols:
+            raw = df['영업구역정보']
+            zones = raw.astype(str).where(raw.notna()).to_numpy(object)
+        self.sales = _value_masks(zones) if zones is not None else {}
+
+        # 해지 여부 (유지 = True)
+        self.active = (df['해지여부'] == '유지').to_numpy() if '해지여부' in cols else np.ones(self.n, bool)
+
+        # 비고(관리고객 제외) 미기재 = True
+        if '비고(관리고객 제외)' in cols:
+            note = df['비고(관리고객 제외)']
+            note_str = note.astype(str).str.strip()
+            self.not_excluded = (note.isna() | (note_str == '') | (note_str == 'nan')).to_numpy()
+        else:
+            self.not_excluded = np.ones(self.n, bool)
+
+        # 월정료 구간
+        self.price = {}
+        if '월정료_숫자' in cols:
+            fee = df['월정료_숫자'].to_numpy()
+            for label, (lo, hi) in PRICE_BUCKETS.items():
+                m = np.ones(self.n, bool)
+                if lo is not None: m &= fee >= lo
+                if hi is not None: m &= fee < hi
+                self.price[label] = m
+
+        # 지사별 영업구역 목록 (사이드바 옵션용)
+        self.sales_by_branch = {}
+        if self.branch and zones is not None:
+            known = pd.notna(zones)
+            for b, m in self.branch.items():
+                self.sales_by_branch[b] = set(zones[m & known])
+
+        # 통합 검색 (n-gram / 접두 / 초성)
+        self.search = SearchIndex(df)
+
+    def sales_options(self, sel_branch=None):
+        """선택 지사의 영업구역 (미선택 시 전체) 정렬 목록"""
+        if sel_branch:
+            zones = set()
+            for b in sel_branch: zones |= self.sales_by_branch.get(b, set())
+            return sorted(zones)
+        return sorted(self.sales)
+
+    def _any_of(self, masks, keys):
+        out = np.zeros(self.n, bool)
+        for k in keys:
+            m = masks.get(k)
+            if m is not None: out |= m
+        return out
+
+    def mask(self, exclude_note=False, show_churn=True, sel_price="전체", sel_branch=None, sel_sales=None):
+        m = np.ones(self.n, bool)
+        if exclude_note: m &= self.not_excluded
+        if not show_churn: m &= self.active
+        if sel_price in self.price: m &= self.price[sel_price]
+        if sel_branch: m &= self._any_of(self.branch, sel_branch)
+        if sel_sales: m &= self._any_of(self.sales, sel_sales)
+        return m
+
+    def step_counts(self, exclude_note=False, show_churn=True, sel_price="전체", sel_branch=None, sel_sales=None):
+        """적용된 필터 순서대로 남은 행 수 (mask 와 같은 순서, 계측용)"""
+        steps = [('비고 제외', exclude_note and self.not_excluded),
+                 ('해지 제외', not show_churn and self.active),
+                 ('월정료', self.price.get(sel_price)),
+                 ('지사', sel_branch and self._any_of(self.branch, sel_branch)),
+                 ('영업구역', sel_sales and self._any_of(self.sales, sel_sales))]
+        m = np.ones(self.n, bool)
+        out = {'전체': self.n}
+        for label, step in steps:
+            if step is not None and step is not False and len(step):
+                m &= step
+                out[label] = int(m.sum())
+        return out
+
+    def positions(self, search_txt='', **filters):
+        """필터 조합 결과 행 위치 (검색어가 있으면 검색 점수 순)"""
+        m = self.mask(**filters)
+        if search_txt:
+            hits = self.search.search(search_txt)
+            return hits[m[hits]]
+        return np.flatnonzero(m)
+
+    def select(self, df, search_txt='', **filters):
+        return df.iloc[self.positions(search_txt, **filters)]
@@ -0,0 +1,84 @@
+# === [Geo] 반경 / 최근접 고객 조회용 공간 트리 ===
+# 로드 시점에 유효 좌표로 BallTree(haversine 거리)를 1회 만들어 두고,
+# "기준점에서 N km 이내" 와 "가장 가까운 k 곳" 을 전체 행 스캔 없이 O(log n) 으로 조회한다.
+# scikit-learn 이 없으면 같은 결과를 전체 거리 계산으로 돌려준다 (소용량에서만 쓸 만함).
+# scikit-learn import(약 0.7초)는 트리를 처음 만들 때 한 번 (지도 화면이 아닌 페이지의 기동 비용에서 제외)
+import functools
+
+import numpy as np
+
+EARTH_KM = 6371.0088    # 지구 평균 반지름 (haversine 거리 → km)
+LEAF_SIZE = 40
+
+
+@functools.lru_cache(maxsize=None)
+def _ball_tree():
+    try:
+        from sklearn.neighbors import BallTree
+    except ImportError:  # scikit-learn 없으면 전체 거리 계산
+        return None
+    return BallTree
+
+
+def _haversine(points, q):
+    """라디안 (위도, 경도) 배열과 한 점 사이의 중심각"""
+    dlat = points[:, 0] - q[0]
+    dlng = points[:, 1] - q[1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(points[:, 0]) * np.cos(q[0]) * np.sin(dlng / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """유효 좌표 행의 공간 트리 (ids: 행 식별자 — FrameSource 는 행 위치, SqlSource 는 rowid)"""
+
+    def __init__(self, lat, lng, ids=None):
+        lat, lng = np.asarray(lat, float), np.asarray(lng, float)
+        valid = (lat > 0) & (lng > 0)
+        self.ids = np.flatnonzero(valid) if ids is None else np.asarray(ids)[valid]
+        self.points = np.radians(np.column_stack([lat[valid], lng[valid]]))
+        BallTree = _ball_tree() if len(self.points) else None
+        self.tree = BallTree(self.points, leaf_size=LEAF_SIZE, metric='haversine') if BallTree is not None else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _point(lat, lng):
+        return np.radians([[float(lat), float(lng)]])
+
+    def within(self, lat, lng, km):
+        """기준점에서 km 이내 (ids, 거리 km), 가까운 순"""
+        if not len(self):
+            return self.ids[:0], np.zeros(0)
+        q, r = self._point(lat, lng), km / EARTH_KM
+        if self.tree is not None:
+            ind, dist = self.tree.query_radius(q, r, return_distance=True, sort_results=True)
+            ind, dist = ind[0], dist[0]
+        else:
+            d = _haversine(self.points, q[0])
+            ind = np.flatnonzero(d <= r)
+            ind = ind[np.argsort(d[ind], kind='stable')]
+            dist = d[ind]
+        return self.ids[ind], dist * EARTH_KM
+
+    def nearest(self, lat, lng, k, exclude=()):
+        """기준점에서 가까운 k 곳 (ids, 거리 km), exclude 의 id 는 제외"""
+        exclude = set(exclude)
+        n = min(len(self), k + len(exclude))
+        if n <= 0:
+            return self.ids[:0], np.zeros(0)
+        q = self._point(lat, lng)
+        if self.tree is not None:
+            dist, ind = self.tree.query(q, k=n)
+            ind, dist = ind[0], dist[0]
+        else:
+            d = _haversine(self.points, q[0])
+            ind = np.argsort(d, kind='stable')[:n]
+            dist = d[ind]
+        keep = np.array([i not in exclude for i in self.ids[ind]], bool)
+        return self.ids[ind][keep][:k], dist[keep][:k] * EARTH_KM
+
+
+def radius_zoom(km):
+    """반경 원이 지도 화면(높이 약 500px)에 들어오는 줌 레벨"""
+    return int(np.clip(14 - np.log2(max(km, 0.1)), 8, 16))
@@ -0,0 +1,161 @@
+# === [Ingest] 업로드 파일 변경분(delta) 반영 ===
+# 설정 > DB 파일 업로드: CSV/XLSX 를 청크 단위로 읽어 컬럼을 검증하고,
+# 현재 로드된 데이터와 계약번호 기준으로 비교해 신규/변경/삭제요청 행만 골라낸다.
+# 반영은 해당 계약번호 그룹만 교체 (전체 재파싱 없음) → 스냅샷 교체 → 인덱스는 메모리 프레임에서 재생성.
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from ktt.loader import NEW_COLUMNS, prepare_new
+from ktt.schema import NEW_SCHEMA, compact, usecols
+
+KEY = '계약번호'
+CHUNK_ROWS = 5000
+# 로드 대상 원본 컬럼 (스키마에서 제외된 컬럼은 검증/비교하지 않음)
+COMPARE_COLUMNS = usecols(NEW_SCHEMA, NEW_COLUMNS)
+
+
+def iter_upload(file, name, chunk_rows=CHUNK_ROWS):
+    """업로드 파일 → 원본 DataFrame 청크 (xlsx 는 read-only 모드로 행 스트리밍)"""
+    if name.lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(c).strip() if c is not None else '' for c in next(rows, [])]
+            buf = []
+            for row in rows:
+                buf.append(row)
+                if len(buf) >= chunk_rows:
+                    yield pd.DataFrame(buf, columns=header)
+                    buf = []
+            if buf:
+                yield pd.DataFrame(buf, columns=header)
+        finally:
+            wb.close()
+    else:
+        yield from pd.read_csv(file, chunksize=chunk_rows, encoding='utf-8-sig')
+
+
+def validate_columns(columns):
+    missing = [c for c in COMPARE_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+
+
+def _normalized(df):
+    """비교용 문자열 정규화 (dtype 추론 차이 흡수: 1.0 → 1, 결측 → '')"""
+    out = {}
+    for c in COMPARE_COLUMNS:
+        s = df[c].astype(str).str.strip() if c in df.columns else pd.Series('', index=df.index)
+        out[c] = s.str.replace(r'\.0$', '', regex=True).replace({'nan': '', 'None': '', '<NA>': ''})
+    return pd.DataFrame(out, index=df.index)
+
+
+def row_hashes(df):
+    """원본 컬럼 기준 행 해시 (계약번호 포함)"""
+    return pd.util.hash_pandas_object(_normalized(df), index=False).to_numpy()
+
+
+def _conform(rows, base):
+    """정제된 업로드 행을 base 컬럼/dtype 에 맞춤 (새 값이 생길 수 있는 Categorical 은 apply_delta 에서)"""
+    rows = rows.reindex(columns=base.columns)
+    for c in base.columns:
+        if isinstance(base[c].dtype, pd.CategoricalDtype) and c != '담당부서2':
+            continue
+        if rows[c].dtype != base[c].dtype:
+            try: rows[c] = rows[c].astype(base[c].dtype)
+            except (TypeError, ValueError): pass
+    return rows
+
+
+def _concat(frames, like, ignore_index=False):
+    """빈 조각은 빼고 이어 붙임 (조각마다 dtype 이 다른 컬럼은 object 로 맞춘 뒤)
+    빈/전부 결측 조각이 결과 dtype 을 정하지 않도록 : pandas 버전에 따라 결과가 달라지지 않음"""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return like.iloc[:0]
+    mixed = {c: object for c in frames[0].columns if len({f[c].dtype for f in frames}) > 1}
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True) if ignore_index else frames[0]
+    return pd.concat([f.astype(mixed) for f in frames], ignore_index=ignore_index)
+
+
+def diff_upload(base, chunks, progress=None):
+    """업로드 청크와 base 비교 → 변경분 dict
+    rows: 교체할 계약번호 그룹의 새 행 전체, replace_keys: base 에서 지울 계약번호,
+    inserted/updated/deleted: 계약번호 목록 (deleted = 변경요청이 새로 '삭제' 가 된 계약), unchanged: 동일 계약 수"""
+    base_keys = base[KEY].astype(str)
+    base_h = row_hashes(base)
+    # 행 해시 → base 위치 (동일 행은 base 행을 재사용하므로 업로드 쪽 사본은 보관하지 않음)
+    first_pos = pd.Series(np.arange(len(base))).groupby(base_h).first()
+    hash_index = pd.Index(first_pos.index)
+
+    kept, matched_pos, keys, n_rows = [], [], [], 0
+    for i, chunk in enumerate(chunks):
+        if i == 0: validate_columns(chunk.columns)
+        chunk = prepare_new(chunk)
+        pos = hash_index.get_indexer(row_hashes(chunk))
+        kept.append(chunk[pos < 0])
+        matched_pos.append(first_pos.to_numpy()[pos[pos >= 0]])
+        keys.append(chunk[KEY].astype(str))
+        n_rows += len(chunk)
+        if progress: progress(n_rows)
+    if not keys:
+        raise ValueError("업로드 파일에 데이터가 없습니다.")
+
+    kept = _concat(kept, base)
+    matched_pos = np.concatenate(matched_pos)
+    up_count = pd.concat(keys).value_counts()
+    base_count = base_keys.value_counts()
+
+    # 계약 그룹 비교: base 에 없는 행이 하나라도 있으면 변경 (그룹 전체를 업로드 행으로 교체)
+    # 행이 모두 base 와 같으면 일부 행만 올라온 경우라도 동일로 본다 (정정 파일은 부분 목록)
+    in_base = up_count.index.isin(base_count.index)
+    inserted = up_count.index[~in_base]
+    existing = up_count.index[in_base]
+    changed = set(kept[KEY].astype(str)) & set(existing)
+
+    new_rows = _concat([kept, base.iloc[matched_pos]], base)
+    new_keys = new_rows[KEY].astype(str)
+    new_rows = new_rows[new_keys.isin(changed | set(inserted))]
+
+    # 변경요청이 새로 '삭제' 가 된 계약
+    was_deleted = set(base_keys[base['변경요청'].astype(str).str.strip() == '삭제'])
+    now_deleted = set(new_rows[KEY].astype(str)[new_rows['변경요청'].astype(str).str.strip() == '삭제'])
+    deleted = sorted((now_deleted & changed) - was_deleted)
+
+    return {
+        'rows': _conform(new_rows, base),
+        'replace_keys': sorted(changed),
+        'inserted': sorted(inserted),
+        'updated': sorted(changed - set(deleted)),
+        'deleted': deleted,
+        'unchanged': len(existing) - len(changed),
+        'n_rows': n_rows,
+    }
+
+
+def apply_delta(base, delta):
+    """base 에서 교체 대상 계약 그룹을 빼고 새 행을 붙인 뒤 지사 순서로 정렬"""
+    keep = ~base[KEY].astype(str).isin(delta['replace_keys'])
+    merged = _concat([base[keep], delta['rows']], base, ignore_index=True)
+    if '담당부서2' in merged.columns:
+        merged['담당부서2'] = merged['담당부서2'].astype(base['담당부서2'].dtype)
+        merged = merged.sort_values('담당부서2', kind='stable')
+    # 카테고리가 달라 object 로 풀린 컬럼을 다시 스키마 dtype 으로
+    return compact(merged.reset_index(drop=True), NEW_SCHEMA)
+
+
+def upload_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_delta(file, name, base, progress=None):
+    """업로드 파일 객체 → 변경분 (파일 내용 해시 포함)"""
+    data = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+    delta = diff_upload(base, iter_upload(io.BytesIO(data), name), progress)
+    delta['sha256'] = upload_digest(data)
+    return delta
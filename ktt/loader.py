@@ -0,0 +1,106 @@
+# === [Data] 원본 파일 탐색 및 전처리 ===
+# app.py 의 load_data 에서 분리한 파싱/정제 로직 (스냅샷 캐시와 공유)
+import os
+import pandas as pd
+
+from ktt.schema import NEW_SCHEMA, OLD_SCHEMA, usecols, parse_dtypes, plain_strings, compact
+
+OLD_FILES = ['papp.csv', 'papp.xlsx']
+NEW_FILES = ['db.csv']
+
+# db.csv 원본 컬럼 (업로드 파일 검증 기준)
+NEW_COLUMNS = [
+    '구분', '관리고객명', '담당부서', '담당부서2', '변경요청', '변경사유', 'BM', '합산월정료(KTT+KT)',
+    '비고(관리고객 제외)', '관리본부명', '관리지사명', '고객번호', '고객명', '계약번호', '계약자명',
+    '서비스번호', '서비스(소)', '상호', '영업구역정보', '기술구역정보', '구역정보', '설치주소', '제외사유',
+    '위도', '경도', '시', '군구', '읍면동', '위치좌표(위도,경도)', '지도링크_URL', '지도링크',
+]
+
+# 지사 정렬 순서
+BRANCH_ORDER = ['중앙', '강북', '서대문', '고양', '의정부', '남양주', '강릉', '원주']
+
+
+def find_source(candidates):
+    """후보 파일 중 처음 존재하는 경로 (없으면 None)"""
+    for fname in candidates:
+        if os.path.exists(fname):
+            return fname
+    return None
+
+
+def read_source(path, schema=None):
+    """원본 파일 읽기 (schema 지정 시 제외 컬럼은 읽지 않고, csv 는 pyarrow 엔진 우선)"""
+    if not path.endswith('.csv'):
+        df = pd.read_excel(path)
+        return df[usecols(schema, df.columns)] if schema else df
+    if schema is None:
+        return pd.read_csv(path)
+    cols = usecols(schema, pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns)
+    dtypes = parse_dtypes(schema, cols)
+    try:
+        df = pd.read_csv(path, usecols=cols, dtype=dtypes, engine='pyarrow', encoding='utf-8-sig')
+    except (ImportError, ValueError):
+        df = pd.read_csv(path, usecols=cols, dtype=dtypes, encoding='utf-8-sig')
+    return plain_strings(df, dtypes)
+
+
+def build_old(path):
+    """papp 원본 → 정제 + 스키마 dtype"""
+    return compact(clean_old(read_source(path, OLD_SCHEMA)), OLD_SCHEMA)
+
+
+def build_new(path):
+    """db 원본 → 정제 + 스키마 dtype"""
+    return compact(clean_new(read_source(path, NEW_SCHEMA)), NEW_SCHEMA)
+
+
+def prepare_new(df):
+    """업로드 청크 등 이미 읽은 db 형식 df → build_new 와 같은 결과 형식"""
+    return compact(clean_new(df[usecols(NEW_SCHEMA, df.columns)].copy()), NEW_SCHEMA)
+
+
+def clean_old(df):
+    """기존 데이터 (papp.csv) 정제"""
+    if '구분' in df.columns: df = df[df['구분'] != '소계']
+    for c in ['대상', '해지', '해지율']:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c].astype(str).str.replace(r'[,%]', '', regex=True), errors='coerce').fillna(0)
+    if '유지(방어)율' not in df.columns and '해지율' in df.columns:
+        df['유지(방어)율'] = 100 - df['해지율']
+    return df
+
+
+def clean_new(df):
+    """2026 DB (db.csv) 정제"""
+    for c in ['위도', '경도']:
+        if c in df.columns: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+
+    if '합산월정료(KTT+KT)' in df.columns:
+        df['월정료_숫자'] = pd.to_numeric(df['합산월정료(KTT+KT)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+
+    if '계약번호' in df.columns:
+        df['계약번호'] = df['계약번호'].astype(str).str.replace(r'\.0$', '', regex=True)
+
+    # 해지 여부 (변경요청 기반)
+    if '변경요청' not in df.columns: df['변경요청'] = ''
+    df['해지여부'] = df['변경요청'].apply(lambda x: '해지예정' if str(x).strip() == '삭제' else '유지')
+
+    # 비고(제외) 확인용 컬럼
+    if '비고(관리고객 제외)' not in df.columns: df['비고(관리고객 제외)'] = None
+
+    # 주소 병합
+    if '군구' in df.columns and '읍면동' in df.columns:
+        df['주소(지역)'] = df['군구'].fillna('') + ' ' + df['읍면동'].fillna('')
+    else:
+        df['주소(지역)'] = df['설치주소']
+
+    if '지도링크_URL' not in df.columns:
+        df['지도링크_URL'] = ''
+
+    # 지사명 정제 및 정렬
+    if '담당부서2' in df.columns:
+        df['담당부서2'] = df['담당부서2'].astype(str).str.replace('지사', '')
+        df['담당부서2'] = pd.Categorical(df['담당부서2'], categories=BRANCH_ORDER, ordered=True)
+        df = df.sort_values('담당부서2')
+
+    return df
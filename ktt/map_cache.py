@@ -0,0 +1,123 @@
+# === [Map] 만든 지도 LRU 캐시 ===
+# 같은 화면(지사 pill 하나, 월정료 '전체', 지도 테마 3종 등)을 여러 사용자가 반복해서 보므로
+# 지도 조회(map_view) + folium.Map 생성 결과를 필터·테마·중심·줌의 정규화된 시그니처로 보관하고,
+# 다시 요청되면 조회/생성 없이 공개 API st_folium 으로 출력한다.
+#   - 항목 수(MAX_ENTRIES)와 바이트(MAX_BYTES, 지도를 만든 데이터 크기 기준) LRU 축출, 프로세스 내 모든 세션이 공유
+#   - 데이터 버전(스냅샷 시그니처)이 바뀌면 전체 폐기
+# folium / streamlit-folium 은 지도를 처음 출력할 때 import (캐시 조회·통계만 쓰는 화면은 로드하지 않음)
+import copy
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from ktt.search_index import normalize
+
+MAX_ENTRIES = 128
+MAX_BYTES = 64 * 1024 * 1024
+
+# 기본값과 같은 필터는 시그니처에서 제외 (pill 해제 None 과 '전체' 등을 같은 화면으로)
+FILTER_DEFAULTS = {'exclude_note': False, 'show_churn': True, 'sel_price': '전체'}
+
+
+@functools.lru_cache(maxsize=None)
+def _st_folium():
+    from streamlit_folium import st_folium
+    return st_folium
+
+
+def map_signature(sel, theme, center, zoom, target_keys=()):
+    """지도 화면 식별자: 검색어/필터/반경 (선택 행 지도면 선택 행 키) + 테마 + 중심(소수 5자리) + 줌"""
+    parts = {'theme': theme, 'center': [round(float(c), 5) for c in center], 'zoom': int(zoom),
+             'near': [round(float(v), 6) for v in sel.near] if sel.near else None}
+    if target_keys:
+        parts['target'] = sorted(str(k) for k in target_keys)
+    else:
+        filters = {}
+        for k, v in sel.filters.items():
+            if isinstance(v, (list, tuple, set)):
+                v = sorted(v)
+            if v is None or v == [] or (k in FILTER_DEFAULTS and v == FILTER_DEFAULTS[k]):
+                continue
+            filters[k] = v
+        parts['q'] = normalize(sel.search_txt or '')
+        parts['filters'] = filters
+    text = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def show_map(m, key=None, height=500, width="100%", returned_objects=None, on_change=None):
+    """캐시된 folium.Map 을 st_folium 으로 출력
+    st_folium 은 출력하면서 요소 id 를 바꾸므로 매번 사본을 넘긴다: 캐시 원본은 그대로 두어
+    출력할 때마다 같은 스크립트/컴포넌트 키가 되고, 여러 세션이 같은 지도를 동시에 출력해도 안전"""
+    return _st_folium()(copy.deepcopy(m), key=key, height=height, width=width,
+                        returned_objects=returned_objects, on_change=on_change)
+
+
+def data_bytes(payload):
+    """지도를 만든 데이터(마커 행 / 셀 집계) 크기 : 캐시 항목의 바이트 기준"""
+    return int(payload.memory_usage(deep=True).sum())
+
+
+def html_bytes(m):
+    """지도 문서 HTML 크기 (사본을 한 번 렌더링, 계측 표본 실행에서만 사용)"""
+    return len(copy.deepcopy(m).get_root().render().encode())
+
+
+class MapCache:
+    """데이터 버전별 LRU (항목 수 / 바이트 상한), 스레드 안전"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._items = OrderedDict()   # 시그니처 → (값, 바이트)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._items.clear()
+            self.nbytes = 0
+            self.version = version
+
+    def get(self, version, key):
+        with self._lock:
+            self._check_version(version)
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, version, key, value, nbytes):
+        with self._lock:
+            self._check_version(version)
+            if nbytes > self.max_bytes:
+                return
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._items[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._items) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, n) = self._items.popitem(last=False)
+                self.nbytes -= n
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._items), 'bytes': self.nbytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,186 @@
+# === [Map] 고객 위치 지도 생성 ===
+# 소량(상세) 모드: 행별 folium Marker + 팝업 (기존 방식)
+# 대량(bulk) 모드: 전체 포인트를 하나의 압축 배열로 내려보내고
+#   브라우저에서 클러스터링 (FastMarkerCluster), 팝업은 클릭 시점에 생성
+# 격자(grid) 모드: 서버에서 집계한 셀(spatial_grid)만 원으로 표시
+import json
+
+import numpy as np
+import folium
+from folium.plugins import FastMarkerCluster, MarkerCluster, MiniMap, Fullscreen
+from folium.features import DivIcon
+
+# 이 건수를 넘으면 bulk 모드
+BULK_THRESHOLD = 50
+
+CHURN_COLOR = {'해지예정': '#ef4444', '유지': '#2563eb'}
+
+
+def tile_for_theme(map_theme):
+    if "다크" in map_theme: return "cartodbdark_matter"
+    if "상세" in map_theme: return "openstreetmap"
+    return "cartodbpositron"
+
+
+def _codes(series):
+    """문자열 컬럼 → (정수 코드 리스트, 값 목록) : 반복 문자열을 1회만 전송"""
+    values = series.astype(str)
+    uniques = list(dict.fromkeys(values))
+    lookup = {v: i for i, v in enumerate(uniques)}
+    return [lookup[v] for v in values], uniques
+
+
+def _col(df, name, default='-'):
+    return df[name].astype(str) if name in df.columns else [default] * len(df)
+
+
+# 클릭 시점에 팝업 HTML 생성 (row: [위도, 경도, 해지, 상호, 고객명, 지사코드, 월정료, 주소코드, 구역코드])
+_CALLBACK = """
+var callback = (function () {
+    var L_BRANCH = %(branches)s, L_ADDR = %(addrs)s, L_ZONE = %(zones)s;
+    var esc = function (s) {
+        return String(s).replace(/[&<>"']/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+        });
+    };
+    return function (row) {
+        var color = row[2] ? '%(churn)s' : '%(active)s';
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+            radius: 7, color: color, fillColor: color, fillOpacity: 0.8, weight: 1
+        });
+        marker.bindTooltip(esc(row[3]));
+        marker.bindPopup(function () {
+            return '<div style="font-family:\\'Pretendard\\',sans-serif; width:220px;">'
+                + '<h5 style="margin:0; color:#4f46e5; border-bottom:1px solid #eee; padding-bottom:5px;">' + esc(row[4]) + '</h5>'
+                + '<div style="font-size:12px; margin-top:5px; color:#374151;">'
+                + '<b>지사:</b> ' + esc(L_BRANCH[row[5]]) + '<br>'
+                + '<b>월정료:</b> ' + esc(row[6]) + '<br>'
+                + '<b>주소:</b> ' + esc(L_ADDR[row[7]]) + '<br>'
+                + "<span style='color:#9ca3af; font-size:11px;'>" + esc(L_ZONE[row[8]]) + '</span>'
+                + '</div></div>';
+        }, {maxWidth: 250});
+        return marker;
+    };
+})();
+"""
+
+
+def bulk_payload(df):
+    """bulk 모드 전송 데이터 (포인트 배열, 콜백 JS)"""
+    branch_codes, branches = _codes(_col(df, '담당부서2'))
+    addr_codes, addrs = _codes(_col(df, '주소(지역)'))
+    zone_codes, zones = _codes(_col(df, '영업구역정보'))
+    rows = list(zip(
+        df['위도'].astype(float).round(6).tolist(),
+        df['경도'].astype(float).round(6).tolist(),
+        (df['해지여부'] == '해지예정').astype(int).tolist(),
+        _col(df, '상호'),
+        _col(df, '관리고객명'),
+        branch_codes,
+        _col(df, '합산월정료(KTT+KT)'),
+        addr_codes,
+        zone_codes,
+    ))
+    callback = _CALLBACK % {
+        'branches': json.dumps(branches, ensure_ascii=False),
+        'addrs': json.dumps(addrs, ensure_ascii=False),
+        'zones': json.dumps(zones, ensure_ascii=False),
+        'churn': CHURN_COLOR['해지예정'],
+        'active': CHURN_COLOR['유지'],
+    }
+    return [list(r) for r in rows], callback
+
+
+def _add_detail_markers(m, df, map_theme):
+    """소량 모드: 행별 Marker + 팝업 (10건 이하는 상호 라벨 표시)"""
+    mc = m if len(df) <= 5 else MarkerCluster().add_to(m)
+
+    for _, row in df.iterrows():
+        is_churn = row['해지여부'] == '해지예정'
+        color = 'red' if is_churn else 'blue'
+
+        if len(df) <= 10:
+            shadow = "none" if "다크" in map_theme else "1px 1px 0 #fff"
+            folium.map.Marker(
+                [row['위도'], row['경도']],
+                icon=DivIcon(
+                    icon_size=(150,36),
+                    icon_anchor=(75, -10),
+                    html=f'<div style="font-size: 11px; font-weight: bold; color: {color}; text-align: center; text-shadow: {shadow};">{row["상호"]}</div>',
+                )
+            ).add_to(m)
+
+        popup_html = f"""
+        <div style="font-family:'Pretendard',sans-serif; width:220px;">
+            <h5 style="margin:0; color:#4f46e5; border-bottom:1px solid #eee; padding-bottom:5px;">
+                {row['관리고객명']}
+            </h5>
+            <div style="font-size:12px; margin-top:5px; color:#374151;">
+                <b>지사:</b> {row['담당부서2']}<br>
+                <b>월정료:</b> {row['합산월정료(KTT+KT)']}<br>
+                <b>주소:</b> {row['주소(지역)']}<br>
+                <span style='color:#9ca3af; font-size:11px;'>{row.get('영업구역정보','-')}</span>
+            </div>
+        </div>
+        """
+        folium.Marker(
+            [row['위도'], row['경도']],
+            popup=folium.Popup(popup_html, max_width=250),
+            tooltip=f"{row['상호']}",
+            icon=folium.Icon(color=color, icon='info-sign')
+        ).add_to(mc)
+
+
+def _base_map(center, zoom, map_theme):
+    m = folium.Map(location=center, zoom_start=zoom, tiles=tile_for_theme(map_theme))
+    MiniMap(toggle_display=True).add_to(m)
+    Fullscreen().add_to(m)
+    return m
+
+
+def build_map(df, center, zoom, map_theme, bulk=None):
+    """좌표가 유효한 df 로 folium.Map 생성 (bulk=None 이면 건수로 자동 선택)"""
+    m = _base_map(center, zoom, map_theme)
+
+    if bulk is None: bulk = len(df) > BULK_THRESHOLD
+    if bulk:
+        data, callback = bulk_payload(df)
+        FastMarkerCluster(data, callback=callback, chunkedLoading=True).add_to(m)
+    else:
+        _add_detail_markers(m, df, map_theme)
+    return m
+
+
+def build_grid_map(cells, center, zoom, map_theme):
+    """SpatialGrid.cells 집계 결과로 folium.Map 생성 (셀당 원 1개, 해지 비율로 색상)"""
+    m = _base_map(center, zoom, map_theme)
+    if cells.empty:
+        return m
+    radius = 8 + 22 * np.sqrt(cells['고객수'] / cells['고객수'].max())
+    churn_ratio = cells['해지예정'] / cells['고객수']
+    for lat, lng, r, cnt, churn, fee, ratio in zip(
+        cells['위도'], cells['경도'], radius, cells['고객수'], cells['해지예정'], cells['월정료합계'], churn_ratio
+    ):
+        color = CHURN_COLOR['해지예정'] if ratio >= 0.2 else CHURN_COLOR['유지']
+        folium.CircleMarker(
+            [lat, lng], radius=float(r), color=color, fill=True, fill_color=color, fill_opacity=0.55, weight=1,
+            tooltip=f"고객 {cnt:,}곳 · 해지예정 {churn:,}곳 · 월정료 {fee/10000:,.0f}만원",
+        ).add_to(m)
+    return m
+
+
+def build_view_map(mode, payload, center, zoom, map_theme):
+    """SqlSource/FrameSource.map_view 결과 → folium.Map ('cells' 는 격자, 'markers' 는 개별/bulk 마커)"""
+    if mode == 'cells':
+        return build_grid_map(payload, center, zoom, map_theme)
+    return build_map(payload, center, zoom, map_theme)
+
+
+def add_radius(m, lat, lng, km):
+    """반경 검색 기준점 + 반경 원 표시"""
+    color = '#4f46e5'
+    folium.Circle([lat, lng], radius=km * 1000, color=color, weight=2, fill=True, fill_opacity=0.05,
+                  tooltip=f"반경 {km:g}km").add_to(m)
+    folium.CircleMarker([lat, lng], radius=6, color=color, fill=True, fill_color=color, fill_opacity=1,
+                        tooltip="반경 검색 기준").add_to(m)
+    return m
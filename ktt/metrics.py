@@ -0,0 +1,250 @@
+# === [Metrics] 실행(rerun)별 단계 계측 ===
+# 스크립트 실행 1회(또는 fragment 재실행 1회)마다 단계별 소요 시간, 캐시 hit/miss,
+# 필터 단계별 행 수, 전송 payload 크기(지도 HTML / 리스트 / 차트)를 기록한다.
+# 기록은 프로세스 단위 순환 이력(HISTORY_SIZE)에 쌓이며 설정 페이지에서 조회하고
+# JSON-lines 또는 Prometheus 텍스트 파일(node_exporter textfile collector 형식)로 내보낼 수 있다.
+# KTT_METRICS_FILE 환경변수가 있으면 실행이 끝날 때마다 해당 파일에 JSON 한 줄씩 추가한다.
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from ktt.snapshot import tmp_path
+
+HISTORY_SIZE = 500
+# 측정 자체가 비싼 항목 (차트 JSON 직렬화, 필터 단계별 행 수) 은 이 횟수 중 1회만 측정
+PAYLOAD_SAMPLE = 20
+METRICS_DIR = '.metrics'
+LOG_ENV = 'KTT_METRICS_FILE'
+
+_history = deque(maxlen=HISTORY_SIZE)
+_totals = Counter()          # 프로세스 시작 후 누적 (실행 수, 캐시 hit/miss)
+_samples = Counter()         # 항목별 sampled() 호출 수
+_lock = threading.Lock()
+_local = threading.local()   # 스크립트 스레드별 진행 중인 실행
+
+
+class Run:
+    def __init__(self, kind, **labels):
+        self.kind = kind
+        self.labels = labels
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.seconds = None
+        self.stages = {}
+        self.cache = {}
+        self.rows = {}
+        self.bytes = {}
+
+    @property
+    def finished(self):
+        return self.seconds is not None
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def to_dict(self):
+        return {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'kind': self.kind, **self.labels,
+            'seconds': round(self.seconds, 4) if self.seconds is not None else None,
+            'stages': {k: round(v, 4) for k, v in self.stages.items()},
+            'cache': dict(self.cache), 'rows': dict(self.rows), 'bytes': dict(self.bytes),
+        }
+
+
+def current():
+    return getattr(_local, 'run', None)
+
+
+def begin_run(kind, **labels):
+    """새 실행 시작 (같은 스레드에서 끝나지 않은 이전 실행은 먼저 마감: st.stop 등)"""
+    end_run()
+    _local.run = Run(kind, **labels)
+    return _local.run
+
+
+def end_run():
+    run = current()
+    if run is None or run.finished:
+        return run
+    run.seconds = time.perf_counter() - run._t0
+    record = run.to_dict()
+    with _lock:
+        _history.append(record)
+        _totals[('runs', run.kind)] += 1
+        for name, result in run.cache.items():
+            _totals[('cache', name, result)] += 1
+    path = os.environ.get(LOG_ENV)
+    if path:
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError:
+            pass
+    return run
+
+
+@contextmanager
+def scope(kind, **labels):
+    """fragment 용: 전체 실행 중이면 그 실행에 기록, fragment 단독 재실행이면 별도 실행으로 기록"""
+    run = current()
+    if run is not None and not run.finished:
+        yield run
+        return
+    run = begin_run(kind, **labels)
+    try:
+        yield run
+    finally:
+        end_run()
+
+
+def scoped(kind):
+    """함수 전체를 scope(kind) 로 감싸는 데코레이터 (@st.fragment 아래에 사용)"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with scope(kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+@contextmanager
+def stage(name):
+    run = current()
+    if run is None or run.finished:
+        yield None
+        return
+    with run.stage(name):
+        yield run
+
+
+@contextmanager
+def cache(name):
+    """캐시된 함수 호출 구간: 함수 본문에서 cache_miss(name) 가 불리지 않으면 hit"""
+    run = current()
+    if run is not None and not run.finished:
+        run.cache[name] = 'hit'
+    yield
+
+
+def cache_miss(name):
+    run = current()
+    if run is not None and not run.finished:
+        run.cache[name] = 'miss'
+
+
+def rows(counts):
+    run = current()
+    if run is not None and not run.finished:
+        run.rows.update(counts)
+
+
+def payload(name, nbytes):
+    run = current()
+    if run is not None and not run.finished:
+        run.bytes[name] = run.bytes.get(name, 0) + int(nbytes)
+
+
+def sampled(name, every=PAYLOAD_SAMPLE):
+    """name 항목을 이번에 측정할지 (진행 중인 실행이 있을 때 every 회 중 1회, 첫 호출 포함)"""
+    run = current()
+    if run is None or run.finished:
+        return False
+    with _lock:
+        n = _samples[name]
+        _samples[name] = n + 1
+    return n % every == 0
+
+
+# --- 조회 / 내보내기 ---
+def history():
+    with _lock:
+        return list(_history)
+
+
+def clear():
+    with _lock:
+        _history.clear()
+
+
+def stage_summary(records=None):
+    """단계별 실행 수 / 평균 / p50 / p95 / 최대 (ms)"""
+    samples = {}
+    for r in records if records is not None else history():
+        for name, sec in r['stages'].items():
+            samples.setdefault(name, []).append(sec * 1000)
+        if r['seconds'] is not None:
+            samples.setdefault(f"({r['kind']})", []).append(r['seconds'] * 1000)
+    out = []
+    for name, v in samples.items():
+        v = np.asarray(v)
+        out.append({'단계': name, '횟수': len(v), '평균(ms)': round(v.mean(), 1), 'p50(ms)': round(np.percentile(v, 50), 1),
+                    'p95(ms)': round(np.percentile(v, 95), 1), '최대(ms)': round(v.max(), 1)})
+    return sorted(out, key=lambda r: -r['평균(ms)'] * r['횟수'])
+
+
+def to_jsonl(records=None):
+    return ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in (records if records is not None else history()))
+
+
+def _label(v):
+    return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(records=None):
+    """Prometheus 텍스트 형식: 단계 시간 summary (이력 기준), 누적 실행/캐시 counter, 최근 행 수/payload gauge"""
+    records = records if records is not None else history()
+    lines = ['# HELP ktt_stage_seconds Stage duration over the recorded rerun history',
+             '# TYPE ktt_stage_seconds summary']
+    samples = {}
+    for r in records:
+        for name, sec in r['stages'].items():
+            samples.setdefault(name, []).append(sec)
+    for name, v in sorted(samples.items()):
+        v = np.asarray(v)
+        for q in (0.5, 0.95):
+            lines.append(f'ktt_stage_seconds{{stage="{_label(name)}",quantile="{q}"}} {np.quantile(v, q):.6f}')
+        lines.append(f'ktt_stage_seconds_sum{{stage="{_label(name)}"}} {v.sum():.6f}')
+        lines.append(f'ktt_stage_seconds_count{{stage="{_label(name)}"}} {len(v)}')
+
+    with _lock:
+        totals = dict(_totals)
+    lines += ['# HELP ktt_runs_total Script runs since process start', '# TYPE ktt_runs_total counter']
+    lines += [f'ktt_runs_total{{kind="{_label(k[1])}"}} {n}' for k, n in sorted(totals.items()) if k[0] == 'runs']
+    lines += ['# HELP ktt_cache_total Cache lookups since process start', '# TYPE ktt_cache_total counter']
+    lines += [f'ktt_cache_total{{cache="{_label(k[1])}",result="{k[2]}"}} {n}' for k, n in sorted(totals.items()) if k[0] == 'cache']
+
+    # 행 수는 필터 단계가 기록된 마지막 실행, payload 는 종류별 마지막 값
+    last_rows = next((r['rows'] for r in reversed(records) if r['rows']), {})
+    last_bytes = {}
+    for r in records:
+        last_bytes.update(r['bytes'])
+    lines += ['# HELP ktt_filter_rows Rows remaining after each filter step (latest run)', '# TYPE ktt_filter_rows gauge']
+    lines += [f'ktt_filter_rows{{step="{_label(k)}"}} {v}' for k, v in last_rows.items()]
+    lines += ['# HELP ktt_payload_bytes Payload size sent to the browser (latest run)', '# TYPE ktt_payload_bytes gauge']
+    lines += [f'ktt_payload_bytes{{payload="{_label(k)}"}} {v}' for k, v in last_bytes.items()]
+    return '\n'.join(lines) + '\n'
+
+
+def export(kind, path=None):
+    """이력을 파일로 저장 ('jsonl' 또는 'prom'), 저장 경로 반환 (저장마다 별도 임시 파일 → 원자적 교체)"""
+    path = path or os.path.join(METRICS_DIR, 'history.jsonl' if kind == 'jsonl' else 'ktt.prom')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    text = to_jsonl() if kind == 'jsonl' else to_prometheus()
+    tmp = tmp_path(path)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
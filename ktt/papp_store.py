@@ -0,0 +1,203 @@
+# === [Store] 월별 papp 스냅샷 저장소 (기존 대시보드) ===
+# papp/ 폴더의 월별 파일(파일명에 연월: papp_2025-03.csv, papp202503.xlsx 등)을 월 단위 파티션으로 적재한다.
+#   - 파티션: 월별 정제 결과 Arrow 파일 (.snapshot/papp/<연월>-<해시>.arrow), 선택한 월만 memory-map 으로 읽음
+#   - 롤업: 적재 시점에 구분 / 구분×구역 단위 대상·해지 합계를 계산해 rollup.arrow 하나에 모아 둠
+#     → 해지율/방어율은 비율 평균이 아니라 대상 가중 (Σ해지 / Σ대상), 추이 차트는 롤업만 읽음
+#   - 카탈로그(catalog.json): 월 → 원본 (경로, 크기, mtime, 해시), 바뀐 파일만 다시 적재
+# papp/ 폴더가 없으면 기존 papp.csv 한 개를 고정 라벨(SINGLE_MONTH)의 파티션으로 사용한다.
+import glob
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from ktt.loader import OLD_FILES, build_old, find_source
+from ktt.snapshot import SNAPSHOT_DIR, _write_json, build_lock, file_hash, read_snapshot, stat_signature, write_snapshot
+
+PAPP_DIR = 'papp'
+STORE_DIR = os.path.join(SNAPSHOT_DIR, 'papp')
+# 정제 로직(loader.clean_old)이나 롤업 형식이 바뀌면 올려서 전체 재적재
+STORE_VERSION = 2
+ROLLUP_KEYS = ['월', '구분', '구역']
+PARTITION_CACHE = 12      # 메모리에 보관하는 원본 파티션 수 (최근 조회 순)
+# 연월 없는 papp.csv 한 개일 때의 월 라벨 (파일 mtime 은 복사/checkout 때마다 바뀌므로 쓰지 않음)
+SINGLE_MONTH = '현재'
+
+_MONTH = re.compile(r'(20\d{2})[-_.]?(0[1-9]|1[0-2])(?!\d)')
+
+
+def month_of(path):
+    """파일명의 연월 'YYYY-MM' (없으면 None)"""
+    m = _MONTH.search(os.path.basename(path))
+    return f'{m.group(1)}-{m.group(2)}' if m else None
+
+
+def discover(papp_dir=PAPP_DIR):
+    """월 → 원본 경로 (papp/ 의 연월 파일, 같은 월이 여러 개면 최근 수정 파일).
+    없으면 papp.csv 한 개 (파일명에 연월이 없으면 SINGLE_MONTH)"""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(papp_dir, '*.csv')) + glob.glob(os.path.join(papp_dir, '*.xlsx'))):
+        month = month_of(path)
+        if month and (month not in sources or os.path.getmtime(path) > os.path.getmtime(sources[month])):
+            sources[month] = path
+    if not sources:
+        path = find_source(OLD_FILES)
+        if path:
+            sources[month_of(path) or SINGLE_MONTH] = path
+    return dict(sorted(sources.items()))
+
+
+def store_signature(sources):
+    """st.cache 키: 월별 원본 (경로, 크기, mtime)"""
+    return tuple((month, stat_signature(path)) for month, path in sources.items())
+
+
+def with_rates(df):
+    """대상/해지 합계 → 가중 해지율·방어율 (%)"""
+    df = df.copy()
+    rate = (df['해지'] / df['대상'].where(df['대상'] > 0)).fillna(0) * 100
+    df['해지율'] = rate
+    df['유지(방어)율'] = 100 - rate
+    return df
+
+
+def rollup_month(df, month):
+    """한 달 파티션 → 구분×구역 / 구분 단위 대상·해지 합계 (구분 단위는 구역 = '')"""
+    branch = df.groupby('구분', observed=True, sort=True)[['대상', '해지']].sum().reset_index().assign(구역='')
+    if '구역' in df.columns:
+        zone = df.assign(구역=df['구역'].astype(str)).groupby(['구분', '구역'], observed=True, sort=True)[['대상', '해지']].sum()
+        out = pd.concat([branch, zone.reset_index()], ignore_index=True)
+    else:
+        out = branch
+    out['구분'] = out['구분'].astype(str)
+    out[['대상', '해지']] = out[['대상', '해지']].astype('int64')
+    out.insert(0, '월', month)
+    return out[ROLLUP_KEYS + ['대상', '해지']]
+
+
+class PappStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.catalog = self._read_catalog()
+        self._rollup = None
+        # 세션 간 공유 (st.cache_resource) : 파티션 LRU 는 잠금 안에서만 변경
+        self._partitions = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- 적재 ---
+    def _read_catalog(self):
+        empty = {'version': STORE_VERSION, 'months': {}}
+        try:
+            with open(os.path.join(self.root, 'catalog.json'), encoding='utf-8') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        # 롤업 파일이 없으면 전체 재적재
+        if catalog.get('version') != STORE_VERSION or not os.path.exists(os.path.join(self.root, 'rollup.arrow')):
+            return empty
+        return catalog
+
+    def _fresh(self, entry, path):
+        """카탈로그 항목이 원본과 일치하는지 (mtime 만 바뀐 경우 해시로 재확인)"""
+        if not entry or entry.get('source') != path or not os.path.exists(os.path.join(self.root, entry['file'])):
+            return False
+        st_ = os.stat(path)
+        if entry.get('size') != st_.st_size:
+            return False
+        if entry.get('mtime_ns') == st_.st_mtime_ns:
+            return True
+        if entry.get('sha256') != file_hash(path):
+            return False
+        entry['mtime_ns'] = st_.st_mtime_ns
+        return True
+
+    def sync(self, sources):
+        """원본 목록에 맞춰 바뀐 월만 다시 적재, 빠진 월은 제거 (롤업 파일은 변경이 있을 때만 다시 씀)
+        저장소 갱신은 노드에서 한 프로세스만 (잠금 후 카탈로그를 다시 읽어 다른 프로세스의 적재 결과를 이어 받음)"""
+        with build_lock('catalog', self.root):
+            self.catalog = self._read_catalog()
+            self._rollup = None
+            with self._lock:
+                self._partitions.clear()
+            months = self.catalog['months']
+            rollups = self.rollups() if months else pd.DataFrame(columns=ROLLUP_KEYS + ['대상', '해지'])
+            changed = [m for m in months if m not in sources]
+            for month in changed:
+                months.pop(month)
+            for month, path in sources.items():
+                if self._fresh(months.get(month), path):
+                    continue
+                st_ = os.stat(path)
+                digest = file_hash(path)
+                df = build_old(path)
+                fname = f'{month}-{digest[:16]}.arrow'
+                write_snapshot(df.reset_index(drop=True), os.path.join(self.root, fname))
+                months[month] = {'source': path, 'size': st_.st_size, 'mtime_ns': st_.st_mtime_ns,
+                                 'sha256': digest, 'file': fname, 'rows': len(df)}
+                rollups = pd.concat([rollups[rollups['월'] != month], rollup_month(df, month)], ignore_index=True)
+                with self._lock:
+                    self._partitions.pop(month, None)
+                changed.append(month)
+            if changed:
+                rollups = rollups[rollups['월'].isin(list(months))].sort_values(ROLLUP_KEYS, kind='stable')
+                write_snapshot(rollups.reset_index(drop=True), os.path.join(self.root, 'rollup.arrow'))
+                self._rollup = None
+            self.catalog['months'] = dict(sorted(months.items()))
+            _write_json(os.path.join(self.root, 'catalog.json'), self.catalog)
+            # 카탈로그에 없는 파티션 파일 정리
+            keep = {e['file'] for e in months.values()} | {'rollup.arrow', 'catalog.json'}
+            for name in os.listdir(self.root):
+                if name not in keep and name.endswith('.arrow'):
+                    os.remove(os.path.join(self.root, name))
+            return self
+
+    # --- 조회 ---
+    def months(self):
+        return list(self.catalog['months'])
+
+    def rollups(self):
+        """전체 월 롤업 (월, 구분, 구역, 대상, 해지), 작은 테이블 1회 로드"""
+        if self._rollup is None:
+            self._rollup = read_snapshot(os.path.join(self.root, 'rollup.arrow'))
+        return self._rollup
+
+    def rollup(self, months, level='구분', branches=None):
+        """선택 월의 가중 롤업 : level='구분' (월×구분), '구역' (월×구분×구역), None (월 합계)"""
+        r = self.rollups()
+        r = r[r['월'].isin(months)]
+        r = r[r['구역'] != ''] if level == '구역' else r[r['구역'] == '']
+        if branches is not None:
+            r = r[r['구분'].isin(branches)]
+        if level is None:
+            r = r.groupby('월', sort=True)[['대상', '해지']].sum().reset_index()
+        elif level == '구분':
+            r = r.drop(columns='구역')
+        return with_rates(r.reset_index(drop=True))
+
+    def branches(self, months=None):
+        r = self.rollups()
+        r = r[r['구역'] == ''] if months is None else r[(r['구역'] == '') & r['월'].isin(months)]
+        return sorted(r['구분'].unique())
+
+    def partition(self, month):
+        """한 달 원본 행 (해당 월 파일만 memory-map 으로 읽음, 최근 PARTITION_CACHE 개월 보관, 스레드 안전)"""
+        with self._lock:
+            df = self._partitions.get(month)
+            if df is not None:
+                self._partitions.move_to_end(month)
+                return df
+        entry = self.catalog['months'][month]
+        df = read_snapshot(os.path.join(self.root, entry['file']))
+        with self._lock:
+            # 읽는 동안 다른 세션이 넣었으면 그 프레임을 사용
+            df = self._partitions.setdefault(month, df)
+            self._partitions.move_to_end(month)
+            while len(self._partitions) > PARTITION_CACHE:
+                self._partitions.popitem(last=False)
+        return df
+
+    def nbytes(self):
+        return sum(os.path.getsize(os.path.join(self.root, e['file'])) for e in self.catalog['months'].values())
@@ -0,0 +1,131 @@
+# === [Schema] 컬럼 스키마 (파싱 dtype / 저장 dtype / 제외 컬럼) ===
+# 값: 최종 dtype (None = 로드하지 않음)
+#   'category' : 반복되는 저카디널리티 문자열
+#   'str'      : 고유값이 많은 문자열
+#   'float32'  : 좌표 (약 1m 정밀도)
+#   'int64' 등 : 정수
+import numpy as np
+import pandas as pd
+
+# db.csv
+NEW_SCHEMA = {
+    '구분': 'category',
+    '관리고객명': 'str',
+    '담당부서': 'category',
+    '담당부서2': 'category',          # 정제 후 지사 순서 Categorical
+    '변경요청': 'category',
+    '변경사유': 'str',
+    'BM': 'category',
+    '합산월정료(KTT+KT)': 'str',      # 화면 표시용 원문 (숫자는 월정료_숫자)
+    '비고(관리고객 제외)': 'category',
+    '관리본부명': 'category',
+    '관리지사명': 'category',
+    '고객번호': 'Int64',
+    '고객명': 'str',
+    '계약번호': 'str',
+    '계약자명': 'str',
+    '서비스번호': 'str',
+    '서비스(소)': 'category',
+    '상호': 'str',
+    '영업구역정보': 'category',
+    '기술구역정보': 'category',
+    '구역정보': 'category',
+    '설치주소': 'str',
+    '제외사유': 'category',
+    '위도': 'float32',
+    '경도': 'float32',
+    '시': 'category',
+    '군구': 'category',
+    '읍면동': 'category',
+    '위치좌표(위도,경도)': None,      # 위도/경도 중복
+    '지도링크_URL': 'str',
+    '지도링크': None,                 # 고정 문구 ('길찾기')
+    # 파생 컬럼
+    '월정료_숫자': 'int64',
+    '해지여부': 'category',
+    '주소(지역)': 'category',
+}
+
+# papp.csv
+OLD_SCHEMA = {
+    '구분': 'category',
+    '구역': 'category',
+    '대상': 'int32',
+    '해지': 'int32',
+    '해지율': 'float32',
+    '유지(방어)율': 'float32',
+}
+
+
+def usecols(schema, header):
+    """파일 헤더 중 로드할 컬럼 (스키마에 없는 컬럼도 제외)"""
+    return [c for c in header if schema.get(c) is not None]
+
+
+def parse_dtypes(schema, columns):
+    """파싱 단계 dtype : 문자열 계열은 nullable 문자열로, 숫자는 정제(to_numeric) 단계에서 변환
+    ('str' 은 pandas 2.x + pyarrow 엔진에서 빈 칸을 'None' 문자열로 읽으므로 사용하지 않음)"""
+    return {c: 'string' for c in columns if schema.get(c) in ('str', 'category')}
+
+
+def plain_strings(df, dtypes):
+    """파싱된 nullable 문자열 컬럼 → object (결측은 NaN, 정제 단계가 기대하는 기존 read_csv 와 같은 표현)"""
+    for c in dtypes:
+        if c in df.columns:
+            df[c] = df[c].astype(object).where(df[c].notna())
+    return df
+
+
+def _arrow_string_dtype():
+    """Arrow 버퍼 문자열 dtype (결측 NaN, 비교 결과는 numpy bool → object 문자열과 같은 사용법), pyarrow 없으면 None"""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)      # pandas >= 2.3
+    except TypeError:
+        pass
+    except ImportError:
+        return None
+    try:
+        return pd.StringDtype('pyarrow_numpy')                 # pandas 2.1 / 2.2
+    except (ImportError, ValueError):
+        return None
+
+
+ARROW_STRING = _arrow_string_dtype()
+
+
+def arrow_strings(obj):
+    """object 문자열 → Arrow 문자열 (값/오프셋 버퍼 몇 개, 행마다 Python 객체 없음)
+    DataFrame 이면 문자열만 든 object 컬럼을, 배열이면 배열 전체를 변환 (pyarrow 가 없으면 그대로)"""
+    if ARROW_STRING is None:
+        return obj
+    if isinstance(obj, pd.DataFrame):
+        cols = [c for c in obj.columns
+                if obj[c].dtype == object and pd.api.types.infer_dtype(obj[c], skipna=True) in ('string', 'empty')]
+        return obj.astype({c: ARROW_STRING for c in cols}) if cols else obj
+    return pd.array(np.asarray(obj, dtype=object), dtype=ARROW_STRING)
+
+
+def compact(df, schema):
+    """정제가 끝난 df 를 스키마 최종 dtype 으로 변환 (이미 Categorical 인 컬럼은 유지)"""
+    for c, dtype in schema.items():
+        if c not in df.columns or dtype is None or str(df[c].dtype) == dtype:
+            continue
+        if dtype == 'category':
+            if not isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype('category')
+        elif dtype == 'str':
+            df[c] = df[c].astype(str).where(df[c].notna())
+        else:
+            try: df[c] = df[c].astype(dtype)
+            except (TypeError, ValueError): pass
+    return df.drop(columns=[c for c, dtype in schema.items() if dtype is None and c in df.columns])
+
+
+def memory_report(df):
+    """컬럼별 메모리 사용량 (KB, 큰 순)"""
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({
+        '컬럼': usage.index,
+        'dtype': [str(df[c].dtype) for c in usage.index],
+        '메모리(KB)': (usage.to_numpy() / 1024).round(1),
+    }).sort_values('메모리(KB)', ascending=False, ignore_index=True)
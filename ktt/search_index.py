@@ -0,0 +1,155 @@
+# === [Index] 통합 검색 인덱스 ===
+# 로드 시점에 검색 대상 필드(고객명/상호/계약번호/설치주소)의 고유 문자열별
+#   - 1/2-gram 포스팅 (부분 일치)
+#   - 정렬 배열 (접두 일치, searchsorted)
+#   - 초성 변환 문자열 (고객명/상호, 'ㅂㄹㅇ' 같은 초성 검색)
+# 을 만들어 두고, 질의는 포스팅 교집합 + 후보 검증만 수행한다 (전체 프레임 스캔 없음).
+# 결과는 (필드 가중치 × 일치 유형) 점수 순으로 정렬된 행 위치.
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+from ktt.schema import arrow_strings
+
+# 검색 필드 → 가중치
+SEARCH_FIELDS = {'관리고객명': 4, '상호': 3, '계약번호': 3, '설치주소': 1}
+# 초성 검색 필드 → 가중치
+CHOSUNG_FIELDS = {'관리고객명': 2, '상호': 2}
+# 일치 유형 점수
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+_CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSUNG_TABLE = {0xAC00 + i: _CHOSUNG[i // 588] for i in range(11172)}
+_JAMO = re.compile('[ㄱ-ㅎ]')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """검색 비교용 정규화 (소문자, 공백 제거)"""
+    return _SPACE.sub('', str(text)).lower()
+
+
+def to_chosung(text):
+    """한글 음절 → 초성 (그 외 문자는 그대로)"""
+    return text.translate(_CHOSUNG_TABLE)
+
+
+def _grams(s):
+    return set(s) | {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+class _FieldIndex:
+    """단일 필드: 고유 문자열 → 행 그룹, n-gram 포스팅, 접두 정렬 배열
+    문자열은 Arrow 문자열, 포스팅은 gram 정렬 배열 + 연결된 id 배열 + 오프셋 (공유 캐시에서 버퍼째 memory-map)"""
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        uniques = np.asarray(uniques, dtype=object)
+        self.codes = codes
+        self.uniques = arrow_strings(uniques)
+
+        # 고유 문자열별 행 목록 (order[start[u]:start[u+1]])
+        self.order = np.argsort(codes, kind='stable')
+        self.start = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(uniques)))])
+
+        # gram (1~2 글자) → 고유 문자열 id 목록 : post_ids[post_start[i]:post_start[i+1]] 가 grams[i] 의 목록
+        postings = {}
+        for uid, s in enumerate(uniques):
+            for g in _grams(s):
+                postings.setdefault(g, []).append(uid)
+        self.grams = np.asarray(sorted(postings), dtype='<U2')
+        lists = [postings[g] for g in self.grams]
+        self.post_start = np.concatenate([[0], np.cumsum([len(u) for u in lists])]).astype(np.int64)
+        self.post_ids = np.fromiter((u for ids in lists for u in ids), np.int32, int(self.post_start[-1]))
+
+        self.sorted_ids = np.argsort(uniques, kind='stable')
+        self.sorted_vals = arrow_strings(uniques[self.sorted_ids])
+
+    def posting(self, g):
+        """gram 의 고유 문자열 id 배열 (없으면 None)"""
+        i = np.searchsorted(self.grams, g)
+        if i == len(self.grams) or self.grams[i] != g:
+            return None
+        return self.post_ids[self.post_start[i]:self.post_start[i + 1]]
+
+    def prefix(self, q):
+        # 정렬 배열 이분 탐색 (Arrow 배열도 원소 조회만으로)
+        lo = bisect.bisect_left(self.sorted_vals, q)
+        hi = bisect.bisect_left(self.sorted_vals, q + '\U0010ffff', lo)
+        return self.sorted_ids[lo:hi]
+
+    def substring(self, q):
+        grams = [q] if len(q) == 1 else [q[i:i + 2] for i in range(len(q) - 1)]
+        lists = sorted((self.posting(g) for g in set(grams)), key=lambda a: -1 if a is None else len(a))
+        if lists[0] is None:
+            return np.empty(0, np.int32)
+        cand = lists[0]
+        for arr in lists[1:]:
+            cand = np.intersect1d(cand, arr, assume_unique=True)
+            if not len(cand): return cand
+        if len(q) <= 2:
+            return cand
+        return cand[pd.Series(self.uniques[cand]).str.contains(q, regex=False).to_numpy(bool)]
+
+    def rows(self, uids):
+        """고유 문자열 id 들 → 행 위치 (id 순서대로 펼침)"""
+        lengths = self.start[uids + 1] - self.start[uids]
+        offsets = np.repeat(self.start[uids] - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return self.order[offsets + np.arange(lengths.sum())]
+
+    def match(self, q):
+        """(행 위치, 일치 유형 점수)"""
+        uids = np.union1d(self.prefix(q), self.substring(q)).astype(np.int64)
+        if not len(uids):
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        vals = pd.Series(self.uniques[uids])
+        kind = np.where((vals == q).to_numpy(bool), EXACT,
+                        np.where(vals.str.startswith(q).to_numpy(bool), PREFIX, SUBSTRING))
+        rows = self.rows(uids)
+        return rows, np.repeat(kind, self.start[uids + 1] - self.start[uids])
+
+
+class SearchIndex:
+    def __init__(self, df):
+        self.n = len(df)
+        self.fields = {}
+        for col, w in SEARCH_FIELDS.items():
+            if col in df.columns:
+                self.fields[col] = (_FieldIndex(df[col].fillna('').astype(str).map(normalize).to_numpy(object)), w)
+        self.chosung = {}
+        for col, w in CHOSUNG_FIELDS.items():
+            if col in self.fields:
+                base = self.fields[col][0]
+                chosung = np.asarray([to_chosung(s) for s in base.uniques], dtype=object)
+                self.chosung[col] = (_FieldIndex(chosung[base.codes]), w)
+
+    def search(self, query, k=None):
+        """질의에 일치하는 행 위치 (점수 내림차순, 동점은 원래 순서), k 지정 시 상위 k 개"""
+        q = normalize(query)
+        if not q:
+            return np.arange(self.n) if k is None else np.arange(min(k, self.n))
+
+        targets = list(self.fields.values())
+        if _JAMO.search(q):
+            # 초성이 섞인 질의 → 초성 필드에서 초성 변환 질의로
+            q = to_chosung(q)
+            targets = list(self.chosung.values())
+
+        all_rows, all_scores = [np.empty(0, np.int64)], [np.empty(0, np.int64)]
+        for index, weight in targets:
+            rows, kind = index.match(q)
+            all_rows.append(rows)
+            all_scores.append(kind * weight)
+        rows, scores = np.concatenate(all_rows), np.concatenate(all_scores)
+        if not len(rows):
+            return rows
+
+        # 행별 최고 점수 → 점수 내림차순 정렬
+        order = np.lexsort((-scores, rows))
+        rows, scores = rows[order], scores[order]
+        first = np.concatenate([[True], rows[1:] != rows[:-1]])
+        rows, scores = rows[first], scores[first]
+        ranked = rows[np.lexsort((rows, -scores))]
+        return ranked if k is None else ranked[:k]
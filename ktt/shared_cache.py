@@ -0,0 +1,128 @@
+# === [Cache] 프로세스 간 공유 데이터 캐시 ===
+# 여러 Streamlit 프로세스(로드밸런서 뒤 worker)가 정제된 DataFrame 과 파생 인덱스
+# (FrameSource: 필터 마스크, 검색 포스팅, 지도 격자, 차트 큐브, 공간 트리)를 한 벌만 만들고 함께 쓴다.
+#   - 한 프로세스만 빌드 (파일 잠금), 나머지는 기다렸다가 결과 파일에 attach
+#   - 파일 = pickle(protocol 5) 본문 + out-of-band 버퍼 (INBAND_BYTES 이상인 numpy/Arrow 배열 메모리)
+#     attach 는 파일을 memory-map 하고 out-of-band 배열을 그 위의 읽기 전용 view 로 복원,
+#     같은 노드의 프로세스들은 이 배열들을 OS 페이지 캐시의 같은 물리 메모리로 공유한다.
+#     공유되는 것: 숫자/카테고리 코드 컬럼, 문자열 컬럼(Arrow 문자열로 변환해 저장), 행 키, 인덱스 배열
+#       (필터 마스크, 검색 고유 문자열/포스팅, 격자, 큐브, 공간 트리)
+#     프로세스마다 새로 만들어지는 것: pickle 본문 (객체 구조, 카테고리 값, 작은 배열 · 수 MB 이하)과
+#       attach 후 처음 쓸 때 만드는 보조 구조 (pandas 해시 테이블, 정렬 순위 등)
+#   - 버전 = 스냅샷 파일 이름 (원본 해시 + 반영된 변경분 수) : 데이터가 바뀌면 새 이름으로 쓰고
+#     이전 파일은 스냅샷 정리 때 삭제 (이미 attach 한 프로세스는 그대로 읽다가 다음 조회 때 새 버전으로)
+import json
+import mmap
+import os
+import pickle
+import struct
+
+from ktt.schema import arrow_strings
+from ktt.snapshot import build_lock, current_snapshot, load_cached, tmp_path
+
+# 공유 대상 클래스(FrameSource 및 인덱스) 구조가 바뀌면 올려서 기존 파일을 폐기
+SHARED_VERSION = 2
+MAGIC = b'KTTSHR01'
+ALIGN = 64                 # 버퍼 시작 위치 정렬 (SIMD/캐시 라인)
+INBAND_BYTES = 4096        # 이보다 작은 버퍼는 pickle 본문에 포함 (작은 배열 다수로 인한 헤더 비대 방지)
+_HEADER = struct.Struct('<8sQ')   # MAGIC, 헤더 JSON 길이
+
+
+def shared_path(snapshot):
+    """스냅샷 파일 경로 → 공유 캐시 파일 경로 (같은 이름 .shared)"""
+    return os.path.splitext(snapshot)[0] + '.shared'
+
+
+def _aligned(n):
+    return n + (-n % ALIGN)
+
+
+def publish(obj, path):
+    """obj 를 공유 캐시 파일로 저장 (임시 파일에 쓴 뒤 원자적 교체)
+    형식: MAGIC | 헤더 길이 | 헤더 JSON {version, spans} | (정렬) 데이터 영역 [pickle 본문, 버퍼...]"""
+    buffers = []
+
+    def out_of_band(buf):
+        # 반환값이 참이면 본문에 포함, 거짓이면 별도 버퍼로
+        if buf.raw().nbytes < INBAND_BYTES:
+            return True
+        buffers.append(buf.raw())
+        return False
+
+    body = pickle.dumps(obj, protocol=5, buffer_callback=out_of_band)
+    chunks = [memoryview(body)] + buffers
+    spans, offset = [], 0          # 데이터 영역 기준 (시작, 길이)
+    for data in chunks:
+        offset = _aligned(offset)
+        spans.append((offset, data.nbytes))
+        offset += data.nbytes
+    header = json.dumps({'version': SHARED_VERSION, 'spans': spans}).encode()
+    base = _aligned(_HEADER.size + len(header))
+
+    tmp = tmp_path(path)
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for (at, _), data in zip(spans, chunks):
+            f.write(b'\0' * (base + at - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def attach(path):
+    """공유 캐시 파일 → 객체 (out-of-band 배열은 memory-map 위의 읽기 전용 view, 본문만 새로 생성)
+    형식/버전이 다르면 ValueError"""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    magic, header_len = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"공유 캐시 파일 형식이 아닙니다: {path}")
+    header = json.loads(bytes(view[_HEADER.size:_HEADER.size + header_len]))
+    if header.get('version') != SHARED_VERSION:
+        raise ValueError(f"공유 캐시 버전이 다릅니다: {path}")
+    base = _aligned(_HEADER.size + header_len)
+    (body_at, body_len), *spans = header['spans']
+    body = view[base + body_at:base + body_at + body_len]
+    return pickle.loads(body, buffers=[view[base + at:base + at + n] for at, n in spans])
+
+
+def shared_file(name, source):
+    """현재 원본에 대응하는 공유 캐시 파일 경로 (없으면 None)"""
+    snapshot = current_snapshot(name, source)
+    path = shared_path(snapshot) if snapshot else None
+    return path if path and os.path.exists(path) else None
+
+
+def _try_attach(name, source):
+    path = shared_file(name, source)
+    if path is None:
+        return None
+    try:
+        return attach(path)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        return None  # 손상/구버전 → 재빌드
+
+
+def load_shared(name, source, build, make):
+    """현재 원본의 make(df) 결과 (공유 파일이 있으면 attach, 없으면 잠금 후 한 프로세스가 빌드/저장)
+    df 의 문자열 컬럼은 Arrow 문자열로 바꿔 make 에 넘김 (행별 Python 문자열 대신 버퍼로 공유)
+    pyarrow 가 없거나 저장에 실패하면 공유 없이 make(df) 를 그대로 반환"""
+    obj = _try_attach(name, source)
+    if obj is not None:
+        return obj
+    with build_lock(name):
+        # 잠금을 기다리는 동안 다른 프로세스가 만들었으면 attach
+        obj = _try_attach(name, source)
+        if obj is not None:
+            return obj
+        obj = make(arrow_strings(load_cached(name, source, build)))
+        snapshot = current_snapshot(name, source)
+        if snapshot is None:
+            return obj
+        try:
+            publish(obj, shared_path(snapshot))
+            # 빌드한 프로세스도 공유본을 사용 (힙의 사본은 해제)
+            return attach(shared_path(snapshot))
+        except Exception:
+            return obj  # 저장 실패 → 이 프로세스만 사용
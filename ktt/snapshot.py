@@ -0,0 +1,223 @@
+# === [Cache] 전처리 결과 컬럼형 스냅샷 ===
+# 최초 파싱 후 정제된 DataFrame 을 Arrow IPC 파일로 저장하고,
+# 이후 로드는 원본 재파싱 없이 memory-map 으로 읽는다.
+# 스냅샷은 원본 파일의 크기/mtime/내용 해시로 식별되며, 원본이 바뀌면 자동 무효화된다.
+import hashlib
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 없으면 항상 원본 파싱
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 (동시에 빌드될 수 있으나 결과는 같음)
+    fcntl = None
+
+SNAPSHOT_DIR = '.snapshot'
+# 전처리 로직(loader.clean_*)이 바뀌면 올려서 기존 스냅샷을 폐기
+SNAPSHOT_VERSION = 3
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stat_signature(path):
+    """st.cache_data 키용 경량 시그니처 (경로, 크기, mtime)"""
+    if not path or not os.path.exists(path):
+        return None
+    st_ = os.stat(path)
+    return (path, st_.st_size, st_.st_mtime_ns)
+
+
+def snapshot_signature(name, path):
+    """stat_signature + 적용된 변경분(delta) 수 : 업로드 반영 시에도 캐시 미스"""
+    sig = stat_signature(path)
+    if sig is None:
+        return None
+    manifest = _read_manifest(name)
+    applied = len(manifest.get('deltas', [])) if manifest and manifest.get('source') == path else 0
+    return sig + (applied,)
+
+
+def applied_deltas(name):
+    """현재 스냅샷에 반영된 업로드 변경분 이력"""
+    manifest = _read_manifest(name)
+    return manifest.get('deltas', []) if manifest else []
+
+
+def _manifest_path(name):
+    return os.path.join(SNAPSHOT_DIR, f'{name}.json')
+
+
+def _read_manifest(name):
+    try:
+        with open(_manifest_path(name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+_held = threading.local()   # 이 스레드가 잡고 있는 잠금 이름 (중첩 호출은 다시 잠그지 않음)
+
+
+@contextmanager
+def build_lock(name, directory=SNAPSHOT_DIR):
+    """같은 데이터의 빌드/저장은 노드에서 한 프로세스·스레드만 (나머지는 대기)
+    스냅샷 → SQLite / 공유 캐시처럼 잠금 안에서 다시 잠그는 호출은 그대로 통과"""
+    lock = os.path.join(directory, f'{name}.lock')
+    held = getattr(_held, 'locks', None)
+    if held is None:
+        held = _held.locks = set()
+    if fcntl is None or lock in held:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(lock, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        held.add(lock)
+        try:
+            yield
+        finally:
+            held.discard(lock)
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def tmp_path(path):
+    """원자적 교체용 임시 파일 경로 (프로세스/스레드마다 다른 이름)"""
+    return f'{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp'
+
+
+def _write_json(path, obj):
+    tmp = tmp_path(path)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _fresh(manifest, source):
+    """매니페스트가 현재 원본과 일치하는지 (mtime 만 바뀐 경우 해시로 재확인)"""
+    if not manifest or manifest.get('version') != SNAPSHOT_VERSION or manifest.get('source') != source:
+        return False
+    if not os.path.exists(source):
+        return False
+    if not os.path.exists(os.path.join(SNAPSHOT_DIR, manifest.get('file', ''))):
+        return False
+    st_ = os.stat(source)
+    if manifest.get('size') != st_.st_size:
+        return False
+    if manifest.get('mtime_ns') == st_.st_mtime_ns:
+        return True
+    if manifest.get('sha256') != file_hash(source):
+        return False
+    # 내용은 동일 (touch/복사) → mtime 만 갱신
+    manifest['mtime_ns'] = st_.st_mtime_ns
+    _write_json(_manifest_path(manifest['name']), manifest)
+    return True
+
+
+def read_snapshot(path):
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def write_snapshot(df, path):
+    table = pa.Table.from_pandas(df)
+    tmp = tmp_path(path)
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def load_cached(name, source, build):
+    """스냅샷이 유효하면 memory-map 으로 읽고, 아니면 build(source) 결과를 저장 후 반환"""
+    if pa is None:
+        return build(source)
+
+    manifest = _read_manifest(name)
+    if _fresh(manifest, source):
+        try:
+            return read_snapshot(os.path.join(SNAPSHOT_DIR, manifest['file']))
+        except Exception:
+            pass  # 손상된 스냅샷 → 재생성
+
+    with build_lock(name):
+        # 잠금을 기다리는 동안 다른 프로세스가 만들었으면 그 스냅샷을 읽음
+        manifest = _read_manifest(name)
+        if _fresh(manifest, source):
+            try:
+                return read_snapshot(os.path.join(SNAPSHOT_DIR, manifest['file']))
+            except Exception:
+                pass
+        st_ = os.stat(source)
+        digest = file_hash(source)
+        df = build(source)
+        try:
+            _save(name, df, {
+                'name': name, 'version': SNAPSHOT_VERSION, 'source': source,
+                'size': st_.st_size, 'mtime_ns': st_.st_mtime_ns, 'sha256': digest, 'deltas': [],
+            })
+        except Exception:
+            pass  # 스냅샷 저장 실패는 무시 (다음 로드 때 재시도)
+        return df
+
+
+def current_snapshot(name, source):
+    """현재 원본에 대응하는 스냅샷 파일 경로 (없거나 오래되면 None, 생성하지 않음)"""
+    if pa is None:
+        return None
+    manifest = _read_manifest(name)
+    return os.path.join(SNAPSHOT_DIR, manifest['file']) if _fresh(manifest, source) else None
+
+
+def snapshot_file(name, source, build):
+    """현재 원본에 대응하는 스냅샷 파일 경로 (없거나 오래되면 build 후 저장, 저장 실패 시 None)"""
+    if pa is None:
+        return None
+    path = current_snapshot(name, source)
+    if path is None:
+        load_cached(name, source, build)
+        path = current_snapshot(name, source)
+    return path
+
+
+def _save(name, df, manifest):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # 버전을 파일명에 포함: 버전이 바뀌면 같은 이름의 SQLite / 공유 캐시 파일도 새로 만들어짐
+    fname = f"{name}-v{manifest['version']}-{manifest['sha256'][:16]}-d{len(manifest['deltas'])}.arrow"
+    write_snapshot(df, os.path.join(SNAPSHOT_DIR, fname))
+    _write_json(_manifest_path(name), dict(manifest, file=fname))
+    # 이전 버전 스냅샷 (및 같은 이름의 SQLite / 공유 캐시 파일) 정리
+    # 공유 캐시를 memory-map 중인 다른 프로세스는 삭제된 파일을 계속 읽고, 다음 조회 때 새 버전으로 교체
+    stem = os.path.splitext(fname)[0]
+    for old in os.listdir(SNAPSHOT_DIR):
+        if old.startswith(f'{name}-') and old.endswith(('.arrow', '.sqlite', '.shared')) and not old.startswith(stem + '.'):
+            try:
+                os.remove(os.path.join(SNAPSHOT_DIR, old))
+            except OSError:
+                pass  # 다른 프로세스가 열고 있음 (Windows) → 다음 저장 때 정리
+
+
+def save_delta(name, df, record):
+    """업로드 변경분이 반영된 df 로 스냅샷 교체 (원본 지문은 유지, deltas 에 이력 추가)
+    원본 파일이 바뀌면 스냅샷과 함께 변경분 이력도 폐기된다."""
+    if pa is None:
+        raise RuntimeError("pyarrow 가 없어 변경분을 저장할 수 없습니다.")
+    with build_lock(name):
+        manifest = _read_manifest(name)
+        if not manifest or not _fresh(manifest, manifest.get('source', '')):
+            raise RuntimeError("현재 원본과 일치하는 스냅샷이 없습니다. 데이터를 다시 불러온 뒤 시도하세요.")
+        manifest['deltas'] = manifest.get('deltas', []) + [record]
+        _save(name, df, manifest)
@@ -0,0 +1,206 @@
+# === [Source] 2026 DB 화면용 데이터 소스 ===
+# 화면(app.py)은 필터/KPI/차트/지도/리스트를 이 인터페이스로만 조회한다.
+#   FrameSource : 메모리 DataFrame + 사전 계산 인덱스 (소용량 기본)
+#   SqlSource   : 내장 SQLite 파일에 조건/집계 pushdown (대용량, ktt/sql_backend.py)
+# 백엔드는 원본 크기로 자동 선택하며 KTT_BACKEND=pandas|sqlite 로 고정할 수 있다.
+import os
+
+import numpy as np
+import pandas as pd
+
+from ktt.filter_index import FilterIndex
+from ktt.geo_index import GeoIndex
+from ktt.spatial_grid import SpatialGrid
+from ktt.agg_cube import AggCube
+from ktt.schema import arrow_strings
+
+# 원본(db.csv)이 이 크기 이상이면 SQLite 백엔드 (약 10만 행)
+SQL_MIN_BYTES = 50 * 1024 * 1024
+
+# 차트 차원 (AggCube.DIMS 중 화면에 쓰는 것)
+CHART_DIMS = ['담당부서2', 'BM', '해지여부', '월정료구간', '영업구역정보']
+
+# 리스트 정렬 시 표시 컬럼 → 실제 정렬 기준 컬럼
+SORT_ALIASES = {'합산월정료(KTT+KT)': '월정료_숫자'}
+
+# 지도 마커/팝업에 필요한 컬럼
+MAP_COLUMNS = ['위도', '경도', '해지여부', '상호', '관리고객명', '담당부서2', '합산월정료(KTT+KT)', '주소(지역)', '영업구역정보']
+
+# 최근접 고객 결과의 거리 컬럼
+DISTANCE_COL = '거리(km)'
+
+
+def row_keys(contracts, seen=None):
+    """계약번호 → 행 키 '계약번호#n' (같은 계약번호 안에서 적재 순서 n, seen 은 배치 간 누적 카운터)"""
+    contracts = pd.Series(contracts).astype(str).to_numpy(object)
+    if seen is None:
+        seen = {}
+    keys = np.empty(len(contracts), object)
+    for i, c in enumerate(contracts):
+        n = seen.get(c, 0)
+        keys[i] = f'{c}#{n}'
+        seen[c] = n + 1
+    return keys
+
+
+def choose_backend(source):
+    """'pandas' 또는 'sqlite' (KTT_BACKEND 환경변수 우선, auto 는 원본 크기 기준)"""
+    backend = os.environ.get('KTT_BACKEND', 'auto').lower()
+    if backend in ('pandas', 'sqlite'):
+        return backend
+    if source and os.path.exists(source) and os.path.getsize(source) >= SQL_MIN_BYTES:
+        return 'sqlite'
+    return 'pandas'
+
+
+class Selection:
+    """필터 결과 핸들 (FrameSource = 행 위치, SqlSource = WHERE/ORDER BY 절과 파라미터)"""
+
+    def __init__(self, search_txt, filters, positions=None, where='1', params=(), order='rowid', order_params=(), steps=(),
+                 near=None):
+        self.search_txt = search_txt
+        self.filters = filters
+        # 반경 조건 (위도, 경도, km) 또는 None
+        self.near = near
+        self.positions = positions
+        self.where = where
+        self.params = tuple(params)
+        self.order = order
+        self.order_params = tuple(order_params)
+        # SqlSource: 필터 단계별 (라벨, 조건, 파라미터)
+        self.steps = list(steps)
+        # 정렬 기준별 정렬된 행 위치 (FrameSource, 같은 선택 안에서 페이지 이동 시 재사용)
+        self.sorted = {}
+
+    @property
+    def token(self):
+        """필터/검색 조합 식별자 (리스트 위젯 키, 페이지 초기화 판단용)"""
+        return repr((self.search_txt, sorted(self.filters.items()), self.near))
+
+
+class FrameSource:
+    kind = 'pandas'
+
+    def __init__(self, df):
+        self.df = df
+        self.fidx = FilterIndex(df)
+        self.grid = SpatialGrid(df)
+        self.cube = AggCube(df, self.fidx.not_excluded)
+        self.geo = GeoIndex(self.grid.lat, self.grid.lng)
+        # 행 키는 Arrow 문자열 (공유 캐시에서 행마다 Python 문자열을 만들지 않도록)
+        self.keys = arrow_strings(row_keys(df['계약번호']) if '계약번호' in df.columns else np.arange(len(df)).astype(str))
+        self._key_index = pd.Index(self.keys)
+        self._contract_index = None
+        self._ranks = {}
+
+    @property
+    def n_rows(self):
+        return len(self.df)
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    def branches(self):
+        # 정렬된 순서 유지
+        return list(self.df['담당부서2'].unique()) if '담당부서2' in self.df.columns else []
+
+    def sales_options(self, sel_branch=None):
+        return self.fidx.sales_options(sel_branch)
+
+    def select(self, search_txt='', near=None, **filters):
+        """near: (위도, 경도, km) 이면 기준점 반경 안의 행만 (공간 트리 조회 후 행 위치 교집합)"""
+        pos = self.fidx.positions(search_txt, **filters)
+        if near:
+            pos = pos[np.isin(pos, self.geo.within(*near)[0])]
+        return Selection(search_txt, filters, positions=pos, near=near)
+
+    def filter_steps(self, sel):
+        """필터 단계별 남은 행 수 (반경 조건은 '반경', 검색어가 있으면 마지막에 '검색')"""
+        out = self.fidx.step_counts(**sel.filters)
+        if sel.near:
+            out['반경'] = int(self.fidx.mask(**sel.filters)[self.geo.within(*sel.near)[0]].sum())
+        if sel.search_txt:
+            out['검색'] = len(sel.positions)
+        return out
+
+    def kpis(self, sel):
+        """행 수, 고유 계약 수, 월정료 합계"""
+        pos = sel.positions
+        return {
+            'rows': len(pos),
+            'contracts': int(self.df['계약번호'].iloc[pos].nunique()) if '계약번호' in self.df.columns else 0,
+            'fee': float(self.df['월정료_숫자'].to_numpy()[pos].sum()) if '월정료_숫자' in self.df.columns else 0.0,
+        }
+
+    def chart_counts(self, sel):
+        """차원별 고객수 Series (큐브 roll-up, 검색어가 있으면 검색 결과 행만 집계)"""
+        counts = self.cube.rollup(sel.positions) if sel.search_txt or sel.near else self.cube.rollup(**sel.filters)
+        return {d: self.cube.by(d, counts) for d in CHART_DIMS}
+
+    def map_view(self, sel, center, zoom):
+        """('markers', 마커 행 DataFrame) 또는 ('cells', 셀 집계) 와 유효 좌표 수"""
+        pos = sel.positions
+        mode, payload = self.grid.view(pos, center, zoom)
+        if mode == 'markers':
+            payload = self.df.iloc[payload]
+        return mode, payload, int(self.grid.valid[pos].sum())
+
+    def _rank(self, col):
+        """컬럼 값의 전체 정렬 순위 (결측 = -1, 컬럼별 1회 계산)"""
+        if col not in self._ranks:
+            codes, _ = pd.factorize(self.df[col], sort=True)
+            self._ranks[col] = codes
+        return self._ranks[col]
+
+    def _sorted(self, sel, sort, ascending):
+        if not sort:
+            return sel.positions
+        key = (sort, ascending)
+        if key not in sel.sorted:
+            pos = sel.positions
+            rank = self._rank(SORT_ALIASES.get(sort, sort))[pos]
+            big = np.iinfo(rank.dtype).max
+            # 결측은 방향과 무관하게 마지막, 동순위는 필터 결과 순서 (stable)
+            order_key = np.where(rank < 0, big, rank if ascending else -rank)
+            sel.sorted[key] = pos[np.argsort(order_key, kind='stable')]
+        return sel.sorted[key]
+
+    def page(self, sel, offset=0, limit=100, sort=None, ascending=True):
+        """필터 결과 중 한 페이지 (index = 행 키)"""
+        pos = self._sorted(sel, sort, ascending)[offset:offset + limit]
+        return self.df.iloc[pos].set_axis(pd.Index(self.keys[pos], name='_key'))
+
+    def iter_rows(self, sel, chunk_rows=5000, sort=None, ascending=True):
+        """필터 결과 전체 컬럼을 chunk_rows 행씩 (리스트와 같은 정렬, 청크 분량만 복사)"""
+        pos = self._sorted(sel, sort, ascending)
+        for start in range(0, len(pos), chunk_rows):
+            yield self.df.iloc[pos[start:start + chunk_rows]].reset_index(drop=True)
+
+    def lookup(self, keys):
+        """행 키 → 행 (현재 데이터에 없는 키는 제외)"""
+        pos = self._key_index.get_indexer(list(keys))
+        pos = pos[pos >= 0]
+        return self.df.iloc[pos].set_axis(pd.Index(self.keys[pos], name='_key'))
+
+    def _contract_rows(self, keys):
+        """행 키들과 같은 계약번호의 모든 행 위치 (같은 계약의 다른 행 '계약번호#1' 등 포함)"""
+        pos = self._key_index.get_indexer(list(keys))
+        pos = pos[pos >= 0]
+        if not len(pos) or '계약번호' not in self.df.columns:
+            return pos
+        if self._contract_index is None:
+            self._contract_index = pd.Index(self.df['계약번호'].astype(str).to_numpy(object))
+        found, _ = self._contract_index.get_indexer_non_unique(self._contract_index[pos].unique())
+        return found[found >= 0]
+
+    def nearest(self, lat, lng, k=10, exclude_keys=()):
+        """기준점에서 가까운 k 곳 (index = 행 키, 거리 컬럼 추가, exclude_keys 의 계약번호 행은 모두 제외)"""
+        pos, km = self.geo.nearest(lat, lng, k, self._contract_rows(exclude_keys))
+        rows = self.df.iloc[pos].set_axis(pd.Index(self.keys[pos], name='_key'))
+        return rows.assign(**{DISTANCE_COL: km.round(3)})
+
+
+def valid_points(df):
+    """좌표가 유효한 행만"""
+    return df[(df['위도'].to_numpy(float) > 0) & (df['경도'].to_numpy(float) > 0)] if len(df) else df
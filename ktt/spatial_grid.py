@@ -0,0 +1,104 @@
+# === [Map] 줌 레벨별 공간 격자 집계 ===
+# 로드 시점에 유효 좌표를 웹 메르카토르 타일 격자(레벨별)에 배정해 두고,
+# 현재 필터 결과 + 지도 중심/줌에 대해 격자 셀별 고객수/해지예정/월정료 합계를 반환한다.
+# 충분히 확대되었거나 건수가 적을 때만 개별 마커를 보낸다 → 지도 payload 크기는 고객 수와 무관.
+import numpy as np
+import pandas as pd
+
+MAX_LEVEL = 24          # 좌표 정수화 해상도 (타일 레벨)
+CELL_LEVEL_OFFSET = 2   # 셀 = 타일의 1/4 (약 64px)
+MIN_ZOOM = 5
+DETAIL_ZOOM = 15        # 이 줌 이상이면 화면 영역의 개별 마커 (MARKER_LIMIT 이하일 때)
+MARKER_LIMIT = 1500     # 필터 결과가 이하이면 줌과 무관하게 개별 마커
+MAX_CELLS = 400         # 셀이 더 많으면 한 단계 거친 레벨로
+VIEWPORT = (1400, 500)  # 화면 크기(px) 가정
+VIEW_MARGIN = 1.0       # 화면 바깥 여유 (화면 크기 배수, 각 방향)
+
+
+def tile_xy(lat, lng, level):
+    """위경도 → 해당 레벨 타일 정수 좌표"""
+    n = 2.0 ** level
+    lat_r = np.radians(np.clip(lat, -85.0511, 85.0511))
+    x = (np.asarray(lng, float) + 180.0) / 360.0 * n
+    y = (1.0 - np.log(np.tan(lat_r) + 1.0 / np.cos(lat_r)) / np.pi) / 2.0 * n
+    return np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+
+
+def view_window(center, zoom, level):
+    """화면(+여유) 영역의 셀 좌표 범위 (x0, x1, y0, y1)"""
+    cx, cy = tile_xy(center[0], center[1], level)
+    cell_px = 256 * 2.0 ** (zoom - level)
+    half_w = VIEWPORT[0] * (0.5 + VIEW_MARGIN) / cell_px
+    half_h = VIEWPORT[1] * (0.5 + VIEW_MARGIN) / cell_px
+    return cx - half_w, cx + half_w, cy - half_h, cy + half_h
+
+
+def cell_level(zoom):
+    """지도 줌 → 격자 집계 시작 레벨 (줌은 [MIN_ZOOM, DETAIL_ZOOM) 로 제한)"""
+    zoom = int(min(max(zoom, MIN_ZOOM), DETAIL_ZOOM - 1))
+    return zoom, zoom + CELL_LEVEL_OFFSET
+
+
+class SpatialGrid:
+    def __init__(self, df):
+        self.lat = df['위도'].to_numpy(float)
+        self.lng = df['경도'].to_numpy(float)
+        self.valid = (self.lat > 0) & (self.lng > 0)
+        self.churn = (df['해지여부'] == '해지예정').to_numpy() if '해지여부' in df.columns else np.zeros(len(df), bool)
+        self.fee = df['월정료_숫자'].to_numpy(float) if '월정료_숫자' in df.columns else np.zeros(len(df))
+        self.x, self.y = tile_xy(self.lat, self.lng, MAX_LEVEL)
+
+        # 레벨별 행 → 셀 번호 (무효 좌표 = -1), 셀 정수 좌표
+        self.levels = {}
+        for level in range(MIN_ZOOM + CELL_LEVEL_OFFSET, DETAIL_ZOOM + CELL_LEVEL_OFFSET):
+            shift = MAX_LEVEL - level
+            key = ((self.x >> shift) << 32) | (self.y >> shift)
+            uniq, inv = np.unique(key[self.valid], return_inverse=True)
+            cell = np.full(len(df), -1, np.int32)
+            cell[self.valid] = inv
+            self.levels[level] = (cell, uniq >> 32, uniq & 0xFFFFFFFF)
+
+    def in_view(self, positions, center, zoom):
+        """positions 중 화면 영역 안의 유효 좌표 행"""
+        p = positions[self.valid[positions]]
+        level = int(zoom)
+        x0, x1, y0, y1 = view_window(center, zoom, level)
+        shift = MAX_LEVEL - level
+        x, y = self.x[p] >> shift, self.y[p] >> shift
+        return p[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+
+    def cells(self, positions, center, zoom):
+        """positions 의 화면 영역 셀 집계 (셀 수가 MAX_CELLS 이하가 되는 레벨)"""
+        zoom, level = cell_level(zoom)
+        p = positions[self.valid[positions]]
+        while True:
+            cell, cell_x, cell_y = self.levels[level]
+            ci = cell[p]
+            n = len(cell_x)
+            count = np.bincount(ci, minlength=n)
+            x0, x1, y0, y1 = view_window(center, zoom, level)
+            keep = (count > 0) & (cell_x >= x0) & (cell_x <= x1) & (cell_y >= y0) & (cell_y <= y1)
+            if keep.sum() <= MAX_CELLS or level == min(self.levels):
+                break
+            level -= 1
+
+        out = pd.DataFrame({
+            '위도': np.bincount(ci, self.lat[p], n)[keep] / count[keep],
+            '경도': np.bincount(ci, self.lng[p], n)[keep] / count[keep],
+            '고객수': count[keep],
+            '해지예정': np.bincount(ci, self.churn[p], n)[keep].astype(int),
+            '월정료합계': np.bincount(ci, self.fee[p], n)[keep],
+        })
+        out.attrs['level'] = level
+        return out
+
+    def view(self, positions, center, zoom):
+        """('markers', 행 위치) 또는 ('cells', 셀 집계 DataFrame)"""
+        p = positions[self.valid[positions]]
+        if len(p) <= MARKER_LIMIT:
+            return 'markers', p
+        if zoom >= DETAIL_ZOOM:
+            visible = self.in_view(p, center, zoom)
+            if len(visible) <= MARKER_LIMIT:
+                return 'markers', visible
+        return 'cells', self.cells(p, center, zoom)
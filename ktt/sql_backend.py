@@ -0,0 +1,373 @@
+# === [SQL] 대용량 DB 용 내장 SQLite 백엔드 ===
+# 전처리 스냅샷(.snapshot/*.arrow)을 배치 단위로 SQLite 파일(같은 이름 .sqlite)에 적재하고
+# 지사/영업구역/계약번호/해지여부 인덱스를 만든다. 화면 조회는 모두 SQL 로 pushdown:
+#   사이드바 필터 → WHERE, KPI → COUNT / COUNT(DISTINCT) / SUM, 차트 → GROUP BY 1회,
+#   지도 → 정수 타일 좌표 GROUP BY (격자) 또는 화면 영역 행만, 리스트 → ORDER BY + LIMIT/OFFSET (한 페이지),
+#   내보내기 → 같은 조건/정렬의 커서를 청크 단위로 (fetchmany).
+# 프로세스 메모리에는 전체 행을 올리지 않는다 (적재 시에도 배치 크기만큼).
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from ktt.agg_cube import PRICE_EDGES, price_bin_labels
+from ktt.filter_index import PRICE_BUCKETS
+from ktt.geo_index import GeoIndex
+from ktt.loader import BRANCH_ORDER
+from ktt.schema import NEW_SCHEMA
+from ktt.search_index import SEARCH_FIELDS, CHOSUNG_FIELDS, EXACT, PREFIX, SUBSTRING, _JAMO, normalize, to_chosung
+from ktt.snapshot import build_lock, snapshot_file, tmp_path
+from ktt.source import CHART_DIMS, DISTANCE_COL, MAP_COLUMNS, SORT_ALIASES, Selection, row_keys
+from ktt.spatial_grid import (
+    MAX_LEVEL, MIN_ZOOM, CELL_LEVEL_OFFSET, DETAIL_ZOOM, MARKER_LIMIT, MAX_CELLS, tile_xy, view_window, cell_level,
+)
+
+TABLE = 'customers'
+INDEX_COLUMNS = ['담당부서2', '영업구역정보', '계약번호', '해지여부']
+BATCH_ROWS = 50000
+# 적재 형식(파생 컬럼/인덱스)이 바뀌면 올려서 기존 파일을 재적재 (PRAGMA user_version)
+SQL_VERSION = 2
+
+
+def q(col):
+    """컬럼 식별자 인용 (한글/괄호 포함 컬럼명)"""
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _derived(df, seen):
+    """적재용 파생 컬럼 (_ 접두): 행 키, 비고 제외, 월정료 구간, 정수 타일 좌표, 검색용 정규화/초성 문자열"""
+    out = df.copy()
+    out['_key'] = row_keys(df['계약번호'], seen)
+    if '비고(관리고객 제외)' in df.columns:
+        note = df['비고(관리고객 제외)']
+        note_str = note.astype(str).str.strip()
+        out['_제외'] = (~(note.isna() | (note_str == '') | (note_str == 'nan'))).astype(int).to_numpy()
+    else:
+        out['_제외'] = 0
+    fee = df['월정료_숫자'].to_numpy(float) if '월정료_숫자' in df.columns else np.zeros(len(df))
+    out['_구간'] = np.searchsorted(PRICE_EDGES, fee, side='right') - 1
+
+    lat, lng = df['위도'].to_numpy(float), df['경도'].to_numpy(float)
+    valid = (lat > 0) & (lng > 0)
+    x, y = tile_xy(lat, lng, MAX_LEVEL)
+    out['_gx'] = pd.Series(x, index=df.index, dtype='Int64').where(valid)
+    out['_gy'] = pd.Series(y, index=df.index, dtype='Int64').where(valid)
+
+    for col in SEARCH_FIELDS:
+        if col in df.columns:
+            out[f'_n_{col}'] = df[col].fillna('').astype(str).map(normalize)
+    for col in CHOSUNG_FIELDS:
+        if f'_n_{col}' in out.columns:
+            out[f'_c_{col}'] = out[f'_n_{col}'].map(to_chosung)
+    return out
+
+
+def build_sqlite(arrow_path, db_path, batch_rows=BATCH_ROWS):
+    """스냅샷 → SQLite 파일 (이 빌드만의 임시 파일에 적재 후 교체)"""
+    table = pa.ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+    tmp = tmp_path(db_path)
+    con = sqlite3.connect(tmp)
+    try:
+        con.execute('PRAGMA journal_mode=OFF')
+        con.execute('PRAGMA synchronous=OFF')
+        seen = {}
+        for start in range(0, table.num_rows, batch_rows):
+            batch = _derived(table.slice(start, batch_rows).to_pandas(), seen)
+            batch.to_sql(TABLE, con, if_exists='append', index=False)
+        for col in INDEX_COLUMNS:
+            con.execute(f'CREATE INDEX IF NOT EXISTS {q("ix_" + col)} ON {TABLE} ({q(col)})')
+        con.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS ix__key ON {TABLE} (_key)')
+        con.execute('ANALYZE')
+        con.execute(f'PRAGMA user_version = {SQL_VERSION}')
+        con.commit()
+    except BaseException:
+        con.close()
+        os.remove(tmp)
+        raise
+    con.close()
+    os.replace(tmp, db_path)
+
+
+def ensure_sqlite(name, source, build):
+    """현재 스냅샷에 대응하는 SQLite 파일 경로 (없으면 적재, pyarrow 없으면 None)"""
+    if pa is None:
+        return None
+    arrow_path = snapshot_file(name, source, build)
+    if arrow_path is None:
+        return None
+    db_path = os.path.splitext(arrow_path)[0] + '.sqlite'
+    if _ready(db_path):
+        return db_path
+    # 한 프로세스만 적재 (잠금을 기다리는 동안 다른 프로세스가 만들었으면 그대로 사용)
+    with build_lock(name):
+        if not _ready(db_path):
+            build_sqlite(arrow_path, db_path)
+    return db_path
+
+
+def _ready(db_path):
+    return os.path.exists(db_path) and _user_version(db_path) == SQL_VERSION
+
+
+def _user_version(db_path):
+    con = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        return con.execute('PRAGMA user_version').fetchone()[0]
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        con.close()
+
+
+class SqlSource:
+    kind = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as con:
+            self._columns = [r[1] for r in con.execute(f'PRAGMA table_info({TABLE})')]
+            self._n_rows = con.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0]
+            # 반경/최근접 조회용 공간 트리 (좌표 + rowid 만 1회 읽음)
+            points = np.array(con.execute(
+                f'SELECT rowid, {q("위도")}, {q("경도")} FROM {TABLE} WHERE _gx IS NOT NULL').fetchall(), float).reshape(-1, 3)
+        self.geo = GeoIndex(points[:, 1], points[:, 2], points[:, 0].astype(np.int64))
+
+    def _connect(self):
+        # 조회 전용, 요청 스레드마다 새 연결 (Streamlit 스크립트 스레드 간 공유하지 않음)
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+
+    def _fetch(self, sql, params=()):
+        con = self._connect()
+        try:
+            return con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+
+    def _frame(self, sql, params=()):
+        con = self._connect()
+        try:
+            return pd.read_sql_query(sql, con, params=params)
+        finally:
+            con.close()
+
+    @property
+    def n_rows(self):
+        return self._n_rows
+
+    @property
+    def columns(self):
+        return [c for c in self._columns if not c.startswith('_')]
+
+    def branches(self):
+        present = {r[0] for r in self._fetch(f'SELECT DISTINCT {q("담당부서2")} FROM {TABLE}')}
+        return [b for b in BRANCH_ORDER if b in present]
+
+    def sales_options(self, sel_branch=None):
+        col = q('영업구역정보')
+        where, params = self._in('담당부서2', sel_branch) if sel_branch else ('1', ())
+        rows = self._fetch(f'SELECT DISTINCT {col} FROM {TABLE} WHERE {where} AND {col} IS NOT NULL', params)
+        return sorted(r[0] for r in rows)
+
+    @staticmethod
+    def _in(col, values):
+        return f'{q(col)} IN ({",".join("?" * len(values))})', tuple(values)
+
+    # --- 필터 → WHERE ---
+    def _search(self, search_txt):
+        """검색어 → (WHERE 조건, 점수 식, 파라미터) : SearchIndex 와 같은 점수 (필드 가중치 × 일치 유형)"""
+        s = normalize(search_txt)
+        fields = [(f'_n_{c}', w) for c, w in SEARCH_FIELDS.items()]
+        if _JAMO.search(s):
+            s = to_chosung(s)
+            fields = [(f'_c_{c}', w) for c, w in CHOSUNG_FIELDS.items()]
+        fields = [(c, w) for c, w in fields if c in self._columns]
+        if not fields:
+            return '0', '0', ()
+        cond = ' OR '.join(f'instr({q(c)}, ?) > 0' for c, _ in fields)
+        kinds = [f'(CASE WHEN {q(c)} = ? THEN {EXACT * w} WHEN substr({q(c)}, 1, ?) = ? THEN {PREFIX * w} '
+                 f'WHEN instr({q(c)}, ?) > 0 THEN {SUBSTRING * w} ELSE 0 END)' for c, w in fields]
+        score = kinds[0] if len(kinds) == 1 else f'max({", ".join(kinds)})'
+        cond_params = (s,) * len(fields)
+        score_params = (s, len(s), s, s) * len(fields)
+        return f'({cond})', score, cond_params + score_params
+
+    @staticmethod
+    def _rowids(ids):
+        """rowid 목록 → IN 조건 (JSON 배열 파라미터 1개)"""
+        return 'rowid IN (SELECT value FROM json_each(?))', (json.dumps([int(i) for i in ids]),)
+
+    def select(self, search_txt='', exclude_note=False, show_churn=True, sel_price="전체", sel_branch=None, sel_sales=None,
+               near=None):
+        filters = dict(exclude_note=exclude_note, show_churn=show_churn, sel_price=sel_price,
+                       sel_branch=sel_branch, sel_sales=sel_sales)
+        # (라벨, 조건, 파라미터) : FilterIndex.step_counts 와 같은 순서
+        steps = []
+        if exclude_note: steps.append(('비고 제외', f'{q("_제외")} = 0', ()))
+        if not show_churn: steps.append(('해지 제외', f"{q('해지여부')} = '유지'", ()))
+        if sel_price in PRICE_BUCKETS:
+            lo, hi = PRICE_BUCKETS[sel_price]
+            bounds = ([f'{q("월정료_숫자")} >= {int(lo)}'] if lo is not None else []) + \
+                     ([f'{q("월정료_숫자")} < {int(hi)}'] if hi is not None else [])
+            steps.append(('월정료', ' AND '.join(bounds), ()))
+        for label, col, values in [('지사', '담당부서2', sel_branch), ('영업구역', '영업구역정보', sel_sales)]:
+            if values:
+                steps.append((label,) + self._in(col, values))
+        if near:
+            steps.append(('반경',) + self._rowids(self.geo.within(*near)[0]))
+        order, order_params = 'rowid', ()
+        if normalize(search_txt or ''):
+            cond, score, p = self._search(search_txt)
+            # 점수 식 파라미터는 ORDER BY 에서만 사용
+            n_cond = cond.count('?')
+            steps.append(('검색', cond, p[:n_cond]))
+            order, order_params = f'{score} DESC, rowid', p[n_cond:]
+        where = ' AND '.join(f'({c})' for _, c, _ in steps) or '1'
+        params = [v for _, _, p in steps for v in p]
+        return Selection(search_txt, filters, where=where, params=params,
+                         order=order, order_params=order_params, steps=steps, near=near)
+
+    def filter_steps(self, sel):
+        """필터 단계별 남은 행 수 (누적 조건 SUM, 테이블 1회 스캔)"""
+        exprs, params, conds = [], [], []
+        for label, cond, p in sel.steps:
+            conds.append((cond, p))
+            exprs.append('COALESCE(SUM(' + ' AND '.join(f'({c})' for c, _ in conds) + '), 0)')
+            params.extend(v for _, cp in conds for v in cp)
+        if not exprs:
+            return {'전체': self.n_rows}
+        counts = self._fetch(f'SELECT {", ".join(exprs)} FROM {TABLE}', params)[0]
+        return {'전체': self.n_rows, **{label: int(n) for (label, _, _), n in zip(sel.steps, counts)}}
+
+    # --- 집계 ---
+    def kpis(self, sel):
+        n, contracts, fee = self._fetch(
+            f'SELECT COUNT(*), COUNT(DISTINCT {q("계약번호")}), COALESCE(SUM({q("월정료_숫자")}), 0) '
+            f'FROM {TABLE} WHERE {sel.where}', sel.params)[0]
+        return {'rows': n, 'contracts': contracts, 'fee': float(fee)}
+
+    def chart_counts(self, sel):
+        """차트 차원 GROUP BY 1회 → 차원별 합계 (FrameSource.chart_counts 와 같은 라벨/순서)"""
+        dims = {'담당부서2': q('담당부서2'), 'BM': q('BM'), '해지여부': q('해지여부'),
+                '월정료구간': q('_구간'), '영업구역정보': q('영업구역정보')}
+        cols = ', '.join(dims.values())
+        cells = self._frame(f'SELECT {cols}, COUNT(*) AS n FROM {TABLE} WHERE {sel.where} GROUP BY {cols}', sel.params)
+        cells.columns = list(dims) + ['n']
+        out = {}
+        for d in CHART_DIMS:
+            s = cells.groupby(d, sort=False)['n'].sum()
+            if d == '담당부서2':
+                s = s.reindex(BRANCH_ORDER, fill_value=0)
+            elif d == '월정료구간':
+                s = s.reindex(range(len(PRICE_EDGES) - 1), fill_value=0)
+                s.index = price_bin_labels()
+            out[d] = s.astype(int)
+        return out
+
+    # --- 지도 ---
+    def map_view(self, sel, center, zoom):
+        valid = f'{sel.where} AND _gx IS NOT NULL'
+        n_points = self._fetch(f'SELECT COUNT(*) FROM {TABLE} WHERE {valid}', sel.params)[0][0]
+        cols = ', '.join(q(c) for c in MAP_COLUMNS if c in self._columns)
+        if n_points <= MARKER_LIMIT:
+            return 'markers', self._frame(f'SELECT {cols} FROM {TABLE} WHERE {valid}', sel.params), n_points
+        if zoom >= DETAIL_ZOOM:
+            box, box_params = self._box(center, zoom, int(zoom))
+            visible = self._frame(f'SELECT {cols} FROM {TABLE} WHERE {valid} AND {box} LIMIT {MARKER_LIMIT + 1}',
+                                  sel.params + box_params)
+            if len(visible) <= MARKER_LIMIT:
+                return 'markers', visible, n_points
+        return 'cells', self._cells(valid, sel.params, center, zoom), n_points
+
+    @staticmethod
+    def _box(center, zoom, level):
+        shift = MAX_LEVEL - level
+        x0, x1, y0, y1 = view_window(center, zoom, level)
+        return (f'(_gx >> {shift}) BETWEEN ? AND ? AND (_gy >> {shift}) BETWEEN ? AND ?',
+                (float(x0), float(x1), float(y0), float(y1)))
+
+    def _cells(self, where, params, center, zoom):
+        """SpatialGrid.cells 와 같은 셀 집계 (셀 수가 MAX_CELLS 이하가 되는 레벨)"""
+        zoom, level = cell_level(zoom)
+        while True:
+            shift = MAX_LEVEL - level
+            box, box_params = self._box(center, zoom, level)
+            cells = self._frame(
+                f'SELECT AVG({q("위도")}) AS 위도, AVG({q("경도")}) AS 경도, COUNT(*) AS 고객수, '
+                f"SUM({q('해지여부')} = '해지예정') AS 해지예정, COALESCE(SUM({q('월정료_숫자')}), 0) AS 월정료합계 "
+                f'FROM {TABLE} WHERE {where} AND {box} GROUP BY _gx >> {shift}, _gy >> {shift}',
+                params + box_params)
+            if len(cells) <= MAX_CELLS or level == MIN_ZOOM + CELL_LEVEL_OFFSET:
+                break
+            level -= 1
+        cells.attrs['level'] = level
+        return cells
+
+    # --- 리스트 ---
+    def _sort_expr(self, sort, ascending):
+        """정렬 컬럼 → ORDER BY 식 (결측은 마지막, 지사는 지사 순서)"""
+        col = SORT_ALIASES.get(sort, sort)
+        if col not in self.columns:
+            raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort}")
+        expr = q(col)
+        if col == '담당부서2':
+            expr = 'CASE ' + ' '.join(f"WHEN {q(col)} = '{b}' THEN {i}" for i, b in enumerate(BRANCH_ORDER)) + ' END'
+        return f'({expr}) IS NULL, {expr} {"ASC" if ascending else "DESC"}'
+
+    def _select_rows(self, where, params, tail=''):
+        cols = ', '.join(['_key'] + [q(c) for c in self.columns])
+        return self._frame(f'SELECT {cols} FROM {TABLE} WHERE {where} {tail}', params).set_index('_key')
+
+    def page(self, sel, offset=0, limit=100, sort=None, ascending=True):
+        """필터 결과 중 한 페이지 (index = 행 키, 정렬/페이지 모두 SQL)"""
+        order = f'{self._sort_expr(sort, ascending)}, {sel.order}' if sort else sel.order
+        return self._select_rows(sel.where, sel.params + sel.order_params,
+                                 f'ORDER BY {order} LIMIT {int(limit)} OFFSET {int(offset)}')
+
+    def iter_rows(self, sel, chunk_rows=5000, sort=None, ascending=True):
+        """필터 결과 전체 컬럼을 chunk_rows 행씩 (한 연결의 커서에서 fetchmany, 리스트와 같은 정렬)
+        숫자 컬럼은 스키마 dtype 으로 (float32 좌표 등 pandas 백엔드와 같은 값 표현)"""
+        order = f'{self._sort_expr(sort, ascending)}, {sel.order}' if sort else sel.order
+        cols = self.columns
+        numeric = {c: t for c, t in NEW_SCHEMA.items() if c in cols and t not in (None, 'str', 'category')}
+        con = self._connect()
+        try:
+            cur = con.execute(f'SELECT {", ".join(q(c) for c in cols)} FROM {TABLE} WHERE {sel.where} ORDER BY {order}',
+                              sel.params + sel.order_params)
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=cols).astype(numeric)
+        finally:
+            con.close()
+
+    def lookup(self, keys):
+        """행 키 → 행 (현재 데이터에 없는 키는 제외)"""
+        keys = list(keys)
+        if not keys:
+            return self._select_rows('0', ())
+        where, params = self._in('_key', keys)
+        rows = self._select_rows(where, params)
+        return rows.reindex([k for k in keys if k in rows.index])
+
+    def nearest(self, lat, lng, k=10, exclude_keys=()):
+        """기준점에서 가까운 k 곳 (index = 행 키, 거리 컬럼 추가, exclude_keys 의 계약번호 행은 모두 제외)"""
+        exclude = ()
+        if exclude_keys:
+            where, params = self._in('_key', list(exclude_keys))
+            if '계약번호' in self.columns:
+                col = q('계약번호')
+                where = f'{col} IN (SELECT {col} FROM {TABLE} WHERE {where})'
+            exclude = [r[0] for r in self._fetch(f'SELECT rowid FROM {TABLE} WHERE {where}', params)]
+        ids, km = self.geo.nearest(lat, lng, k, exclude)
+        where, params = self._rowids(ids)
+        cols = ', '.join(['rowid AS _rowid', '_key'] + [q(c) for c in self.columns])
+        rows = self._frame(f'SELECT {cols} FROM {TABLE} WHERE {where}', params).set_index('_rowid').reindex(ids)
+        return rows.set_index('_key').assign(**{DISTANCE_COL: km.round(3)})
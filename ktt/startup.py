@@ -0,0 +1,112 @@
+# === [Startup] 워커 기동 계측 / 지연 import / 백그라운드 예열 ===
+# 무거운 라이브러리(plotly, folium, streamlit-folium, scikit-learn)와 2026 DB 데이터는
+# 그 화면이 처음 열릴 때 로드한다. 여기서는 그 비용이 언제 얼마나 들었는지 기록한다.
+#   - 프로세스 시작 → 첫 스크립트 실행 시작 → 메뉴별 첫 화면 완료 (프로세스 시작 기준 초)
+#   - 화면별 지연 import 구간 (importing): 새로 로드된 모듈이 있을 때만 기록
+#   - 예열(warm_up): 워커의 첫 화면이 기본 화면이 아니면, 그 화면을 그린 뒤 백그라운드 스레드가 기본 화면의 모듈/데이터를 미리 로드
+#     KTT_WARMUP=0 이면 끔 (기본 켬)
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+WARMUP_ENV = 'KTT_WARMUP'
+
+_lock = threading.Lock()
+_imports = []          # {'화면', '모듈 수', '초', '스레드'}
+_first_paint = {}      # 메뉴 → {'프로세스 시작 후(초)', '실행(초)'}
+_first_script = None   # 첫 스크립트 실행 시작 (time.time)
+_warmup = {'state': None, 'seconds': None, 'error': None}
+
+
+def _process_start():
+    """프로세스 시작 시각 (Linux 는 /proc 기준, 그 외에는 이 모듈 import 시각)"""
+    try:
+        with open('/proc/self/stat') as f:
+            ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            btime = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return btime + ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration, AttributeError):
+        return time.time()
+
+
+PROCESS_START = _process_start()
+
+
+def script_started():
+    """스크립트 실행마다 호출, 프로세스의 첫 실행이면 True"""
+    global _first_script
+    with _lock:
+        if _first_script is not None:
+            return False
+        _first_script = time.time()
+        return True
+
+
+def first_paint(menu, seconds):
+    """실행 완료 기록 : 이 프로세스에서 해당 메뉴의 첫 화면이면 True (cold 실행)"""
+    with _lock:
+        if menu in _first_paint:
+            return False
+        _first_paint[menu] = {'프로세스 시작 후(초)': round(time.time() - PROCESS_START, 3), '실행(초)': round(seconds, 3)}
+        return True
+
+
+@contextmanager
+def importing(label):
+    """화면 진입 시 지연 import 구간 (이미 로드된 모듈뿐이면 기록하지 않음, 예열 스레드와 겹치면 모듈 수는 근사치)"""
+    before = len(sys.modules)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        loaded = len(sys.modules) - before
+        if loaded > 0:
+            with _lock:
+                _imports.append({'화면': label, '모듈 수': loaded, '초': round(time.perf_counter() - t0, 3),
+                                 '스레드': threading.current_thread().name})
+
+
+def warm_up(tasks):
+    """tasks: [(label, fn)] 를 백그라운드 데몬 스레드에서 순서대로 실행 (프로세스당 1회)
+    스레드에는 호출한 스크립트의 컨텍스트를 붙임 (import 시 ScriptRunContext 경고 방지)
+    그 실행은 이미 끝났을 수 있으므로 fn 은 화면 요소를 그리면 안 됨 (st.cache_* 는 show_spinner=False 로)"""
+    if os.environ.get(WARMUP_ENV, '1') == '0':
+        return False
+    with _lock:
+        if _warmup['state'] is not None:
+            return False
+        _warmup['state'] = 'running'
+
+    def _run():
+        t0 = time.perf_counter()
+        errors = []
+        for label, fn in tasks:
+            try:
+                with importing(label):
+                    fn()
+            except Exception as e:  # 예열 실패는 무시 (화면 진입 시 다시 로드)
+                errors.append(f'{label}: {e!r}')
+        with _lock:
+            _warmup.update(state='failed' if errors else 'done', seconds=round(time.perf_counter() - t0, 3),
+                           error='; '.join(errors) or None)
+
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    thread = threading.Thread(target=_run, name='ktt-warmup', daemon=True)
+    add_script_run_ctx(thread, get_script_run_ctx())
+    thread.start()
+    return True
+
+
+def report():
+    """설정 화면용 기동 요약"""
+    with _lock:
+        return {
+            'process_start': PROCESS_START,
+            'first_script': None if _first_script is None else round(_first_script - PROCESS_START, 3),
+            'first_paint': dict(_first_paint),
+            'imports': list(_imports),
+            'warmup': dict(_warmup),
+        }
@@ -0,0 +1,132 @@
+# === [Bench] 합성 db.csv / papp.csv 생성기 ===
+# 실제 db.csv 를 견본(template)으로 행을 복원 추출해 지사/구역/BM/변경요청/비고 등의 결합 분포를 유지하고,
+# 좌표는 견본 위치 주변으로 흩뿌리고(약 1km), 월정료는 견본 값에 로그정규 잡음을 곱한다.
+# 고객명/상호/계약번호는 새로 만든다 (계약의 약 10% 는 여러 행).
+# 큰 파일은 청크 단위로 이어 쓰므로 메모리는 청크 크기만큼만 사용한다.
+#   python -m ktt.synth 100000 --out .bench/100000
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from ktt.loader import NEW_COLUMNS
+
+CHUNK_ROWS = 100000
+COORD_JITTER = 0.01     # 좌표 흩뿌림 표준편차 (도, 약 1km)
+FEE_SIGMA = 0.3         # 월정료 로그정규 잡음
+MULTI_ROW_RATE = 0.1    # 직전 계약번호를 이어 쓰는 행 비율
+
+# 견본에서 그대로 가져오는 컬럼 (지사/구역/분류 등 결합 분포 유지)
+TEMPLATE_COLUMNS = [
+    '구분', '담당부서', '담당부서2', '변경요청', '변경사유', 'BM', '비고(관리고객 제외)', '관리본부명', '관리지사명',
+    '서비스(소)', '영업구역정보', '기술구역정보', '구역정보', '제외사유', '시', '군구', '읍면동', '지도링크',
+]
+
+_SYLLABLES = list('가나다라마바사아자차카타파하강남동서북한우미소정진현성영민수지해솔빛누리온별새봄')
+_SUFFIXES = ['상사', '마트', '식당', '카페', '약국', '학원', '병원', '물류', '전자', '스튜디오', '뷰티', '베이커리']
+_SURNAMES = list('김이박최정강조윤장임한오서신권황안송류홍')
+
+
+def load_template(path='db.csv'):
+    """견본 db.csv (원본 형식 그대로)"""
+    return pd.read_csv(path, dtype=str, encoding='utf-8-sig', keep_default_na=False)
+
+
+def _words(rng, n, length):
+    picks = rng.integers(0, len(_SYLLABLES), size=(n, length))
+    return [''.join(_SYLLABLES[i] for i in row) for row in picks]
+
+
+def generate_db(template, n_rows, rng, start=0):
+    """db.csv 형식 합성 행 (계약번호/고객번호는 start 기준 일련번호 → 청크 간 중복 없음)"""
+    src = template.iloc[rng.integers(0, len(template), n_rows)].reset_index(drop=True)
+    out = pd.DataFrame({c: src[c] if c in src.columns else '' for c in NEW_COLUMNS})
+
+    # 계약번호: 일련번호, 일부 행은 직전 행의 계약번호를 이어 씀 (한 계약 여러 서비스)
+    seq = np.arange(start, start + n_rows)
+    cont = rng.random(n_rows) < MULTI_ROW_RATE
+    cont[0] = False
+    contract = 60000000 + seq
+    idx = np.where(cont, 0, np.arange(n_rows))
+    contract = contract[np.maximum.accumulate(idx)]
+    out['계약번호'] = contract.astype(str)
+    out['고객번호'] = (30000000 + (contract - 60000000)).astype(str)
+    out['서비스번호'] = [f"{v:,}.00" for v in 70000000 + seq]
+
+    names = [f"{w}{s}" for w, s in zip(_words(rng, n_rows, 3), rng.choice(_SUFFIXES, n_rows))]
+    people = [s + w for s, w in zip(rng.choice(_SURNAMES, n_rows), _words(rng, n_rows, 2))]
+    out['관리고객명'] = names
+    out['상호'] = [f"{n}({b})" for n, b in zip(names, src['서비스(소)'])]
+    out['고객명'] = people
+    out['계약자명'] = people
+
+    # 월정료: 견본 값 × 로그정규 잡음, 만원 단위
+    base = pd.to_numeric(src['합산월정료(KTT+KT)'].str.replace(',', ''), errors='coerce').fillna(100000).to_numpy()
+    fee = np.maximum(10000, np.round(base * rng.lognormal(0.0, FEE_SIGMA, n_rows), -4)).astype(np.int64)
+    out['합산월정료(KTT+KT)'] = [f"{v:,}" for v in fee]
+
+    # 좌표: 견본 위치 주변 (견본 좌표가 없으면 비워 둠)
+    lat = pd.to_numeric(src['위도'], errors='coerce').to_numpy()
+    lng = pd.to_numeric(src['경도'], errors='coerce').to_numpy()
+    valid = (lat > 0) & (lng > 0)
+    lat = np.where(valid, lat + rng.normal(0, COORD_JITTER, n_rows), np.nan)
+    lng = np.where(valid, lng + rng.normal(0, COORD_JITTER, n_rows), np.nan)
+    out['위도'] = pd.Series(lat).round(8).astype(str).replace('nan', '')
+    out['경도'] = pd.Series(lng).round(8).astype(str).replace('nan', '')
+    out['위치좌표(위도,경도)'] = np.where(valid, out['위도'] + ',' + out['경도'], '')
+    out['지도링크_URL'] = np.where(valid, 'https://www.google.com/maps?q=' + out['위치좌표(위도,경도)'], '')
+
+    numbers = rng.integers(1, 999, n_rows)
+    out['설치주소'] = (src['시'] + ' ' + src['군구'] + ' ' + src['읍면동'] + ' ' + pd.Series(numbers).astype(str) + '-1').str.strip()
+    return out
+
+
+def generate_papp(db):
+    """합성 db 에서 구역별 대상/해지 집계 → papp.csv 형식 (해지 = 변경요청 '삭제')"""
+    branch = db['담당부서2'].str.replace('지사', '')
+    churn = db['변경요청'].str.strip() == '삭제'
+    g = pd.DataFrame({'구분': branch, '구역': db['영업구역정보'], '해지': churn}).groupby(['구분', '구역'], sort=True)
+    out = g.agg(대상=('해지', 'size'), 해지=('해지', 'sum')).reset_index()
+    out['대상'] = out['대상'].astype(float)
+    out['해지'] = out['해지'].astype(float)
+    out['해지율'] = out['해지'] / out['대상']
+    out['유지(방어)율'] = 1 - out['해지율']
+    return out
+
+
+def write_dataset(n_rows, out_dir, template_path='db.csv', seed=0, chunk_rows=CHUNK_ROWS):
+    """out_dir 에 db.csv / papp.csv 작성 (청크 단위), 경로 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    template = load_template(template_path)
+    rng = np.random.default_rng(seed)
+    db_path, papp_path = os.path.join(out_dir, 'db.csv'), os.path.join(out_dir, 'papp.csv')
+
+    counts = []
+    with open(db_path, 'w', encoding='utf-8-sig', newline='') as f:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = generate_db(template, min(chunk_rows, n_rows - start), rng, start)
+            chunk.to_csv(f, index=False, header=start == 0)
+            counts.append(generate_papp(chunk))
+
+    # 청크별 구역 집계를 합쳐 papp 작성
+    papp = pd.concat(counts).groupby(['구분', '구역'], sort=True)[['대상', '해지']].sum().reset_index()
+    papp['해지율'] = papp['해지'] / papp['대상']
+    papp['유지(방어)율'] = 1 - papp['해지율']
+    papp.to_csv(papp_path, index=False, encoding='utf-8-sig')
+    return db_path, papp_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 db.csv / papp.csv 생성")
+    parser.add_argument('rows', type=int, help="db.csv 행 수")
+    parser.add_argument('--out', default=None, help="출력 디렉터리 (기본 .bench/<rows>)")
+    parser.add_argument('--template', default='db.csv', help="견본 db.csv")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    paths = write_dataset(args.rows, args.out or os.path.join('.bench', str(args.rows)), args.template, args.seed)
+    print('\n'.join(paths))
+
+
+if __name__ == '__main__':
+    main()
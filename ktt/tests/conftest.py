@@ -0,0 +1,23 @@
+# 테스트 공용 : 작업 디렉터리를 임시 폴더로 옮기고 db.csv 를 복사 (.snapshot/ 등은 임시 폴더에 생성)
+import os
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='module')
+def workdir(tmp_path_factory):
+    """db.csv 가 복사된 임시 작업 디렉터리 (모듈 단위, 끝나면 원래 디렉터리로)"""
+    src = os.path.join(ROOT, 'db.csv')
+    if not os.path.exists(src):
+        pytest.skip('db.csv 없음')
+    path = tmp_path_factory.mktemp('work')
+    shutil.copy(src, path / 'db.csv')
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
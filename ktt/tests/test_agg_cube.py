@@ -0,0 +1,57 @@
+# 차트 집계 큐브 : 필터 roll-up 이 필터 결과 행의 직접 집계와 같은지
+import numpy as np
+import pandas as pd
+import pytest
+
+from ktt.agg_cube import AggCube, PRICE_EDGES, price_bin_labels
+from ktt.filter_index import FilterIndex
+from ktt.loader import build_new
+from ktt.tests.test_filter_index import COMBOS
+
+
+@pytest.fixture(scope='module')
+def data(workdir):
+    df = build_new('db.csv')
+    fidx = FilterIndex(df)
+    return df, fidx, AggCube(df, fidx.not_excluded)
+
+
+def _direct(rows, dim):
+    if dim == '월정료구간':
+        bins = np.searchsorted(PRICE_EDGES, rows['월정료_숫자'].to_numpy(float), side='right') - 1
+        s = pd.Series(np.asarray(price_bin_labels())[bins]).value_counts()
+    elif dim == '영업구역정보':
+        s = rows[dim].astype(str).value_counts()
+    else:
+        s = rows[dim].value_counts()
+    return {k: int(v) for k, v in s.items() if v > 0}
+
+
+@pytest.mark.parametrize('kw', COMBOS[::3])
+def test_rollup_matches_rows(data, kw):
+    df, fidx, cube = data
+    counts = cube.rollup(**kw)
+    rows = df.iloc[fidx.positions(**kw)]
+    assert counts.sum() == len(rows)
+    for dim in ['담당부서2', 'BM', '해지여부', '월정료구간', '영업구역정보']:
+        s = cube.by(dim, counts)
+        assert s.dtype == np.int64, dim          # 차트/툴팁에 '22.0' 이 아닌 정수
+        assert {k: v for k, v in s.items() if v > 0} == _direct(rows, dim), dim
+
+
+def test_rollup_positions(data):
+    df, fidx, cube = data
+    pos = fidx.positions('마트', sel_branch=['강북', '중앙'])
+    counts = cube.rollup(pos)
+    assert counts.sum() == len(pos)
+    s = cube.by('담당부서2', counts)
+    assert s.dtype == np.int64
+    assert {k: v for k, v in s.items() if v > 0} == _direct(df.iloc[pos], '담당부서2')
+
+
+def test_price_edges_align_with_filter(data):
+    # 월정료 필터 구간 경계가 큐브 구간 경계에 있어야 셀 단위 roll-up 이 정확함
+    from ktt.filter_index import PRICE_BUCKETS
+    for lo, hi in PRICE_BUCKETS.values():
+        for edge in (lo, hi):
+            assert edge is None or edge in PRICE_EDGES
@@ -0,0 +1,27 @@
+# 벤치마크 : 작은 합성 데이터로 두 백엔드의 모든 단계가 기록되는지
+import pytest
+
+from ktt import bench
+
+pytest.importorskip('pyarrow')
+
+
+def test_run_records_every_stage(workdir):
+    records = bench.run([400], ['pandas', 'sqlite'], trace=False)
+    stages = {b: [r['stage'] for r in records if r['backend'] == b] for b in ('pandas', 'sqlite')}
+    per_scenario = [f'{s}[{name}]' for name in bench.SCENARIOS for s in ('filter', 'kpi', 'chart', 'map', 'page')]
+    assert stages['pandas'] == ['load_old', 'parse', 'snapshot_write', 'snapshot_read', 'index'] + per_scenario
+    assert stages['sqlite'] == ['load_old', 'load+sqlite_build', 'open'] + per_scenario
+    for r in records:
+        assert r['rows'] == 400 and r['seconds'] >= 0 and r['peak_mb'] is None
+    assert next(r for r in records if r['stage'] == 'kpi[전체]')['size'] == 400
+    assert (workdir / '.bench' / '400' / 'db.csv').exists()
+
+
+def test_recorder_without_resource(monkeypatch):
+    # Windows: resource 모듈 없음 → RSS 없이 기록
+    monkeypatch.setattr(bench, 'resource', None)
+    rec = bench.Recorder(trace=True, rows=1, backend='pandas')
+    assert rec.run('sum', sum, [1, 2], size=int) == 3
+    assert rec.records[0]['rss_mb'] is None and rec.records[0]['peak_mb'] is not None
+    assert 'rss' not in bench._format(rec.records[0])
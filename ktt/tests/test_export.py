@@ -0,0 +1,60 @@
+# 필터 결과 내보내기 : CSV/XLSX 가 필터 결과와 같은 행을 담는지, 정리가 사용 중인 파일을 지우지 않는지
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from ktt import export
+from ktt.export import ExportExpired, export_rows, keep, read_file
+from ktt.loader import build_new
+from ktt.source import FrameSource
+
+
+@pytest.fixture(scope='module')
+def source(workdir):
+    return FrameSource(build_new('db.csv'))
+
+
+def test_csv_matches_selection(source):
+    sel = source.select(sel_branch=['강북'], show_churn=False)
+    result = export_rows(source, sel, 'CSV', sort='합산월정료(KTT+KT)', ascending=False, chunk_rows=50)
+    df = pd.read_csv(result['path'], encoding='utf-8-sig', dtype=str)
+    expected = source.page(sel, 0, source.kpis(sel)['rows'], sort='합산월정료(KTT+KT)', ascending=False)
+    assert result['rows'] == len(df) == len(expected)
+    assert list(df.columns) == source.columns
+    assert df['계약번호'].tolist() == expected['계약번호'].astype(str).tolist()
+    assert result['file_name'].endswith('.csv') and result['bytes'] == os.path.getsize(result['path'])
+
+
+def test_xlsx_splits_sheets(source, monkeypatch):
+    pytest.importorskip('openpyxl')
+    monkeypatch.setattr(export, 'XLSX_MAX_ROWS', 101)     # 시트당 헤더 + 100행
+    sel = source.select(sel_branch=['강북'])
+    result = export_rows(source, sel, 'XLSX', chunk_rows=64)
+    sheets = pd.read_excel(result['path'], sheet_name=None)
+    n = source.kpis(sel)['rows']
+    assert result['rows'] == n == sum(len(s) for s in sheets.values())
+    assert len(sheets) == -(-n // 100)
+
+
+def test_cleanup_keeps_files_in_use(source):
+    sel = source.select(sel_branch=['원주'])
+    used = export_rows(source, sel, 'CSV')['path']
+    stale = export_rows(source, sel, 'CSV')['path']
+    old = time.time() - export.EXPORT_TTL - 10
+    for path in (used, stale):
+        os.utime(path, (old, old))
+    assert keep(used)                      # 다운로드 버튼을 보여 주는 세션
+    export_rows(source, sel, 'CSV')        # 다음 내보내기 때 정리
+    assert os.path.exists(used)
+    assert not os.path.exists(stale)
+    assert not keep(stale)
+
+
+def test_read_missing_file_asks_to_export_again(source):
+    path = export_rows(source, source.select(sel_branch=['원주']), 'CSV')['path']
+    assert read_file(path).startswith('﻿'.encode())
+    os.remove(path)
+    with pytest.raises(ExportExpired, match='다시 내보내기'):
+        read_file(path)
@@ -0,0 +1,69 @@
+# 사이드바 필터 마스크 : 기존 DataFrame 필터 체인과 같은 행
+import itertools
+
+import numpy as np
+import pytest
+
+from ktt.filter_index import FilterIndex
+from ktt.loader import build_new
+
+
+@pytest.fixture(scope='module')
+def data(workdir):
+    df = build_new('db.csv')
+    return df, FilterIndex(df)
+
+
+def baseline(df, exclude_note=False, show_churn=True, sel_price="전체", sel_branch=None, sel_sales=None):
+    """기존 app.py 의 필터 체인 (검색 제외)"""
+    f = df
+    if exclude_note:
+        note = f['비고(관리고객 제외)'].astype(str).str.strip()
+        f = f[f['비고(관리고객 제외)'].isna() | (note == '') | (note == 'nan')]
+    if not show_churn: f = f[f['해지여부'] == '유지']
+    if sel_price != "전체":
+        limit = 100000 if "10만" in sel_price else (300000 if "30만" in sel_price else 500000)
+        f = f[f['월정료_숫자'] >= limit] if "이상" in sel_price else f[f['월정료_숫자'] < limit]
+    if sel_branch: f = f[f['담당부서2'].isin(sel_branch)]
+    if sel_sales: f = f[f['영업구역정보'].astype(str).isin(sel_sales)]
+    return f
+
+
+COMBOS = [
+    dict(exclude_note=e, show_churn=c, sel_price=p, sel_branch=b, sel_sales=s)
+    for e, c, p, (b, s) in itertools.product(
+        [False, True], [True, False], ["전체", "10만 미만", "30만 미만", "50만 이상"],
+        [(None, None), (['강북'], None), (['중앙', '원주'], None), (None, ['G000101']), (['중앙'], ['G000101', 'G000102'])])
+]
+
+
+@pytest.mark.parametrize('kw', COMBOS)
+def test_mask_matches_baseline(data, kw):
+    df, fidx = data
+    expected = np.flatnonzero(df.index.isin(baseline(df, **kw).index))
+    assert np.array_equal(fidx.positions(**kw), expected)
+
+
+def test_step_counts(data):
+    df, fidx = data
+    kw = dict(exclude_note=True, show_churn=False, sel_price="30만 미만", sel_branch=['강북'])
+    steps = fidx.step_counts(**kw)
+    assert list(steps) == ['전체', '비고 제외', '해지 제외', '월정료', '지사']
+    assert steps['전체'] == len(df)
+    assert steps['지사'] == len(baseline(df, **kw))
+    assert list(steps.values()) == sorted(steps.values(), reverse=True)
+
+
+def test_sales_options(data):
+    df, fidx = data
+    assert fidx.sales_options() == sorted(df['영업구역정보'].astype(str).unique())
+    only = df[df['담당부서2'].isin(['고양'])]
+    assert fidx.sales_options(['고양']) == sorted(only['영업구역정보'].astype(str).unique())
+
+
+def test_search_is_subset_of_filters(data):
+    df, fidx = data
+    hits = fidx.positions('마트', sel_branch=['강북'])
+    assert set(hits) <= set(fidx.positions(sel_branch=['강북']))
+    assert all('마트' in str(df['관리고객명'].iloc[i]) + str(df['상호'].iloc[i]) + str(df['설치주소'].iloc[i])
+               for i in hits)
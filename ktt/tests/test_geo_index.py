@@ -0,0 +1,58 @@
+# 반경 / 최근접 조회 : BallTree 결과가 전체 haversine 계산과 같은지
+import numpy as np
+import pytest
+
+from ktt import geo_index
+from ktt.geo_index import EARTH_KM, GeoIndex, radius_zoom
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(1)
+    lat = 37.3 + rng.random(2000) * 0.6
+    lng = 126.7 + rng.random(2000) * 0.6
+    lat[:5] = 0    # 무효 좌표
+    return lat, lng
+
+
+def _brute(lat, lng, q):
+    valid = (lat > 0) & (lng > 0)
+    pts = np.radians(np.column_stack([lat, lng]))
+    d = geo_index._haversine(pts, np.radians(q)) * EARTH_KM
+    d[~valid] = np.inf
+    return d
+
+
+@pytest.mark.parametrize('tree', [True, False])
+def test_within_and_nearest(points, tree, monkeypatch):
+    if not tree:
+        monkeypatch.setattr(geo_index, '_ball_tree', lambda: None)
+    elif geo_index._ball_tree() is None:
+        pytest.skip('scikit-learn 없음')
+    lat, lng = points
+    index = GeoIndex(lat, lng)
+    assert len(index) == 1995 and (index.tree is not None) == tree
+    q = (37.55, 126.98)
+    d = _brute(lat, lng, q)
+
+    ids, km = index.within(*q, 5.0)
+    assert set(ids) == set(np.flatnonzero(d <= 5.0))
+    assert np.all(np.diff(km) >= 0)
+    np.testing.assert_allclose(km, d[ids])
+
+    exclude = ids[:3]
+    ids, km = index.nearest(*q, 10, exclude)
+    order = [i for i in np.argsort(d, kind='stable') if i not in set(exclude)][:10]
+    assert list(ids) == order
+    np.testing.assert_allclose(km, d[order])
+
+
+def test_custom_ids_and_empty():
+    index = GeoIndex([37.5, 0, 37.6], [127.0, 127.0, 127.1], ids=[10, 20, 30])
+    assert list(index.nearest(37.5, 127.0, 5)[0]) == [10, 30]
+    empty = GeoIndex([], [])
+    assert len(empty.within(37.5, 127.0, 1)[0]) == 0 and len(empty.nearest(37.5, 127.0, 3)[0]) == 0
+
+
+def test_radius_zoom():
+    assert radius_zoom(1) == 14 and radius_zoom(0.01) == 16 and radius_zoom(1000) == 8
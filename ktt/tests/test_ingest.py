@@ -0,0 +1,115 @@
+# 업로드 변경분 : 계약번호 기준 diff 와 반영 결과가 수정된 원본을 새로 읽은 결과와 같은지
+import io
+import warnings
+
+import pandas as pd
+import pytest
+
+from ktt.ingest import apply_delta, diff_upload, iter_upload, read_delta
+from ktt.loader import build_new
+
+
+@pytest.fixture(scope='module')
+def base(workdir):
+    return build_new('db.csv')
+
+
+@pytest.fixture(scope='module')
+def raw(workdir):
+    return pd.read_csv('db.csv', encoding='utf-8-sig')
+
+
+def _edited(raw):
+    """월정료 변경 1건, 삭제요청 1건, 신규 1건"""
+    df = raw.copy()
+    keys = df['계약번호'].astype(str)
+    active = keys[df['변경요청'].astype(str).str.strip() != '삭제'].drop_duplicates()
+    fee_key = active.iloc[0]
+    # 삭제요청 대상은 아직 어떤 행도 '삭제' 가 아닌 계약
+    deleted_any = set(keys[df['변경요청'].astype(str).str.strip() == '삭제'])
+    del_key = next(k for k in active.iloc[1:] if k not in deleted_any)
+    is_fee = df['계약번호'].astype(str) == fee_key
+    df.loc[is_fee, '합산월정료(KTT+KT)'] = '999,999'
+    df.loc[df['계약번호'].astype(str) == del_key, '변경요청'] = '삭제'
+    new = df.iloc[[2]].copy()
+    new['계약번호'] = 99999999
+    new['관리고객명'] = '신규테스트'
+    return pd.concat([df, new], ignore_index=True), fee_key, del_key
+
+
+def _csv(df):
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8-sig')
+    return buf.getvalue()
+
+
+def _canonical(df):
+    """행 순서와 무관한 비교용 (전체 컬럼 문자열, 정렬)"""
+    out = df.astype(object).where(df.notna(), None).astype(str)
+    return out.sort_values(list(out.columns)).reset_index(drop=True)
+
+
+def test_unchanged_upload_is_empty(base, raw):
+    delta = diff_upload(base, iter_upload(io.BytesIO(_csv(raw)), 'db.csv', chunk_rows=300))
+    assert delta['replace_keys'] == [] and delta['inserted'] == [] and delta['deleted'] == []
+    assert delta['unchanged'] == base['계약번호'].nunique()
+    assert delta['n_rows'] == len(raw)
+
+
+def test_diff_classifies_changes(base, raw):
+    edited, fee_key, del_key = _edited(raw)
+    delta = diff_upload(base, iter_upload(io.BytesIO(_csv(edited)), 'db.csv', chunk_rows=300))
+    assert delta['inserted'] == ['99999999']
+    assert delta['updated'] == [fee_key]
+    assert delta['deleted'] == [del_key]
+    assert delta['replace_keys'] == sorted([fee_key, del_key])
+    assert delta['unchanged'] == base['계약번호'].nunique() - 2
+
+
+def test_apply_matches_fresh_load(base, raw, tmp_path):
+    edited, _, _ = _edited(raw)
+    delta = read_delta(io.BytesIO(_csv(edited)), 'db.csv', base)
+    merged = apply_delta(base, delta)
+    path = tmp_path / 'edited.csv'
+    path.write_bytes(_csv(edited))
+    fresh = build_new(str(path))
+    assert list(merged.columns) == list(fresh.columns)
+    pd.testing.assert_frame_equal(_canonical(merged), _canonical(fresh))
+    # 지사 순서 유지, dtype 은 스키마대로
+    assert merged['담당부서2'].cat.codes.is_monotonic_increasing
+    assert (merged.dtypes == base.dtypes).all()
+
+
+def test_partial_upload_only_touches_listed_contracts(base, raw):
+    edited, fee_key, _ = _edited(raw)
+    part = edited[edited['계약번호'].astype(str) == fee_key]
+    delta = diff_upload(base, iter_upload(io.BytesIO(_csv(part)), 'part.csv'))
+    merged = apply_delta(base, delta)
+    assert len(merged) == len(base)
+    assert set(merged.loc[merged['계약번호'] == fee_key, '월정료_숫자']) == {999999}
+
+
+def test_xlsx_upload(base, raw, tmp_path):
+    pytest.importorskip('openpyxl')
+    edited, fee_key, _ = _edited(raw)
+    path = tmp_path / 'up.xlsx'
+    edited.to_excel(path, index=False)
+    with open(path, 'rb') as f:
+        delta = diff_upload(base, iter_upload(f, 'up.xlsx', chunk_rows=500))
+    assert delta['inserted'] == ['99999999'] and fee_key in delta['replace_keys']
+
+
+def test_missing_columns_rejected(base, raw):
+    with pytest.raises(ValueError, match='필수 컬럼'):
+        diff_upload(base, iter_upload(io.BytesIO(_csv(raw.drop(columns=['계약번호']))), 'db.csv'))
+
+
+def test_no_concat_future_warnings(base, raw):
+    # 빈 조각 / 전부 결측 컬럼이 있는 업로드 (부분 목록, 청크 대부분이 base 와 동일)
+    edited, fee_key, _ = _edited(raw)
+    part = edited[edited['계약번호'].astype(str) == fee_key]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        for data, chunk_rows in [(_csv(part), 50000), (_csv(edited), 300)]:
+            delta = diff_upload(base, iter_upload(io.BytesIO(data), 'db.csv', chunk_rows=chunk_rows))
+            apply_delta(base, delta)
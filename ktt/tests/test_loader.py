@@ -0,0 +1,84 @@
+# loader.build_new 가 기존 app.py load_data (기준 구현) 와 같은 정제 결과를 내는지 비교
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ktt.loader import build_new, read_source
+from ktt.schema import NEW_SCHEMA
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_CSV = os.path.join(ROOT, 'db.csv')
+
+
+def baseline_new(path):
+    """스키마 도입 전 load_data 의 db.csv 정제 (기준 구현 그대로)"""
+    df = pd.read_csv(path)
+    for c in ['위도', '경도']:
+        if c in df.columns: df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+    if '합산월정료(KTT+KT)' in df.columns:
+        df['월정료_숫자'] = pd.to_numeric(df['합산월정료(KTT+KT)'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+    if '계약번호' in df.columns:
+        df['계약번호'] = df['계약번호'].astype(str).str.replace(r'\.0$', '', regex=True)
+    if '변경요청' not in df.columns: df['변경요청'] = ''
+    df['해지여부'] = df['변경요청'].apply(lambda x: '해지예정' if str(x).strip() == '삭제' else '유지')
+    if '비고(관리고객 제외)' not in df.columns: df['비고(관리고객 제외)'] = None
+    if '군구' in df.columns and '읍면동' in df.columns:
+        df['주소(지역)'] = df['군구'].fillna('') + ' ' + df['읍면동'].fillna('')
+    else:
+        df['주소(지역)'] = df['설치주소']
+    if '지도링크_URL' not in df.columns:
+        df['지도링크_URL'] = ''
+    if '담당부서2' in df.columns:
+        df['담당부서2'] = df['담당부서2'].astype(str).str.replace('지사', '')
+        order = ['중앙', '강북', '서대문', '고양', '의정부', '남양주', '강릉', '원주']
+        df['담당부서2'] = pd.Categorical(df['담당부서2'], categories=order, ordered=True)
+        df = df.sort_values('담당부서2')
+    return df
+
+
+def _values(s):
+    """비교용 값 목록 (결측 → None, 숫자 → float, 그 외 → 문자열)"""
+    s = s.astype(object)
+    out = []
+    for v in s:
+        if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA:
+            out.append(None)
+        elif isinstance(v, (int, float, np.integer, np.floating)):
+            out.append(float(v))
+        else:
+            out.append(str(v))
+    return out
+
+
+@pytest.fixture(scope='module')
+def frames():
+    if not os.path.exists(DB_CSV):
+        pytest.skip('db.csv 없음')
+    return build_new(DB_CSV), baseline_new(DB_CSV)
+
+
+def test_no_literal_none_strings():
+    df = read_source(DB_CSV, NEW_SCHEMA)
+    for c in df.columns:
+        if df[c].dtype == object:
+            assert not (df[c] == 'None').any(), c
+
+
+def test_matches_baseline(frames):
+    new, base = frames
+    dropped = [c for c, t in NEW_SCHEMA.items() if t is None]
+    assert list(new.columns) == [c for c in base.columns if c not in dropped]
+    assert new.index.tolist() == base.index.tolist()
+    for c in new.columns:
+        if c in ('위도', '경도'):
+            np.testing.assert_allclose(new[c].to_numpy(float), base[c].to_numpy(float), atol=1e-4)
+        else:
+            assert _values(new[c]) == _values(base[c]), c
+
+
+def test_exclude_note_rows(frames):
+    # 비고 제외 토글이 남기는 행 (비고 미기재) 수가 기준 구현과 같음
+    new, base = frames
+    assert new['비고(관리고객 제외)'].isna().sum() == base['비고(관리고객 제외)'].isna().sum() > 0
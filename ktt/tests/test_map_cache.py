@@ -0,0 +1,104 @@
+# 지도 캐시: 시그니처 정규화, LRU 축출, 캐시된 지도를 여러 번 출력해도 st_folium 인자가 같은지
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+sf = pytest.importorskip('streamlit_folium')
+
+from ktt.map_cache import MapCache, data_bytes, html_bytes, map_signature, show_map  # noqa: E402
+from ktt.source import Selection  # noqa: E402
+
+
+def _sel(search_txt='', **filters):
+    return Selection(search_txt, filters)
+
+
+def test_signature_normalizes_defaults():
+    center, zoom = (37.5665, 126.978), 11
+    a = map_signature(_sel(sel_price='전체', sel_branch=None, show_churn=True), '라이트 (기본)', center, zoom)
+    b = map_signature(_sel(sel_price=None, sel_branch=[]), '라이트 (기본)', center, zoom)
+    assert a == b
+    assert a != map_signature(_sel(sel_branch=['강북']), '라이트 (기본)', center, zoom)
+    assert a != map_signature(_sel(), '다크 (야간모드)', center, zoom)
+    assert map_signature(_sel(sel_branch=['고양', '강북']), 't', center, zoom) == \
+        map_signature(_sel(sel_branch=['강북', '고양']), 't', center, zoom)
+    assert map_signature(_sel(search_txt='블루 엘리'), 't', center, zoom) == map_signature(_sel(search_txt='블루엘리'), 't', center, zoom)
+
+
+def test_lru_eviction_and_version():
+    cache = MapCache(max_entries=2, max_bytes=100)
+    cache.put('v1', 'a', 'A', 10)
+    cache.put('v1', 'b', 'B', 10)
+    assert cache.get('v1', 'a') == 'A'        # a 가 최근 사용
+    cache.put('v1', 'c', 'C', 10)             # b 축출
+    assert cache.get('v1', 'b') is None
+    cache.put('v1', 'd', 'D', 95)             # 바이트 상한 → 나머지 축출
+    assert len(cache) == 1 and cache.nbytes == 95
+    cache.put('v1', 'big', 'X', 500)          # 상한보다 큰 항목은 보관하지 않음
+    assert cache.get('v1', 'big') is None
+    assert cache.get('v2', 'd') is None       # 데이터 버전이 바뀌면 전체 폐기
+    assert len(cache) == 0
+    assert cache.stats()['evictions'] == 3
+
+
+def _map():
+    from ktt.map_layer import build_view_map
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({
+        '위도': 37.5 + rng.random(n) * 0.1, '경도': 126.9 + rng.random(n) * 0.1,
+        '해지여부': rng.choice(['유지', '해지예정'], n), '상호': [f'상호{i}' for i in range(n)],
+        '관리고객명': [f'고객{i}' for i in range(n)], '담당부서2': '강북', '합산월정료(KTT+KT)': '100,000',
+        '주소(지역)': '마포구 서교동', '영업구역정보': 'G000101',
+    })
+    return build_view_map('markers', df, (37.55, 126.95), 11, '라이트 (기본)')
+
+
+def _component_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sf, '_component_func', lambda **kw: calls.append(kw) or kw.get('default'))
+    return calls
+
+
+def _args(call):
+    return {k: v for k, v in call.items() if k != 'on_change'}
+
+
+def test_cached_map_shows_like_fresh_st_folium(monkeypatch):
+    calls = _component_calls(monkeypatch)
+    m = _map()
+    sf.st_folium(copy.deepcopy(m), key='customer_map', height=500, width='100%', returned_objects=['zoom', 'center'])
+    for _ in range(2):
+        show_map(m, key='customer_map', height=500, returned_objects=['zoom', 'center'])
+    expected, first, second = map(_args, calls)
+    # 출력할 때마다 같은 스크립트/컴포넌트 키 (지도가 다시 마운트되지 않음)
+    assert first == expected and second == expected
+
+
+def test_concurrent_shows_of_one_map(monkeypatch):
+    calls = _component_calls(monkeypatch)
+    m = _map()
+    errors = []
+
+    def run():
+        try:
+            show_map(m, height=500, returned_objects=[])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors and len(calls) == 4
+    assert all(_args(c) == _args(calls[0]) for c in calls)
+
+
+def test_sizes():
+    m = _map()
+    assert html_bytes(m) == html_bytes(m) > 0
+    df = pd.DataFrame({'위도': [37.5] * 10, '상호': ['가'] * 10})
+    assert data_bytes(df) == df.memory_usage(deep=True).sum()
@@ -0,0 +1,57 @@
+# 지도 생성 : bulk 포인트 배열이 원본 행을 그대로 복원하는지, 건수에 따른 모드 선택
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('folium')
+
+from folium.plugins import FastMarkerCluster, MarkerCluster  # noqa: E402
+
+from ktt.loader import build_new  # noqa: E402
+from ktt.map_layer import BULK_THRESHOLD, build_map, build_view_map, bulk_payload  # noqa: E402
+from ktt.source import valid_points  # noqa: E402
+from ktt.spatial_grid import SpatialGrid  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def points(workdir):
+    return valid_points(build_new('db.csv'))
+
+
+def _lookup(callback, name):
+    """콜백 JS 의 값 목록 (var L_BRANCH = [...], ...)"""
+    start = callback.index(f'{name} = ') + len(name) + 3
+    return json.JSONDecoder().raw_decode(callback[start:])[0]
+
+
+def test_bulk_payload_roundtrip(points):
+    rows, callback = bulk_payload(points)
+    assert len(rows) == len(points)
+    branches, addrs = _lookup(callback, 'L_BRANCH'), _lookup(callback, 'L_ADDR')
+    for row, (_, src) in zip(rows[:200], points.iloc[:200].iterrows()):
+        lat, lng, churn, name, customer, branch, fee, addr, _zone = row
+        assert (lat, lng) == (round(float(src['위도']), 6), round(float(src['경도']), 6))
+        assert churn == int(src['해지여부'] == '해지예정')
+        assert name == str(src['상호']) and customer == str(src['관리고객명'])
+        assert branches[branch] == str(src['담당부서2']) and addrs[addr] == str(src['주소(지역)'])
+        assert fee == str(src['합산월정료(KTT+KT)'])
+
+
+def _children(m, kind):
+    return [c for c in m._children.values() if isinstance(c, kind)]
+
+
+def test_mode_by_count(points):
+    center = (37.55, 126.95)
+    bulk = build_map(points.iloc[:BULK_THRESHOLD + 1], center, 11, '라이트 (기본)')
+    assert len(_children(bulk, FastMarkerCluster)) == 1
+    detail = build_map(points.iloc[:BULK_THRESHOLD], center, 11, '라이트 (기본)')
+    assert not _children(detail, FastMarkerCluster) and len(_children(detail, MarkerCluster)) == 1
+
+
+def test_grid_view_map(points):
+    grid = SpatialGrid(points)
+    cells = grid.cells(np.arange(len(points)), (37.55, 126.95), 7)
+    m = build_view_map('cells', cells, (37.55, 126.95), 7, '다크 (야간모드)')
+    assert m.get_root().render().count('circle_marker_') >= len(cells)
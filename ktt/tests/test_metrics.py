@@ -0,0 +1,72 @@
+# 실행별 계측 기록 / payload 표본 측정 / 내보내기 형식
+import os
+import threading
+
+from ktt import metrics
+
+
+def test_run_records_stages_and_payload():
+    metrics.clear()
+    run = metrics.begin_run('full')
+    with metrics.stage('filter'):
+        metrics.rows({'전체': 10, '지사': 4})
+    metrics.payload('map_html', 100)
+    metrics.payload('map_html', 50)
+    metrics.end_run()
+    rec = metrics.history()[-1]
+    assert run.finished
+    assert rec['kind'] == 'full'
+    assert 'filter' in rec['stages']
+    assert rec['rows'] == {'전체': 10, '지사': 4}
+    assert rec['bytes'] == {'map_html': 150}
+
+
+def test_sampled_measures_one_in_every():
+    metrics.begin_run('full')
+    hits = [metrics.sampled('test-chart', every=5) for _ in range(20)]
+    metrics.end_run()
+    assert hits.count(True) == 4
+    assert hits[0]
+
+
+def test_sampled_outside_run():
+    metrics.end_run()
+    assert not metrics.sampled('test-idle')
+
+
+def test_exports():
+    metrics.clear()
+    metrics.begin_run('full')
+    with metrics.cache('source'):
+        metrics.cache_miss('source')
+    metrics.payload('charts', 10)
+    metrics.end_run()
+    assert metrics.to_jsonl().count('\n') == 1
+    prom = metrics.to_prometheus()
+    assert 'ktt_payload_bytes{payload="charts"} 10' in prom
+    assert 'ktt_cache_total{cache="source",result="miss"}' in prom
+
+
+def test_export_concurrent_writers(tmp_path):
+    metrics.clear()
+    metrics.begin_run('full')
+    metrics.payload('charts', 10)
+    metrics.end_run()
+    path = str(tmp_path / 'ktt.prom')
+    errors = []
+
+    def write():
+        try:
+            for _ in range(20):
+                metrics.export('prom', path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert open(path, encoding='utf-8').read() == metrics.to_prometheus()
+    assert os.listdir(tmp_path) == ['ktt.prom']
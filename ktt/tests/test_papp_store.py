@@ -0,0 +1,125 @@
+# 월별 papp 저장소 : 롤업이 원본 직접 합계와 같은지, 바뀐 월만 다시 적재하는지
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ktt import papp_store
+from ktt.papp_store import PappStore, discover, month_of
+
+pytest.importorskip('pyarrow')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def papp_dir(tmp_path):
+    src = os.path.join(ROOT, 'papp.csv')
+    if not os.path.exists(src):
+        pytest.skip('papp.csv 없음')
+    d = tmp_path / 'papp'
+    d.mkdir()
+    raw = pd.read_csv(src, encoding='utf-8-sig')
+    raw.to_csv(d / 'papp_2025-01.csv', index=False, encoding='utf-8-sig')
+    # 2월: 대상/해지 변경 (합계 검증용)
+    feb = raw.copy()
+    feb['대상'] = feb['대상'] + 3
+    feb['해지'] = (feb['해지'] * 2).clip(upper=feb['대상'])
+    feb.to_csv(d / 'papp202502.csv', index=False, encoding='utf-8-sig')
+    return d
+
+
+def _direct(path):
+    """원본 직접 합계 (소계 행 제외)"""
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    df = df[df['구분'] != '소계']
+    return df.groupby('구분')[['대상', '해지']].sum()
+
+
+def test_discover_months(papp_dir):
+    assert month_of('papp_2025-03.csv') == '2025-03' and month_of('papp202512.xlsx') == '2025-12'
+    assert month_of('papp.csv') is None
+    assert list(discover(str(papp_dir))) == ['2025-01', '2025-02']
+
+
+def test_rollups_match_direct_sums(papp_dir, tmp_path):
+    sources = discover(str(papp_dir))
+    store = PappStore(str(tmp_path / 'store')).sync(sources)
+    assert store.months() == ['2025-01', '2025-02']
+    for month, path in sources.items():
+        direct = _direct(path)
+        by_branch = store.rollup([month], '구분').set_index('구분')
+        assert by_branch[['대상', '해지']].astype(int).to_dict() == direct.astype(int).to_dict()
+        # 가중 해지율 = Σ해지 / Σ대상 (행별 비율의 평균이 아님)
+        expected = direct['해지'] / direct['대상'] * 100
+        np.testing.assert_allclose(by_branch.loc[expected.index, '해지율'], expected)
+        total = store.rollup([month], None).iloc[0]
+        assert (total['대상'], total['해지']) == (direct['대상'].sum(), direct['해지'].sum())
+        zones = store.rollup([month], '구역')
+        assert zones['대상'].sum() == direct['대상'].sum()
+        assert len(store.partition(month)) == len(pd.read_csv(path, encoding='utf-8-sig').query("구분 != '소계'"))
+    assert store.branches() == sorted(_direct(sources['2025-01']).index)
+
+
+def test_sync_reloads_only_changed_months(papp_dir, tmp_path, monkeypatch):
+    root = str(tmp_path / 'store')
+    sources = discover(str(papp_dir))
+    PappStore(root).sync(sources)
+    calls = []
+    real = papp_store.build_old
+    monkeypatch.setattr(papp_store, 'build_old', lambda p: calls.append(p) or real(p))
+    PappStore(root).sync(sources)
+    assert calls == []
+    jan = papp_dir / 'papp_2025-01.csv'
+    df = pd.read_csv(jan, encoding='utf-8-sig')
+    df.loc[0, '대상'] += 100
+    df.to_csv(jan, index=False, encoding='utf-8-sig')
+    store = PappStore(root).sync(sources)
+    assert calls == [str(jan)]
+    assert store.rollup(['2025-01'], None).iloc[0]['대상'] == _direct(jan)['대상'].sum()
+    # 빠진 월은 카탈로그/롤업/파티션 파일에서 제거
+    store = PappStore(root).sync({'2025-02': sources['2025-02']})
+    assert store.months() == ['2025-02'] and set(store.rollups()['월']) == {'2025-02'}
+    assert len([n for n in os.listdir(root) if n.endswith('.arrow')]) == 2   # 파티션 1 + 롤업
+
+
+def test_partition_cache_bound(papp_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(papp_store, 'PARTITION_CACHE', 1)
+    store = PappStore(str(tmp_path / 'store')).sync(discover(str(papp_dir)))
+    store.partition('2025-01')
+    store.partition('2025-02')
+    assert list(store._partitions) == ['2025-02']
+
+
+def test_partition_cache_concurrent(papp_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(papp_store, 'PARTITION_CACHE', 1)
+    store = PappStore(str(tmp_path / 'store')).sync(discover(str(papp_dir)))
+    errors = []
+
+    def run(month):
+        try:
+            for _ in range(50):
+                assert len(store.partition(month))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(m,)) for m in ['2025-01', '2025-02'] * 4]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors and len(store._partitions) == 1
+
+
+def test_single_file_label_ignores_mtime(tmp_path, monkeypatch):
+    src = os.path.join(ROOT, 'papp.csv')
+    if not os.path.exists(src):
+        pytest.skip('papp.csv 없음')
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(src, 'papp.csv')
+    first = discover()
+    os.utime('papp.csv', (0, 0))            # 복사/checkout 으로 mtime 이 바뀌어도
+    assert discover() == first == {papp_store.SINGLE_MONTH: 'papp.csv'}
+    store = PappStore().sync(first)
+    assert store.months() == [papp_store.SINGLE_MONTH]
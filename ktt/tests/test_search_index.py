@@ -0,0 +1,51 @@
+# 통합 검색 인덱스 : 전체 스캔(부분 문자열/초성)과 같은 행, 점수 순서
+import numpy as np
+import pandas as pd
+import pytest
+
+from ktt.loader import build_new
+from ktt.search_index import SEARCH_FIELDS, CHOSUNG_FIELDS, SearchIndex, normalize, to_chosung
+
+
+@pytest.fixture(scope='module')
+def data(workdir):
+    df = build_new('db.csv')
+    return df, SearchIndex(df)
+
+
+def _scan(df, query, fields):
+    """전체 행 스캔 (정규화 후 부분 문자열)"""
+    hit = np.zeros(len(df), bool)
+    for col in fields:
+        if col in df.columns:
+            hit |= df[col].fillna('').astype(str).map(normalize).map(lambda s: query in s).to_numpy()
+    return set(np.flatnonzero(hit))
+
+
+@pytest.mark.parametrize('query', ['마트', '강', '서울 특별시', 'KT', '5230', '없는검색어xyz'])
+def test_matches_full_scan(data, query):
+    df, index = data
+    assert set(index.search(query)) == _scan(df, normalize(query), SEARCH_FIELDS)
+
+
+@pytest.mark.parametrize('query', ['ㅂㄹ', 'ㅁㅌ', 'ㄱ'])
+def test_chosung(data, query):
+    df, index = data
+    hit = np.zeros(len(df), bool)
+    for col in CHOSUNG_FIELDS:
+        hit |= df[col].fillna('').astype(str).map(lambda s: query in to_chosung(normalize(s))).to_numpy()
+    assert set(index.search(query)) == set(np.flatnonzero(hit))
+
+
+def test_ranking():
+    df = pd.DataFrame({
+        '관리고객명': ['가나마트 본점', '가나마트', '큰가나마트', '기타'],
+        '상호': ['', '', '', '가나마트'],
+        '계약번호': ['1', '2', '3', '4'],
+        '설치주소': ['', '', '', ''],
+    })
+    ranked = list(SearchIndex(df).search('가나마트'))
+    # 고객명 일치(4×3) > 상호 일치(3×3) > 고객명 접두(4×2) > 고객명 부분(4×1)
+    assert ranked == [1, 3, 0, 2]
+    assert list(SearchIndex(df).search('가나마트', k=2)) == [1, 3]
+    assert list(SearchIndex(df).search('')) == [0, 1, 2, 3]
@@ -0,0 +1,86 @@
+# 프로세스 간 공유 캐시 : publish/attach 왕복, 배열은 memory-map 위의 읽기 전용 view, 빌드는 한 번만
+import json
+import os
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from ktt.loader import build_new
+from ktt.schema import ARROW_STRING
+from ktt.shared_cache import _HEADER, INBAND_BYTES, attach, load_shared, publish, shared_file
+from ktt.source import FrameSource
+
+pytest.importorskip('pyarrow')
+
+
+def test_publish_attach_roundtrip(tmp_path):
+    obj = {'big': np.arange(100000, dtype=np.int64), 'small': np.arange(10), 'text': '한글'}
+    path = str(tmp_path / 'x.shared')
+    publish(obj, path)
+    back = attach(path)
+    assert back['text'] == '한글'
+    assert np.array_equal(back['big'], obj['big']) and np.array_equal(back['small'], obj['small'])
+    assert not back['big'].flags.writeable          # mmap 위의 view (복사 아님)
+    assert not [n for n in os.listdir(tmp_path) if n.endswith('.tmp')]
+
+
+def test_attach_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.shared'
+    path.write_bytes(b'not a shared cache file')
+    with pytest.raises(ValueError):
+        attach(str(path))
+
+
+def test_load_shared_builds_once(workdir):
+    builds, results, errors = [], [], []
+
+    def make(df):
+        builds.append(1)
+        return FrameSource(df)
+
+    def run():
+        try:
+            results.append(load_shared('shared', 'db.csv', build_new, make))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors and len(builds) == 1
+    assert shared_file('shared', 'db.csv') is not None
+    expected = FrameSource(build_new('db.csv'))
+    for src in results:
+        assert src.n_rows == expected.n_rows
+        sel = src.select(sel_branch=['강북'], exclude_note=True)
+        assert src.kpis(sel) == expected.kpis(expected.select(sel_branch=['강북'], exclude_note=True))
+    # 이후 조회는 attach 만
+    load_shared('shared', 'db.csv', build_new, make)
+    assert len(builds) == 1
+
+
+def _body(obj):
+    """공유 캐시와 같은 기준으로 pickle 했을 때 본문 크기"""
+    return len(pickle.dumps(obj, protocol=5, buffer_callback=lambda b: b.raw().nbytes < INBAND_BYTES))
+
+
+def test_frame_source_shares_strings_out_of_band(workdir):
+    src = load_shared('shared', 'db.csv', build_new, FrameSource)
+    path = shared_file('shared', 'db.csv')
+    with open(path, 'rb') as f:
+        _, header_len = _HEADER.unpack(f.read(_HEADER.size))
+        (_, body_len), *spans = json.loads(f.read(header_len))['spans']
+    expected = FrameSource(build_new('db.csv'))
+    assert body_len * 2 < _body(expected) and len(spans) > 0
+    # 문자열 컬럼/행 키/검색 문자열·포스팅은 본문에 행(값)별 객체 없이 out-of-band 버퍼로
+    assert src.df['상호'].dtype == ARROW_STRING and src.keys.dtype == ARROW_STRING
+    field = src.fidx.search.fields['상호'][0]
+    for part in [src.df['상호'], src.df['설치주소'], src.keys, field.uniques, field.post_ids]:
+        assert _body(part) < 1024
+    assert src.df['상호'].fillna('').tolist() == expected.df['상호'].fillna('').tolist()
+    for query in ['강남', 'ㄱ', '1']:
+        assert np.array_equal(src.fidx.search.search(query), expected.fidx.search.search(query))
+    sel = src.select('강', sel_branch=['강북'])
+    assert list(src.page(sel, 0, 20, '관리고객명').index) == list(expected.page(expected.select('강', sel_branch=['강북']), 0, 20, '관리고객명').index)
@@ -0,0 +1,76 @@
+# 전처리 스냅샷 : 원본 지문 기반 재사용/무효화, 변경분 저장, 원본과 같은 결과
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from ktt import snapshot
+from ktt.loader import build_new
+from ktt.snapshot import SNAPSHOT_DIR, applied_deltas, current_snapshot, load_cached, save_delta, snapshot_signature
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def fresh(workdir):
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    shutil.copy('db.csv', 'snap.csv')
+    yield 'snap.csv'
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+
+
+def _plain(df):
+    """비교용 : object 로, 결측은 None (스냅샷은 문자열 결측을 None 으로 복원)"""
+    df = df.reset_index(drop=True).astype(object)
+    return df.where(df.notna(), None)
+
+
+def _counting(calls):
+    def build(path):
+        calls.append(path)
+        return build_new(path)
+    return build
+
+
+def test_snapshot_roundtrip(fresh):
+    calls = []
+    first = load_cached('snap', fresh, _counting(calls))
+    again = load_cached('snap', fresh, _counting(calls))
+    assert calls == [fresh]                  # 두 번째는 스냅샷에서
+    pd.testing.assert_frame_equal(_plain(first), _plain(again))
+    assert current_snapshot('snap', fresh).endswith('.arrow')
+
+
+def test_touch_keeps_snapshot_and_edit_invalidates(fresh):
+    calls = []
+    load_cached('snap', fresh, _counting(calls))
+    st_ = os.stat(fresh)
+    os.utime(fresh, ns=(st_.st_atime_ns, st_.st_mtime_ns + 10 ** 9))   # 내용 동일, mtime 만 변경
+    load_cached('snap', fresh, _counting(calls))
+    assert len(calls) == 1
+    with open(fresh, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    load_cached('snap', fresh, _counting(calls))
+    assert len(calls) == 2
+
+
+def test_version_bump_rebuilds(fresh, monkeypatch):
+    calls = []
+    load_cached('snap', fresh, _counting(calls))
+    old = current_snapshot('snap', fresh)
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_VERSION', snapshot.SNAPSHOT_VERSION + 1)
+    load_cached('snap', fresh, _counting(calls))
+    assert len(calls) == 2
+    assert current_snapshot('snap', fresh) != old
+    assert not os.path.exists(old)
+
+
+def test_save_delta_changes_signature(fresh):
+    df = load_cached('snap', fresh, build_new)
+    sig = snapshot_signature('snap', fresh)
+    save_delta('snap', df.iloc[:10].reset_index(drop=True), {'sha256': 'x', 'rows': 10})
+    assert snapshot_signature('snap', fresh) == sig[:-1] + (1,)
+    assert applied_deltas('snap') == [{'sha256': 'x', 'rows': 10}]
+    assert len(load_cached('snap', fresh, build_new)) == 10
+    assert not [n for n in os.listdir(SNAPSHOT_DIR) if n.endswith('.tmp')]
@@ -0,0 +1,51 @@
+# 지도 격자 집계 : 셀 합계가 화면 영역의 행 집계와 같은지, 건수/줌에 따른 모드 선택
+import numpy as np
+import pytest
+
+from ktt import spatial_grid
+from ktt.loader import build_new
+from ktt.spatial_grid import MAX_CELLS, SpatialGrid
+
+CENTER = (37.55, 126.95)
+
+
+@pytest.fixture(scope='module')
+def data(workdir):
+    df = build_new('db.csv')
+    return df, SpatialGrid(df)
+
+
+def test_cells_sum_to_rows(data):
+    df, grid = data
+    pos = np.arange(len(df))
+    cells = grid.cells(pos, CENTER, 6)
+    valid = grid.valid
+    assert len(cells) <= MAX_CELLS
+    # 줌 6 화면(+여유)은 수도권/강원 전체를 덮음 → 유효 좌표 전부
+    assert cells['고객수'].sum() == valid.sum()
+    assert cells['해지예정'].sum() == (df['해지여부'] == '해지예정').to_numpy()[valid].sum()
+    assert np.isclose(cells['월정료합계'].sum(), df['월정료_숫자'].to_numpy(float)[valid].sum())
+    # 셀 중심은 셀 안 좌표의 평균 → 전체 가중 평균이 원래 평균과 같음
+    assert np.isclose((cells['위도'] * cells['고객수']).sum() / cells['고객수'].sum(), grid.lat[valid].mean())
+
+
+def test_view_modes(data, monkeypatch):
+    df, grid = data
+    pos = np.arange(len(df))
+    mode, payload = grid.view(pos, CENTER, 11)
+    assert mode == 'markers' and len(payload) == grid.valid.sum()
+    monkeypatch.setattr(spatial_grid, 'MARKER_LIMIT', 100)
+    mode, payload = grid.view(pos, CENTER, 11)
+    assert mode == 'cells' and payload['고객수'].sum() <= grid.valid.sum()
+    # 상세 줌 : 화면 영역 행이 상한 이하이면 그 행만 마커로
+    monkeypatch.setattr(spatial_grid, 'MARKER_LIMIT', len(grid.in_view(pos, CENTER, 17)))
+    mode, payload = grid.view(pos, CENTER, 17)
+    assert mode == 'markers' and set(payload) == set(grid.in_view(pos, CENTER, 17))
+
+
+def test_invalid_coordinates_skipped(data):
+    df, grid = data
+    pos = np.flatnonzero(~grid.valid)
+    if not len(pos):
+        pytest.skip('무효 좌표 없음')
+    assert grid.cells(pos, CENTER, 6).empty
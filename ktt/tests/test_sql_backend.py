@@ -0,0 +1,181 @@
+# SqlSource 가 FrameSource 와 같은 필터/KPI/검색/페이지/차트/지도 결과를 내는지, SQLite 적재가 동시 호출에 안전한지
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ktt.loader import build_new
+from ktt.snapshot import SNAPSHOT_DIR, load_cached, write_snapshot
+from ktt.source import FrameSource
+from ktt.sql_backend import SqlSource, build_sqlite, ensure_sqlite
+
+pytest.importorskip('pyarrow')
+
+SELECTIONS = [
+    {},
+    {'exclude_note': True},
+    {'show_churn': False, 'sel_price': '10만 미만'},
+    {'sel_price': '50만 이상'},
+    {'sel_branch': ['강북', '고양']},
+    {'sel_branch': ['중앙'], 'sel_sales': ['G000101', 'G000102']},
+    {'search_txt': '마트'},
+    {'search_txt': 'ㅂㄹ', 'exclude_note': True},
+    {'search_txt': '동 대문'},
+]
+
+
+@pytest.fixture(scope='module')
+def sources(workdir):
+    df = load_cached('new', 'db.csv', build_new)
+    return FrameSource(df), SqlSource(ensure_sqlite('new', 'db.csv', build_new))
+
+
+def _nonzero(s):
+    """차트 시리즈 비교용 : 0 과 결측 라벨 제외, 정수"""
+    s = s[s > 0]
+    return {k: int(v) for k, v in s.items() if k is not None and k == k and k != 'nan'}
+
+
+@pytest.mark.parametrize('kw', SELECTIONS)
+def test_filters_and_kpis(sources, kw):
+    fs, ss = sources
+    a, b = fs.select(**kw), ss.select(**kw)
+    assert fs.kpis(a) == ss.kpis(b)
+    assert fs.filter_steps(a) == ss.filter_steps(b)
+
+
+@pytest.mark.parametrize('kw', SELECTIONS)
+def test_pages(sources, kw):
+    fs, ss = sources
+    a, b = fs.select(**kw), ss.select(**kw)
+    assert list(fs.page(a, 0, 50).index) == list(ss.page(b, 0, 50).index)
+    for sort, asc in [('합산월정료(KTT+KT)', False), ('담당부서2', True), ('관리고객명', True)]:
+        pa_, pb = fs.page(a, 10, 30, sort=sort, ascending=asc), ss.page(b, 10, 30, sort=sort, ascending=asc)
+        assert list(pa_.index) == list(pb.index), sort
+
+
+@pytest.mark.parametrize('kw', SELECTIONS)
+def test_chart_counts(sources, kw):
+    fs, ss = sources
+    ca, cb = fs.chart_counts(fs.select(**kw)), ss.chart_counts(ss.select(**kw))
+    assert ca.keys() == cb.keys()
+    for d in ca:
+        assert _nonzero(ca[d]) == _nonzero(cb[d]), d
+    assert list(ca['담당부서2'].index) == list(cb['담당부서2'].index)
+
+
+def test_sales_options_skip_missing(workdir, tmp_path):
+    # 영업구역 미기재 행이 있어도 두 백엔드의 선택지가 같고 'nan' 이 끼지 않음
+    df = load_cached('new', 'db.csv', build_new).copy()
+    df.loc[df.index[::7], '영업구역정보'] = None
+    arrow, db = str(tmp_path / 'missing_zone.arrow'), str(tmp_path / 'missing_zone.sqlite')
+    write_snapshot(df, arrow)
+    build_sqlite(arrow, db)
+    fs, ss = FrameSource(df), SqlSource(db)
+    assert fs.sales_options() == ss.sales_options()
+    assert 'nan' not in fs.sales_options()
+    branches = fs.branches()[:2]
+    assert fs.sales_options(branches) == ss.sales_options(branches)
+    zones = fs.sales_options()[:2]
+    assert fs.kpis(fs.select(sel_sales=zones)) == ss.kpis(ss.select(sel_sales=zones))
+
+
+def test_map_view(sources):
+    fs, ss = sources
+    for kw in [{}, {'sel_branch': ['강릉']}]:
+        ma, pa_, na = fs.map_view(fs.select(**kw), (37.5665, 126.978), 11)
+        mb, pb, nb = ss.map_view(ss.select(**kw), (37.5665, 126.978), 11)
+        assert (ma, na) == (mb, nb)
+        assert len(pa_) == len(pb)
+
+
+def test_iter_rows(sources):
+    fs, ss = sources
+    kw = {'sel_branch': ['강북'], 'show_churn': False}
+    a = pd.concat(fs.iter_rows(fs.select(**kw), 100, sort='합산월정료(KTT+KT)'), ignore_index=True)
+    b = pd.concat(ss.iter_rows(ss.select(**kw), 100, sort='합산월정료(KTT+KT)'), ignore_index=True)
+    assert list(a.columns) == list(b.columns)
+    assert a['계약번호'].tolist() == b['계약번호'].tolist()
+    np.testing.assert_allclose(a['위도'].to_numpy(float), b['위도'].to_numpy(float))
+
+
+def test_lookup_and_nearest(sources):
+    fs, ss = sources
+    keys = list(fs.page(fs.select(), 0, 5).index) + ['없는계약#0']
+    assert list(fs.lookup(keys).index) == list(ss.lookup(keys).index) == keys[:5]
+    base = fs.lookup(keys[:1]).iloc[0]
+    lat, lng = float(base['위도']), float(base['경도'])
+    na, nb = fs.nearest(lat, lng, 5, keys[:1]), ss.nearest(lat, lng, 5, keys[:1])
+    assert list(na.index) == list(nb.index)
+    assert na['거리(km)'].tolist() == nb['거리(km)'].tolist()
+
+
+def test_nearest_excludes_whole_contract(sources):
+    # 같은 계약번호의 다른 행('계약번호#1' 등)이 0 km 최근접으로 나오지 않음
+    fs, ss = sources
+    df = fs.df.assign(_c=fs.df['계약번호'].astype(str))
+    same = df[df.duplicated(['_c', '위도', '경도'], keep=False) & (df['위도'].to_numpy(float) > 0)]
+    if same.empty:
+        pytest.skip('같은 좌표의 여러 행 계약번호 없음')
+    contract = same['_c'].iloc[0]
+    anchor = str(fs.keys[df.index.get_loc(same.index[0])])
+    lat, lng = float(same['위도'].iloc[0]), float(same['경도'].iloc[0])
+    # 기준점과 같은 좌표의 행 수만큼 조회 → 이전에는 같은 계약의 다른 행이 반드시 포함됨
+    k = int(((df['위도'] == lat) & (df['경도'] == lng)).sum())
+    na, nb = fs.nearest(lat, lng, k, [anchor]), ss.nearest(lat, lng, k, [anchor])
+    assert not any(str(key).rsplit('#', 1)[0] == contract for key in na.index)
+    assert list(na.index) == list(nb.index)
+    assert na['거리(km)'].tolist() == nb['거리(km)'].tolist()
+
+
+def test_near_filter(sources):
+    fs, ss = sources
+    base = fs.df.iloc[0]
+    near = (float(base['위도']), float(base['경도']), 3.0)
+    a, b = fs.select(near=near), ss.select(near=near)
+    assert fs.kpis(a) == ss.kpis(b)
+    assert fs.filter_steps(a) == ss.filter_steps(b)
+
+
+def test_concurrent_ensure_sqlite(workdir):
+    # 같은 스냅샷의 SQLite 를 여러 스레드가 동시에 요청해도 적재는 안전하고 임시 파일이 남지 않음
+    n_rows = len(load_cached('new', 'db.csv', build_new))
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name.endswith('.sqlite'):
+            os.remove(os.path.join(SNAPSHOT_DIR, name))
+    paths, errors = [], []
+
+    def run():
+        try:
+            paths.append(ensure_sqlite('new', 'db.csv', build_new))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors
+    assert len(set(paths)) == 1
+    assert SqlSource(paths[0]).n_rows == n_rows
+    assert not [n for n in os.listdir(SNAPSHOT_DIR) if n.endswith('.tmp')]
+
+
+def test_build_sqlite_unique_tmp(workdir):
+    # 동시에 두 번 적재해도 서로의 임시 파일을 지우거나 덮어쓰지 않음
+    arrow = [os.path.join(SNAPSHOT_DIR, n) for n in os.listdir(SNAPSHOT_DIR) if n.endswith('.arrow')][0]
+    target = os.path.join(SNAPSHOT_DIR, 'race.sqlite')
+    errors = []
+
+    def run():
+        try:
+            build_sqlite(arrow, target, batch_rows=200)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors
+    assert SqlSource(target).n_rows == FrameSource(load_cached('new', 'db.csv', build_new)).n_rows
@@ -0,0 +1,45 @@
+# 워커 기동 계측 / 백그라운드 예열
+import pytest
+
+from ktt import startup
+
+pytest.importorskip('streamlit')
+
+
+@pytest.fixture
+def fresh_warmup(monkeypatch):
+    monkeypatch.setattr(startup, '_warmup', {'state': None, 'seconds': None, 'error': None})
+    monkeypatch.delenv(startup.WARMUP_ENV, raising=False)
+
+
+def _wait():
+    import threading
+    for t in threading.enumerate():
+        if t.name == 'ktt-warmup':
+            t.join(10)
+
+
+def test_warm_up_runs_once_and_records_errors(fresh_warmup):
+    done = []
+
+    def boom():
+        raise RuntimeError('x')
+
+    assert startup.warm_up([('a', lambda: done.append('a')), ('b', boom), ('c', lambda: done.append('c'))])
+    _wait()
+    assert done == ['a', 'c']
+    rep = startup.report()['warmup']
+    assert rep['state'] == 'failed' and 'b: RuntimeError' in rep['error']
+    assert not startup.warm_up([('again', lambda: done.append('again'))])
+
+
+def test_warm_up_disabled(fresh_warmup, monkeypatch):
+    monkeypatch.setenv(startup.WARMUP_ENV, '0')
+    assert not startup.warm_up([('a', lambda: None)])
+    assert startup.report()['warmup']['state'] is None
+
+
+def test_first_paint_once_per_menu():
+    assert startup.first_paint('테스트 메뉴', 0.1)
+    assert not startup.first_paint('테스트 메뉴', 0.2)
+    assert startup.report()['first_paint']['테스트 메뉴']['실행(초)'] == 0.1
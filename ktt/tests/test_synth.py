@@ -0,0 +1,47 @@
+# 합성 데이터 : 생성한 db.csv / papp.csv 가 원본과 같은 로더로 읽히는지
+import os
+
+import pytest
+
+from ktt.loader import build_new, build_old
+from ktt.synth import write_dataset
+
+
+@pytest.fixture(scope='module')
+def dataset(workdir):
+    # 청크 경계를 넘도록 (청크 간 계약번호 일련번호 이어짐)
+    return write_dataset(2500, 'synth', 'db.csv', seed=1, chunk_rows=1000)
+
+
+def test_db_loads_with_requested_rows(dataset):
+    db_path, _ = dataset
+    df = build_new(db_path)
+    assert len(df) == 2500
+    assert list(df.columns) == list(build_new('db.csv').columns)
+    # 여러 행에 걸친 계약이 있고, 계약번호는 청크 사이에서도 겹치지 않음
+    rows_per_contract = df['계약번호'].value_counts()
+    assert (rows_per_contract > 1).any()
+    assert rows_per_contract.max() < 50
+    assert df['계약번호'].str.fullmatch(r'\d+').all()
+
+
+def test_db_coordinates_valid(dataset):
+    df = build_new(dataset[0])
+    lat, lng = df['위도'].astype(float), df['경도'].astype(float)
+    valid = (lat > 0) & (lng > 0)
+    assert valid.mean() > 0.5
+    assert lat[valid].between(33, 39).all() and lng[valid].between(124, 132).all()
+
+
+def test_papp_matches_db(dataset):
+    db_path, papp_path = dataset
+    assert os.path.exists(papp_path)
+    papp = build_old(papp_path)
+    assert int(papp['대상'].sum()) == 2500
+    assert ((papp['해지율'] >= 0) & (papp['해지율'] <= 1)).all()
+
+
+def test_same_seed_same_data(dataset, tmp_path):
+    db_path, _ = dataset
+    again, _ = write_dataset(2500, str(tmp_path), 'db.csv', seed=1, chunk_rows=1000)
+    assert open(again, 'rb').read() == open(db_path, 'rb').read()